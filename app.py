@@ -1,20 +1,141 @@
 import os
+import hmac
 import json
+import time
 import logging
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for
+from contextlib import nullcontext
+from flask import Flask, Response, render_template, request, jsonify, flash, redirect, url_for
 from recommendation_engine import JobRecommendationEngine
-from job_data import JobDatabase
+from recommendation_cache import RecommendationCache
+from minhash_lsh import MinHashLSH
+from profile_percolator import ProfilePercolator, QueueSink
+from job_data import JobDatabase, JobRecord
+from currency_rates import CurrencyRates
+from job_ingest import JobIngestor
+from metrics import REGISTRY, STAGE_SECONDS, cache_collector, catalog_collector
+from request_profiler import SlowRequestProfiler
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; LOG_LEVEL=DEBUG logs every request's preferences
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
 
 # Create Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "default-secret-key-for-development")
 
+# Exchange rates used to normalize salaries; must be set before any job is loaded
+if os.environ.get("CURRENCY_RATES_FILE"):
+    JobRecord.CURRENCY_RATES = CurrencyRates.load(os.environ["CURRENCY_RATES_FILE"])
+
 # Initialize recommendation engine and job database
-job_db = JobDatabase()
-recommendation_engine = JobRecommendationEngine(job_db)
+if os.environ.get("DATABASE_URL"):
+    from sql_job_database import SQLJobDatabase
+    job_db = SQLJobDatabase(
+        os.environ["DATABASE_URL"],
+        pool_size=int(os.environ.get("DATABASE_POOL_SIZE", "5")),
+        max_overflow=int(os.environ.get("DATABASE_MAX_OVERFLOW", "10"))
+    )
+elif os.environ.get("JOB_SNAPSHOT"):
+    job_db = JobDatabase.open_snapshot(os.environ["JOB_SNAPSHOT"])
+else:
+    job_db = JobDatabase()
+if os.environ.get("JOB_FEED"):
+    JobIngestor(job_db).ingest(os.environ["JOB_FEED"])
+# Approximate skill/value candidate retrieval, off unless RECOMMENDER_LSH_BANDS is set
+lsh_bands = int(os.environ.get("RECOMMENDER_LSH_BANDS", "0"))
+recommendation_engine = JobRecommendationEngine(
+    job_db,
+    backend=os.environ.get("RECOMMENDER_BACKEND", "python"),
+    shards=int(os.environ.get("RECOMMENDER_SHARDS", "0")),
+    pruning=os.environ.get("RECOMMENDER_PRUNING", "").lower() in ("1", "true", "yes"),
+    lsh=MinHashLSH(bands=lsh_bands, rows=int(os.environ.get("RECOMMENDER_LSH_ROWS", "2"))) if lsh_bands else None,
+    cache=RecommendationCache(
+        max_size=int(os.environ.get("RECOMMENDATION_CACHE_SIZE", "1024")),
+        ttl=float(os.environ.get("RECOMMENDATION_CACHE_TTL", "300"))
+    )
+)
+
+# Job alerts: jobs added from now on are matched against saved candidate profiles
+alert_sink = QueueSink(maxsize=int(os.environ.get("ALERT_QUEUE_SIZE", "10000")))
+percolator = ProfilePercolator(recommendation_engine, alert_sink,
+                               max_profiles=int(os.environ.get("MAX_ALERT_PROFILES", "10000")))
+percolator.attach(job_db)
+
+REGISTRY.register_collector(catalog_collector(job_db))
+REGISTRY.register_collector(cache_collector(recommendation_engine.cache))
+
+# Opt-in profiling of /api/recommend requests slower than SLOW_REQUEST_THRESHOLD_MS
+slow_request_profiler = None
+if os.environ.get("SLOW_REQUEST_THRESHOLD_MS"):
+    slow_request_profiler = SlowRequestProfiler(
+        threshold_ms=float(os.environ["SLOW_REQUEST_THRESHOLD_MS"]),
+        interval_ms=float(os.environ.get("PROFILE_INTERVAL_MS", "5")),
+        max_profiles=int(os.environ.get("SLOW_PROFILE_BUFFER", "20")),
+        stats_provider=recommendation_engine.last_request_stats
+    )
+
+# Page size limits for /api/jobs
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Recommendations per preference set for the recommend APIs
+DEFAULT_RECOMMENDATIONS = 20
+MAX_RECOMMENDATIONS = 100
+
+def parse_limit(value):
+    """Validate a requested number of recommendations; raises ValueError unless 1 <= limit <= MAX_RECOMMENDATIONS"""
+    if value is None:
+        return DEFAULT_RECOMMENDATIONS
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().isdigit():
+        raise ValueError(f"limit must be an integer between 1 and {MAX_RECOMMENDATIONS}")
+    limit = int(value)
+    if not 1 <= limit <= MAX_RECOMMENDATIONS:
+        raise ValueError(f"limit must be an integer between 1 and {MAX_RECOMMENDATIONS}")
+    return limit
+
+def _profile_request(endpoint, preferences):
+    """Profile the block if slow request profiling is enabled"""
+    if slow_request_profiler is None:
+        return nullcontext()
+    return slow_request_profiler.profile(endpoint, preferences)
+
+def _token_error(variable, header, endpoints):
+    """
+    Error response for a request to token-protected endpoints that may not proceed, or None
+    
+    The endpoints are disabled unless the `variable` environment variable is set, and then
+    require its value in the `header` request header.
+    """
+    token = os.environ.get(variable)
+    if not token:
+        return jsonify({'error': f'{endpoints} endpoints are disabled; set {variable}'}), 404
+    if not hmac.compare_digest(request.headers.get(header, ''), token):
+        return jsonify({'error': 'Forbidden'}), 403
+    return None
+
+def _admin_error():
+    """Admin endpoints require ADMIN_TOKEN in the X-Admin-Token header"""
+    return _token_error("ADMIN_TOKEN", 'X-Admin-Token', 'Admin')
+
+def _alerts_error():
+    """Alert endpoints require ALERTS_TOKEN in the X-Alerts-Token header"""
+    return _token_error("ALERTS_TOKEN", 'X-Alerts-Token', 'Alert')
+
+def _timed_jsonify(payload):
+    """jsonify, recording the time spent serializing in the 'serialize' stage"""
+    started = time.perf_counter()
+    response = jsonify(payload)
+    STAGE_SECONDS.observe(time.perf_counter() - started, ('serialize',))
+    return response
+
+def _stream_json_array(items):
+    """Serialize items as a JSON array one element at a time, skipping removed jobs (None)"""
+    yield '['
+    separator = ''
+    for item in items:
+        if item is not None:
+            yield separator + json.dumps(item)
+            separator = ','
+    yield ']'
 
 @app.route('/')
 def index():
@@ -43,7 +164,8 @@ def recommend_jobs():
                 'min_salary': int(request.form.get('min_salary', 0)) if request.form.get('min_salary') else 0
             }
         
-        app.logger.debug(f"Received preferences: {preferences}")
+        if app.logger.isEnabledFor(logging.DEBUG):
+            app.logger.debug(f"Received preferences: {preferences}")
         
         # Validate preferences
         if not preferences:
@@ -56,7 +178,7 @@ def recommend_jobs():
         app.logger.debug(f"Generated {len(recommendations)} recommendations")
         
         if request.is_json:
-            return jsonify(recommendations)
+            return _timed_jsonify(recommendations)
         else:
             return render_template('recommendations.html', 
                                  recommendations=recommendations, 
@@ -78,10 +200,36 @@ def recommend_jobs():
 
 @app.route('/api/jobs')
 def get_all_jobs():
-    """API endpoint to get all available jobs"""
+    """
+    API endpoint to get all available jobs
+    
+    Without parameters the whole catalog is streamed as a JSON array. With `cursor`
+    and/or `page_size` one page is returned together with the cursor of the next page.
+    """
     try:
-        jobs = job_db.get_all_jobs()
-        return jsonify(jobs)
+        snapshot = job_db.snapshot()
+        if 'cursor' not in request.args and 'page_size' not in request.args:
+            return Response(_stream_json_array(snapshot.jobs), mimetype='application/json')
+        
+        try:
+            cursor = int(request.args.get('cursor', 0))
+            page_size = int(request.args.get('page_size', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return jsonify({'error': 'cursor and page_size must be integers'}), 400
+        if cursor < 0 or not 0 < page_size <= MAX_PAGE_SIZE:
+            return jsonify({'error': f'cursor must be >= 0 and page_size between 1 and {MAX_PAGE_SIZE}'}), 400
+        
+        # Catalog positions never move, so a cursor stays valid across later writes;
+        # pages holding removed jobs come back short
+        end = min(cursor + page_size, len(snapshot))
+        next_cursor = end if end < len(snapshot) else None
+        
+        def generate():
+            yield '{"jobs":'
+            yield from _stream_json_array(snapshot.jobs[cursor:end])
+            yield f',"next_cursor":{json.dumps(next_cursor)},"version":{snapshot.version}}}'
+        
+        return Response(generate(), mimetype='application/json')
     except Exception as e:
         app.logger.error(f"Error getting jobs: {e}")
         return jsonify({'error': 'Failed to retrieve jobs'}), 500
@@ -91,19 +239,134 @@ def api_recommend():
     """API endpoint for job recommendations"""
     try:
         preferences = request.get_json()
-        if not preferences:
+        if not preferences or not isinstance(preferences, dict):
             return jsonify({'error': 'No preferences provided'}), 400
         
-        recommendations = recommendation_engine.recommend_jobs(preferences)
-        return jsonify({
+        limit = parse_limit(preferences.pop('limit', None))
+        with _profile_request('/api/recommend', preferences):
+            recommendations = recommendation_engine.recommend_jobs(preferences, limit)
+        return _timed_jsonify({
             'recommendations': recommendations,
             'total_count': len(recommendations)
         })
     
+    except ValueError as e:
+        app.logger.error(f"ValueError in API recommend: {e}")
+        return jsonify({'error': str(e)}), 400
+    
     except Exception as e:
         app.logger.error(f"Error in API recommend: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/recommend/batch', methods=['POST'])
+def api_recommend_batch():
+    """API endpoint for scoring many preference sets in one call"""
+    try:
+        payload = request.get_json()
+        if isinstance(payload, list):
+            payload = {'requests': payload}
+        if not payload or not isinstance(payload.get('requests'), list):
+            return jsonify({'error': 'No preference sets provided'}), 400
+        
+        limit = parse_limit(payload.get('limit'))
+        results = recommendation_engine.recommend_jobs_batch(payload['requests'], limit=limit)
+        return jsonify({
+            'results': results,
+            'total_count': len(results)
+        })
+    
+    except ValueError as e:
+        app.logger.error(f"ValueError in API batch recommend: {e}")
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        app.logger.error(f"Error in API batch recommend: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/alerts/profiles', methods=['POST'])
+def save_alert_profile():
+    """Save (or replace) a candidate profile to be alerted about matching new jobs"""
+    error = _alerts_error()
+    if error is not None:
+        return error
+    try:
+        payload = request.get_json()
+        if not payload or not payload.get('profile_id') or not isinstance(payload.get('preferences'), dict):
+            return jsonify({'error': 'profile_id and preferences are required'}), 400
+        
+        profile = percolator.save_profile(payload['profile_id'], payload['preferences'], payload.get('min_score'))
+        return jsonify({'profile_id': profile.profile_id, 'min_score': profile.min_score}), 201
+    
+    except ValueError as e:
+        app.logger.error(f"ValueError in save alert profile: {e}")
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        app.logger.error(f"Error saving alert profile: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/alerts/profiles/<profile_id>', methods=['DELETE'])
+def delete_alert_profile(profile_id):
+    """Stop alerting a saved candidate profile"""
+    error = _alerts_error()
+    if error is not None:
+        return error
+    if not percolator.remove_profile(profile_id):
+        return jsonify({'error': f'Profile {profile_id} not found'}), 404
+    return jsonify({'profile_id': profile_id, 'deleted': True})
+
+@app.route('/api/alerts')
+def get_alerts():
+    """Take pending job alerts (up to `?max=`, default 100), oldest first"""
+    error = _alerts_error()
+    if error is not None:
+        return error
+    try:
+        max_events = max(1, int(request.args.get('max', 100)))
+    except ValueError:
+        return jsonify({'error': 'max must be an integer'}), 400
+    alerts = [event._asdict() for event in alert_sink.drain(max_events)]
+    return jsonify({
+        'alerts': alerts,
+        'total_count': len(alerts)
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: stage and component latency histograms, cache and catalog index stats"""
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/admin/profiles')
+def list_slow_profiles():
+    """Summaries of the most recent slow request profiles, newest first"""
+    error = _admin_error()
+    if error is not None:
+        return error
+    if slow_request_profiler is None:
+        return jsonify({'error': 'Slow request profiling is disabled; set SLOW_REQUEST_THRESHOLD_MS'}), 404
+    return jsonify({
+        'threshold_ms': slow_request_profiler.threshold * 1000,
+        'slow_requests': slow_request_profiler.slow_requests,
+        'profiles': slow_request_profiler.profiles()
+    })
+
+@app.route('/admin/profiles/<int:profile_id>')
+def get_slow_profile(profile_id):
+    """
+    One slow request profile with its sampled stacks
+    
+    `?format=collapsed` returns the stacks in the collapsed format used by flame graph tools.
+    """
+    error = _admin_error()
+    if error is not None:
+        return error
+    profile = slow_request_profiler.get_profile(profile_id) if slow_request_profiler is not None else None
+    if profile is None:
+        return jsonify({'error': f'Profile {profile_id} not found'}), 404
+    if request.args.get('format') == 'collapsed':
+        return Response(SlowRequestProfiler.collapsed(profile), mimetype='text/plain')
+    return jsonify(profile)
+
 @app.errorhandler(404)
 def not_found(error):
     return render_template('index.html'), 404
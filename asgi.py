@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+from app import app, recommendation_engine, slow_request_profiler, parse_limit
+from metrics import REGISTRY, STAGE_SECONDS, MetricFamily
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # asgiref is optional; without it only the async routes are served
+    WsgiToAsgi = None
+
+
+class RecommendationService:
+    """
+    ASGI application serving recommendation requests off the event loop.
+    Scoring runs in a bounded thread pool with a per-request deadline; when every
+    worker is busy and the wait queue is full, requests are rejected with 503 and
+    Retry-After instead of piling up. Other routes are passed to the Flask app.
+    """
+
+    # Routes scored asynchronously; /recommend is only handled here for JSON requests
+    ASYNC_ROUTES = ('/api/recommend', '/recommend')
+
+    MAX_BODY_SIZE = 1 << 20
+
+    def __init__(self, engine, workers: int = 4, queue_size: int = 32, deadline_ms: int = 1000,
+                 max_deadline_ms: int = 10000, retry_after: int = 1, fallback=None, profiler=None):
+        if workers <= 0:
+            raise ValueError(f"Worker count must be positive, got {workers}")
+        self.engine = engine
+        self.workers = workers
+        self.queue_size = queue_size
+        self.deadline_ms = deadline_ms
+        self.max_deadline_ms = max_deadline_ms
+        self.retry_after = retry_after
+        self.fallback = fallback
+        self.profiler = profiler
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='recommend')
+        self._in_flight = 0  # Requests running or queued; only touched on the event loop
+        self.rejected = 0
+        self.partial = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+
+        if (scope['type'] == 'http' and scope['method'] == 'POST' and scope['path'] in self.ASYNC_ROUTES
+                and (scope['path'] == '/api/recommend' or self._is_json(scope))):
+            await self._recommend(scope, receive, send)
+        elif self.fallback is not None:
+            await self.fallback(scope, receive, send)
+        else:
+            await self._send_json(send, 404, {'error': 'Not found'})
+
+    async def _recommend(self, scope, receive, send):
+        """Handle one recommendation request"""
+        started = time.monotonic()
+
+        if self._in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            await self._send_json(send, 503, {'error': 'Server busy, retry later'},
+                                  [(b'retry-after', str(self.retry_after).encode())])
+            return
+
+        self._in_flight += 1
+        try:
+            body = await self._read_body(receive)
+            if body is None:
+                await self._send_json(send, 413, {'error': 'Request body too large'})
+                return
+            try:
+                preferences = json.loads(body) if body else None
+            except ValueError:
+                await self._send_json(send, 400, {'error': 'Invalid JSON'})
+                return
+            if not preferences or not isinstance(preferences, dict):
+                await self._send_json(send, 400, {'error': 'No preferences provided'})
+                return
+
+            try:
+                deadline_ms = min(int(preferences.pop('deadline_ms', self.deadline_ms)), self.max_deadline_ms)
+            except (TypeError, ValueError):
+                await self._send_json(send, 400, {'error': 'deadline_ms must be an integer'})
+                return
+            try:
+                limit = parse_limit(preferences.pop('limit', None))
+            except ValueError as e:
+                await self._send_json(send, 400, {'error': str(e)})
+                return
+
+            # Time spent queued counts against the deadline
+            deadline = started + deadline_ms / 1000
+            loop = asyncio.get_running_loop()
+            recommendations, complete = await loop.run_in_executor(
+                self._executor, self._score, scope['path'], preferences, limit, deadline)
+
+        except ValueError as e:
+            await self._send_json(send, 400, {'error': str(e)})
+            return
+        except Exception as e:
+            self.logger.error(f"Error in async recommend: {e}")
+            await self._send_json(send, 500, {'error': 'An internal error occurred'})
+            return
+        finally:
+            self._in_flight -= 1
+
+        if not complete:
+            self.partial += 1
+        if self.logger.isEnabledFor(logging.DEBUG):
+            elapsed_ms = (time.monotonic() - started) * 1000
+            self.logger.debug(f"Served {len(recommendations)} recommendations in {elapsed_ms:.1f}ms"
+                              f"{'' if complete else ' (partial)'}")
+
+        if scope['path'] == '/recommend':
+            payload = recommendations
+        else:
+            payload = {
+                'recommendations': recommendations,
+                'total_count': len(recommendations),
+                'partial': not complete
+            }
+        serialize_started = time.perf_counter()
+        body = json.dumps(payload).encode('utf-8')
+        STAGE_SECONDS.observe(time.perf_counter() - serialize_started, ('serialize',))
+        await self._send(send, 200, body, [(b'x-partial-results', b'true' if not complete else b'false')])
+
+    def collect_metrics(self) -> List[MetricFamily]:
+        """Metrics collector for the admission queue"""
+        return [
+            ('job_recommendation_async_in_flight', 'gauge', "Async requests running or queued",
+             [({}, self._in_flight)]),
+            ('job_recommendation_async_rejected_total', 'counter', "Async requests rejected with 503",
+             [({}, self.rejected)]),
+            ('job_recommendation_async_partial_total', 'counter', "Async requests answered with partial results",
+             [({}, self.partial)])
+        ]
+
+    def _score(self, path: str, preferences: Dict[str, Any], limit: int,
+               deadline: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """Run on a worker thread; profiled there when slow request profiling is enabled"""
+        if self.profiler is None:
+            return self.engine.recommend_jobs_with_deadline(preferences, limit, deadline)
+        with self.profiler.profile(path, preferences):
+            return self.engine.recommend_jobs_with_deadline(preferences, limit, deadline)
+
+    async def _read_body(self, receive) -> Optional[bytes]:
+        """Read the request body, or return None once it exceeds MAX_BODY_SIZE"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.MAX_BODY_SIZE:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body'):
+                break
+        return b''.join(chunks)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    def _is_json(scope) -> bool:
+        for name, value in scope.get('headers', ()):
+            if name == b'content-type':
+                return value.split(b';')[0].strip().lower() == b'application/json'
+        return False
+
+    @classmethod
+    async def _send_json(cls, send, status: int, payload: Any, headers: List[Tuple[bytes, bytes]] = ()):
+        await cls._send(send, status, json.dumps(payload).encode('utf-8'), headers)
+
+    @staticmethod
+    async def _send(send, status: int, body: bytes, headers: List[Tuple[bytes, bytes]] = ()):
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode())] + list(headers)
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+application = RecommendationService(
+    recommendation_engine,
+    workers=int(os.environ.get("ASYNC_WORKERS", "4")),
+    queue_size=int(os.environ.get("ASYNC_QUEUE_SIZE", "32")),
+    deadline_ms=int(os.environ.get("RECOMMEND_DEADLINE_MS", "1000")),
+    retry_after=int(os.environ.get("RETRY_AFTER_SECONDS", "1")),
+    fallback=WsgiToAsgi(app) if WsgiToAsgi is not None else None,
+    profiler=slow_request_profiler
+)
+REGISTRY.register_collector(application.collect_metrics)
@@ -0,0 +1,198 @@
+"""
+Micro-benchmarks for the matching engine on synthetic catalogs.
+
+For every catalog size this measures:
+  - feed ingestion throughput (JSONL through JobIngestor into an in-memory JobDatabase)
+  - catalog build time and memory per job (tracemalloc, on up to --memory-sample jobs)
+  - recommend_jobs latency percentiles and throughput over a realistic preference mix
+  - the cost per call of each scoring component (_match_skills, _match_values, ...)
+
+Run from the repository root:
+
+    python -m benchmarks.engine_bench --sizes 1k,100k,1m --output results.json
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+from typing import Dict, List, Any, Callable, Optional
+
+from job_data import JobDatabase
+from job_ingest import JobIngestor
+from recommendation_engine import JobRecommendationEngine
+from metrics import PRUNED_JOBS
+from benchmarks.synthetic import CatalogGenerator, parse_sizes, write_jsonl
+from benchmarks.report import percentiles, write_results
+
+
+def component_scorers(engine: JobRecommendationEngine) -> Dict[str, Callable[[Dict[str, Any], Any], float]]:
+    """The scorer _score_components calls for each component, keyed '<component>.<method>'"""
+    return {
+        'skills._match_skills': lambda prefs, record: engine._match_skills(
+            prefs['skills'], prefs['skill_matches'], record.skills),
+        'title._categorical_score': lambda prefs, record: engine._categorical_score(prefs, 'title', record.title),
+        'location._categorical_score': lambda prefs, record: engine._categorical_score(
+            prefs, 'location', record.location),
+        'industry._categorical_score': lambda prefs, record: engine._categorical_score(
+            prefs, 'industry', record.industry),
+        'company_size._categorical_score': lambda prefs, record: engine._categorical_score(
+            prefs, 'company_size', record.company_size),
+        'values._match_values': lambda prefs, record: engine._match_values(prefs['values'], record.values),
+        'salary._match_salary': lambda prefs, record: engine._match_salary(prefs['min_salary'], record.salary_range),
+        # Unindexed string matchers, used when checking cached results against new jobs
+        'title._match_titles': lambda prefs, record: engine._match_titles(prefs['titles'], record.title),
+        'location._match_locations': lambda prefs, record: engine._match_locations(
+            prefs['locations'], record.location),
+        'industry._match_industries': lambda prefs, record: engine._match_industries(
+            prefs['industries'], record.industry)
+    }
+
+
+def bench_ingest(generator: CatalogGenerator, size: int, chunk_size: int) -> Dict[str, float]:
+    """Stream a synthetic JSONL feed into an empty in-memory catalog"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'feed.jsonl')
+        write_jsonl(generator.iter_jobs(size), path)
+        report = JobIngestor(JobDatabase(jobs=[]), chunk_size=chunk_size).ingest(path)
+    return {
+        'ingest_rows_per_second': report['rows_per_second'],
+        'ingest_seconds': report['seconds']
+    }
+
+
+def bench_memory(generator: CatalogGenerator, size: int, backend: str) -> Dict[str, float]:
+    """Memory held by the catalog, its indexes, the snapshot and the scoring backend, per job"""
+    tracemalloc.start()
+    try:
+        engine = JobRecommendationEngine(JobDatabase(jobs=generator.iter_jobs(size)), backend=backend)
+        engine.recommend_jobs({'skills': ['figma']}, limit=1)  # Builds the snapshot and backend arrays
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'memory_bytes_per_job': current / size,
+        'memory_peak_bytes_per_job': peak / size,
+        'memory_sample_jobs': size
+    }
+
+
+def bench_latency(engine: JobRecommendationEngine, preference_sets: List[Dict[str, Any]], limit: int,
+                  warmup: int) -> Dict[str, float]:
+    """Time recommend_jobs over a preference mix (the engine must not have a result cache)"""
+    for preferences in preference_sets[:warmup]:
+        engine.recommend_jobs(preferences, limit)
+
+    latencies = []
+    started = time.perf_counter()
+    for preferences in preference_sets:
+        request_started = time.perf_counter()
+        engine.recommend_jobs(preferences, limit)
+        latencies.append((time.perf_counter() - request_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    metrics = {f"latency_ms.{name}": value for name, value in percentiles(latencies).items()}
+    metrics['qps'] = len(latencies) / elapsed
+    return metrics
+
+
+def bench_components(engine: JobRecommendationEngine, preference_sets: List[Dict[str, Any]],
+                     max_calls: int) -> Dict[str, float]:
+    """
+    Nanoseconds per call of each component scorer, over the candidates of each preference set
+
+    Every scorer sees the same (preferences, record) pairs; the cost of an empty
+    loop over those pairs is subtracted.
+    """
+    snapshot = engine.job_db.snapshot()
+    records = snapshot.records
+    pairs = []
+    term_cache = {}
+    for preferences in preference_sets:
+        prefs = engine._compile_preferences(preferences, term_cache)
+        candidates = engine._generate_candidates(prefs, term_cache)
+        if candidates is None:
+            candidates = range(len(records))
+        budget = max_calls - len(pairs)
+        pairs.extend((prefs, records[position]) for position in candidates[:budget])
+        if len(pairs) >= max_calls:
+            break
+    if not pairs:
+        return {}
+
+    def run(scorer) -> int:
+        started = time.perf_counter_ns()
+        for prefs, record in pairs:
+            scorer(prefs, record)
+        return time.perf_counter_ns() - started
+
+    baseline = run(lambda prefs, record: 0.0)
+    metrics = {'component_calls': len(pairs)}
+    for name, scorer in component_scorers(engine).items():
+        metrics[f"component_ns.{name}"] = max(run(scorer) - baseline, 0) / len(pairs)
+    return metrics
+
+
+def bench_size(generator: CatalogGenerator, size: int, args) -> Dict[str, float]:
+    metrics = {}
+    if not args.skip_ingest:
+        metrics.update(bench_ingest(generator, size, args.chunk_size))
+
+    started = time.perf_counter()
+    engine = JobRecommendationEngine(JobDatabase(jobs=generator.iter_jobs(size)), backend=args.backend,
+                                     shards=args.shards, pruning=args.pruning)
+    engine.job_db.snapshot()
+    metrics['build_seconds'] = time.perf_counter() - started
+
+    preference_sets = generator.preferences(args.queries)
+    pruned_before = PRUNED_JOBS.value()
+    metrics.update(bench_latency(engine, preference_sets, args.limit, args.warmup))
+    if args.pruning:
+        metrics['pruned_jobs_per_query'] = ((PRUNED_JOBS.value() - pruned_before)
+                                          / (args.queries + min(args.warmup, args.queries)))
+    metrics.update(bench_components(engine, preference_sets, args.component_calls))
+    del engine
+
+    if not args.skip_memory:
+        metrics.update(bench_memory(generator, min(size, args.memory_sample), args.backend))
+    return metrics
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the matching engine on synthetic catalogs")
+    parser.add_argument('--sizes', default='1k,100k,1m', help="Catalog sizes (default: 1k,100k,1m)")
+    parser.add_argument('--queries', type=int, default=200, help="Timed recommend_jobs calls per size")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--backend', default='python', choices=JobRecommendationEngine.BACKENDS)
+    parser.add_argument('--shards', type=int, default=0)
+    parser.add_argument('--pruning', action='store_true', help="Use pruned (early-termination) scoring")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Ingestion chunk size")
+    parser.add_argument('--component-calls', type=int, default=200000,
+                        help="(preferences, job) pairs timed per component scorer")
+    parser.add_argument('--memory-sample', type=int, default=100000,
+                        help="Largest catalog measured under tracemalloc (it slows allocation down)")
+    parser.add_argument('--skip-ingest', action='store_true')
+    parser.add_argument('--skip-memory', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    generator = CatalogGenerator(args.seed)
+
+    metrics = {}
+    for size in parse_sizes(args.sizes):
+        print(f"Benchmarking {size} jobs...", file=sys.stderr)
+        for name, value in bench_size(generator, size, args).items():
+            metrics[f"{size}.{name}"] = value
+
+    config = {key: value for key, value in vars(args).items() if key != 'output'}
+    write_results('engine', config, metrics, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Closed-loop load driver for POST /api/recommend.
+
+Each of --concurrency workers sends requests back to back, drawing bodies
+from the synthetic preference mix. It runs against a live server (Flask,
+gunicorn or the ASGI entry point), or against the Flask app in process
+through its test client when no --url is given:
+
+    python -m benchmarks.load_test --url http://localhost:5000 --requests 2000 --concurrency 8
+    python -m benchmarks.load_test --jobs 100k --requests 500
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import http.client
+from urllib.parse import urlsplit
+from typing import Dict, List, Any, Optional, Tuple
+
+from benchmarks.synthetic import CatalogGenerator, parse_sizes, write_jsonl
+from benchmarks.report import percentiles, write_results
+
+
+class HttpClient:
+    """Posts JSON bodies over one persistent connection (reopened when the server closes it)"""
+
+    def __init__(self, url: str, timeout: float):
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.base_path = parts.path.rstrip('/')
+
+    def post(self, path: str, body: bytes) -> Tuple[int, bytes]:
+        try:
+            self.connection.request('POST', self.base_path + path, body, {'Content-Type': 'application/json'})
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            raise
+
+
+class InProcessClient:
+    """Posts JSON bodies to the Flask app through its test client"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path: str, body: bytes) -> Tuple[int, bytes]:
+        response = self.client.post(path, data=body, content_type='application/json')
+        return response.status_code, response.get_data()
+
+
+def run_load(make_client, path: str, bodies: List[bytes], total: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Send `total` requests from `concurrency` threads, cycling through `bodies`
+
+    Returns:
+        Latencies in milliseconds, status code counts, transport errors, partial
+        responses and the wall clock time of the run
+    """
+    lock = threading.Lock()
+    issued = iter(range(total))
+    latencies = []
+    statuses = {}
+    state = {'errors': 0, 'partial': 0}
+
+    def worker():
+        client = make_client()
+        while True:
+            with lock:
+                i = next(issued, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            try:
+                status, body = client.post(path, bodies[i % len(bodies)])
+            except Exception:
+                with lock:
+                    state['errors'] += 1
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            partial = status == 200 and b'"partial": true' in body
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+                state['partial'] += partial
+
+    threads = [threading.Thread(target=worker, name=f"load-{n}") for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {'latencies': latencies, 'statuses': statuses, 'errors': state['errors'],
+            'partial': state['partial'], 'seconds': time.perf_counter() - started}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test POST /api/recommend")
+    parser.add_argument('--url', help="Server base URL; the Flask app is driven in process when omitted")
+    parser.add_argument('--path', default='/api/recommend')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--distinct', type=int, default=0,
+                        help="Distinct preference sets to cycle through (default: one per request, "
+                             "so the result cache rarely hits)")
+    parser.add_argument('--limit', type=int, help="'limit' sent with every request (ASGI endpoint only)")
+    parser.add_argument('--deadline-ms', type=int, help="'deadline_ms' sent with every request (ASGI endpoint only)")
+    parser.add_argument('--jobs', help="In process only: also load this many synthetic jobs (e.g. 100k)")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    generator = CatalogGenerator(args.seed)
+    bodies = []
+    for preferences in generator.preferences(args.distinct or args.requests):
+        if args.limit is not None:
+            preferences['limit'] = args.limit
+        if args.deadline_ms is not None:
+            preferences['deadline_ms'] = args.deadline_ms
+        bodies.append(json.dumps(preferences).encode('utf-8'))
+
+    if args.url:
+        def make_client():
+            return HttpClient(args.url, args.timeout)
+    else:
+        logging.basicConfig(level=logging.WARNING)
+        with tempfile.TemporaryDirectory() as tmp:
+            if args.jobs:
+                feed = os.path.join(tmp, 'feed.jsonl')
+                write_jsonl(generator.iter_jobs(parse_sizes(args.jobs)[0]), feed)
+                os.environ['JOB_FEED'] = feed
+            from app import app  # Builds the catalog from the environment, like the server would
+        logging.getLogger().setLevel(logging.WARNING)
+
+        def make_client():
+            return InProcessClient(app)
+
+    print(f"Sending {args.requests} requests with concurrency {args.concurrency}...", file=sys.stderr)
+    result = run_load(make_client, args.path, bodies, args.requests, args.concurrency)
+
+    completed = len(result['latencies'])
+    metrics = {f"latency_ms.{name}": value for name, value in percentiles(result['latencies']).items()}
+    metrics['qps'] = completed / result['seconds'] if result['seconds'] else 0.0
+    metrics['error_rate'] = (args.requests - result['statuses'].get(200, 0)) / args.requests if args.requests else 0.0
+    metrics['partial_rate'] = result['partial'] / completed if completed else 0.0
+    metrics['transport_errors'] = result['errors']
+    for status, count in result['statuses'].items():
+        metrics[f"status.{status}"] = count
+
+    config = {key: value for key, value in vars(args).items() if key != 'output'}
+    write_results('load', config, metrics, args.output)
+    return 0 if result['statuses'].get(200) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Recall and speed of approximate (MinHash LSH) candidate retrieval.
+
+For every catalog size, skill-heavy queries (skill searches and full profiles) are
+run through an exact engine and through engines with LSH tables of each
+`--configs` shape (bands x rows). Reported per shape:
+  - recall: share of the exact top `--limit` jobs the approximate results contain
+  - tied_recall: the same, counting a different job with an equal score as a hit
+  - candidates_per_query and latency percentiles, next to the exact ones
+  - speedup: exact mean latency / approximate mean latency
+  - index_build_seconds: first sync of the tables with the catalog
+
+Run from the repository root:
+
+    python -m benchmarks.lsh_bench --sizes 10k,100k --configs 8x2,16x2,32x2,16x3
+"""
+import sys
+import time
+import logging
+import argparse
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
+
+from job_data import JobDatabase
+from recommendation_engine import JobRecommendationEngine
+from minhash_lsh import MinHashLSH
+from benchmarks.synthetic import CatalogGenerator, parse_sizes
+from benchmarks.engine_bench import bench_latency
+from benchmarks.report import write_results
+
+
+def parse_configs(configs: str) -> List[Tuple[int, int]]:
+    """Parse LSH table shapes, e.g. '16x2,32x2' -> [(16, 2), (32, 2)]"""
+    shapes = []
+    for config in configs.split(','):
+        config = config.strip().lower()
+        if config:
+            bands, rows = config.split('x')
+            shapes.append((int(bands), int(rows)))
+    return shapes
+
+
+def run_queries(engine: JobRecommendationEngine, preference_sets: List[Dict[str, Any]],
+                limit: int) -> Tuple[List[List[Dict[str, Any]]], float]:
+    """Results of every preference set and the mean number of scored candidates"""
+    results = []
+    candidates = 0
+    for preferences in preference_sets:
+        results.append(engine.recommend_jobs(preferences, limit))
+        candidates += engine.last_request_stats().get('candidates', 0)
+    return results, candidates / len(preference_sets)
+
+
+def recall(exact: List[List[Dict[str, Any]]], approximate: List[List[Dict[str, Any]]]) -> Dict[str, float]:
+    """Mean share of the exact results found by the approximate ones, by job and by score"""
+    found = tied = total = 0
+    for expected, got in zip(exact, approximate):
+        found += len({result['job_id'] for result in expected} & {result['job_id'] for result in got})
+        scores = Counter(result['match_score'] for result in got)
+        tied += sum((Counter(result['match_score'] for result in expected) & scores).values())
+        total += len(expected)
+    return {'recall': found / total if total else 1.0, 'tied_recall': tied / total if total else 1.0}
+
+
+def bench_size(generator: CatalogGenerator, size: int, args) -> Dict[str, float]:
+    job_db = JobDatabase(jobs=generator.iter_jobs(size))
+    preference_sets = [preferences for preferences in generator.preferences(args.queries * 3)
+                       if preferences.get('skills')][:args.queries]
+
+    exact_engine = JobRecommendationEngine(job_db, backend=args.backend)
+    exact, exact_candidates = run_queries(exact_engine, preference_sets, args.limit)
+    exact_latency = bench_latency(exact_engine, preference_sets, args.limit, args.warmup)
+    metrics = {'queries': len(preference_sets), 'exact.candidates_per_query': exact_candidates}
+    metrics.update({f"exact.{name}": value for name, value in exact_latency.items()})
+
+    for bands, rows in parse_configs(args.configs):
+        name = f"{bands}x{rows}"
+        lsh = MinHashLSH(bands=bands, rows=rows, seed=args.seed)
+        engine = JobRecommendationEngine(job_db, backend=args.backend, lsh=lsh)
+        started = time.perf_counter()
+        lsh.sync(job_db, job_db.snapshot(), engine._lsh_tokens)
+        metrics[f"{name}.index_build_seconds"] = time.perf_counter() - started
+
+        approximate, candidates = run_queries(engine, preference_sets, args.limit)
+        latency = bench_latency(engine, preference_sets, args.limit, args.warmup)
+        metrics.update({f"{name}.{metric}": value for metric, value in recall(exact, approximate).items()})
+        metrics[f"{name}.candidates_per_query"] = candidates
+        metrics.update({f"{name}.{metric}": value for metric, value in latency.items()})
+        metrics[f"{name}.speedup"] = exact_latency['latency_ms.mean'] / latency['latency_ms.mean']
+        print(f"  {name}: recall {metrics[f'{name}.recall']:.3f}, speedup {metrics[f'{name}.speedup']:.2f}x",
+              file=sys.stderr)
+    return metrics
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark approximate LSH candidate retrieval")
+    parser.add_argument('--sizes', default='10k,100k', help="Catalog sizes (default: 10k,100k)")
+    parser.add_argument('--configs', default='8x2,16x2,32x2,16x3',
+                        help="LSH table shapes as BANDSxROWS (default: 8x2,16x2,32x2,16x3)")
+    parser.add_argument('--queries', type=int, default=200, help="Skill-heavy queries per size")
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--backend', default='python', choices=JobRecommendationEngine.BACKENDS)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    generator = CatalogGenerator(args.seed)
+
+    metrics = {}
+    for size in parse_sizes(args.sizes):
+        print(f"Benchmarking {size} jobs...", file=sys.stderr)
+        for name, value in bench_size(generator, size, args).items():
+            metrics[f"{size}.{name}"] = value
+
+    config = {key: value for key, value in vars(args).items() if key != 'output'}
+    write_results('lsh', config, metrics, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Machine-readable benchmark results.
+
+Every benchmark writes one JSON document: environment metadata (commit,
+interpreter, CPU count) and a flat `metrics` mapping of metric name -> number.
+`python -m benchmarks.report compare OLD.json NEW.json` lines up two runs,
+e.g. from two commits, and flags metrics that got worse by more than a threshold.
+"""
+import os
+import sys
+import json
+import math
+import time
+import platform
+import argparse
+import subprocess
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metric name suffixes where a larger number is better; everything else (latencies,
+# bytes, seconds) is better when smaller
+HIGHER_IS_BETTER = ('per_second', 'qps', 'recall', 'speedup')
+
+
+def percentiles(samples: List[float], points=(50, 90, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles plus mean and max of a list of samples"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    stats = {f"p{point}": ordered[max(0, math.ceil(point / 100 * len(ordered)) - 1)] for point in points}
+    stats['mean'] = sum(ordered) / len(ordered)
+    stats['max'] = ordered[-1]
+    return stats
+
+
+def environment() -> Dict[str, Any]:
+    """Describe where a benchmark ran, so results from different machines aren't compared blindly"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def write_results(benchmark: str, config: Dict[str, Any], metrics: Dict[str, float],
+                  output: Optional[str] = None) -> Dict[str, Any]:
+    """Write a result document to `output` (stdout when None) and return it"""
+    document = {
+        'benchmark': benchmark,
+        'environment': environment(),
+        'config': config,
+        'metrics': {name: round(value, 6) if isinstance(value, float) else value
+                    for name, value in sorted(metrics.items())}
+    }
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+            f.write('\n')
+    else:
+        json.dump(document, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return document
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare the metrics of two result documents
+
+    Returns:
+        One row per metric present in both runs, with the relative change and whether
+        it is a regression (worse by more than `threshold`)
+    """
+    rows = []
+    for name, old_value in old['metrics'].items():
+        new_value = new['metrics'].get(name)
+        if not isinstance(old_value, (int, float)) or not isinstance(new_value, (int, float)):
+            continue
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        rows.append({'metric': name, 'old': old_value, 'new': new_value,
+                     'change': round(change, 4), 'regression': worse > threshold})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compare_parser = subparsers.add_parser('compare', help="Compare OLD and NEW results")
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help="Relative change counted as a regression (default 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.old, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+
+    rows = compare(old, new, args.threshold)
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['metric']:<60} {row['old']:>14.6g} {row['new']:>14.6g} {row['change']:>+8.1%}{flag}")
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
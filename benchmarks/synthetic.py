@@ -0,0 +1,189 @@
+"""
+Synthetic job catalogs and candidate preference mixes for benchmarks.
+
+Jobs are generated from the sample catalog in data/sample_jobs.jsonl: every
+synthetic job copies the schema of a sample job and draws its field values
+from the vocabulary of the whole sample, so term frequencies, US/India salary
+scales and list lengths stay close to the real data as the catalog grows.
+"""
+import sys
+import json
+import random
+import argparse
+from typing import Dict, List, Any, Iterator, Optional
+
+from job_data import SAMPLE_JOBS_FILE
+from job_ingest import iter_jsonl
+
+# Suffixes accepted in catalog sizes on the benchmark command lines ('1k', '100k', '1m')
+SIZE_SUFFIXES = {'k': 1000, 'm': 1000000}
+
+# Extra terms that do not occur in the sample, so some skills/titles only match partially
+EXTRA_SKILLS = ['Python', 'SQL', 'Java', 'Data Visualization', 'Accessibility', 'Design Ops',
+                'Motion Design', 'A/B Testing', 'Product Strategy', 'Illustration']
+EXTRA_TITLES = ['Product Designer', 'UX Designer', 'Interaction Designer', 'Visual Designer',
+                'UX Researcher', 'Senior Product Designer', 'Design Lead']
+
+# Share of each preference profile shape in a generated request mix
+PREFERENCE_MIX = {
+    'skills_only': 0.25,       # Skill search, nothing else
+    'title_location': 0.25,    # Title and location, e.g. "UX Designer in Bangalore"
+    'full_profile': 0.35,      # Form submission with most fields filled in
+    'broad': 0.15              # No indexable terms: every job is scored
+}
+
+
+def parse_sizes(sizes: str) -> List[int]:
+    """Parse a comma separated list of catalog sizes, e.g. '1k,100k,1m' or '25000'"""
+    parsed = []
+    for size in sizes.split(','):
+        size = size.strip().lower()
+        if size:
+            multiplier = SIZE_SUFFIXES.get(size[-1], 1)
+            parsed.append(int(float(size[:-1] if multiplier > 1 else size) * multiplier))
+    return parsed
+
+
+def load_sample_jobs(path: str = SAMPLE_JOBS_FILE) -> List[Dict[str, Any]]:
+    """Load the sample catalog the synthetic jobs are modeled on"""
+    jobs = []
+    for _, job in iter_jsonl(path):
+        if isinstance(job, Exception):
+            raise job
+        jobs.append(job)
+    return jobs
+
+
+class CatalogGenerator:
+    """Generates deterministic synthetic jobs and preference sets from the sample vocabulary"""
+
+    def __init__(self, seed: int = 42, sample_jobs: Optional[List[Dict[str, Any]]] = None):
+        self.seed = seed
+        self.sample_jobs = sample_jobs if sample_jobs is not None else load_sample_jobs()
+        if not self.sample_jobs:
+            raise ValueError("Sample catalog is empty")
+
+        jobs = self.sample_jobs
+        self.titles = sorted({job['title'] for job in jobs} | set(EXTRA_TITLES))
+        self.companies = sorted({job['company'] for job in jobs})
+        self.skills = sorted({skill for job in jobs for skill in job['required_skills']} | set(EXTRA_SKILLS))
+        self.values = sorted({value for job in jobs for value in job['values_promoted']})
+        self.company_sizes = sorted({job['company_size'] for job in jobs})
+        self.industries = sorted({job['industry'] for job in jobs})
+        self.employment_types = sorted({job['employment_type'] for job in jobs})
+        self.role_levels = sorted({job['role_level'] for job in jobs})
+        self.experience = sorted({job['experience_required'] for job in jobs})
+
+        # Locations and salary ranges are kept per market so pay scales stay consistent
+        self.markets = {}
+        for job in jobs:
+            market = 'india' if 'india' in job['location'].lower() else 'usa'
+            entry = self.markets.setdefault(market, {'locations': set(), 'salaries': []})
+            entry['locations'].add(job['location'])
+            entry['salaries'].append(job['salary_range'])
+        for entry in self.markets.values():
+            entry['locations'] = sorted(entry['locations'])
+        self.market_names = sorted(self.markets)
+        self.market_weights = [sum(1 for job in jobs if ('india' in job['location'].lower()) == (market == 'india'))
+                               for market in self.market_names]
+
+    def iter_jobs(self, count: int, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield `count` synthetic jobs; the same seed and positions always give the same jobs"""
+        rng = random.Random(f"{self.seed}-jobs-{start}")
+        for i in range(start, start + count):
+            market = self.markets[rng.choices(self.market_names, self.market_weights)[0]]
+            low, high = rng.choice(market['salaries'])
+            scale = rng.uniform(0.8, 1.25)
+            yield {
+                'job_id': f"SYN-{i:07d}",
+                'title': rng.choice(self.titles),
+                'company': f"{rng.choice(self.companies)} {i % 997}",
+                'location': rng.choice(market['locations']),
+                'salary_range': [int(low * scale) // 1000 * 1000, int(high * scale) // 1000 * 1000],
+                'employment_type': rng.choice(self.employment_types),
+                'company_size': rng.choice(self.company_sizes),
+                'industry': rng.choice(self.industries),
+                'required_skills': rng.sample(self.skills, rng.randint(2, 5)),
+                'values_promoted': rng.sample(self.values, rng.randint(1, 3)),
+                'experience_required': rng.choice(self.experience),
+                'role_level': rng.choice(self.role_levels)
+            }
+
+    def jobs(self, count: int) -> List[Dict[str, Any]]:
+        return list(self.iter_jobs(count))
+
+    def preferences(self, count: int) -> List[Dict[str, Any]]:
+        """Generate `count` preference sets following PREFERENCE_MIX"""
+        rng = random.Random(f"{self.seed}-preferences")
+        shapes = list(PREFERENCE_MIX)
+        weights = [PREFERENCE_MIX[shape] for shape in shapes]
+        return [self._preference_set(rng, rng.choices(shapes, weights)[0]) for _ in range(count)]
+
+    def _preference_set(self, rng: random.Random, shape: str) -> Dict[str, Any]:
+        market_name = rng.choice(self.market_names)
+        market = self.markets[market_name]
+        # Salaries are asked for in the market's currency, like the jobs there pay
+        currency = {'salary_currency': 'INR'} if market_name == 'india' else {}
+        locations = market['locations'] + (['Remote'] if 'Remote in USA' in market['locations'] else [])
+
+        if shape == 'skills_only':
+            return {'skills': self._terms(rng, self.skills, 1, 4)}
+        if shape == 'title_location':
+            return {'titles': self._terms(rng, self.titles, 1, 2), 'locations': self._terms(rng, locations, 1, 2)}
+        if shape == 'broad':
+            low, _ = rng.choice(market['salaries'])
+            return {'min_salary': low, 'role_types': [rng.choice(self.employment_types)], **currency}
+
+        low, high = rng.choice(market['salaries'])
+        return {
+            'skills': self._terms(rng, self.skills, 2, 5),
+            'titles': self._terms(rng, self.titles, 1, 3),
+            'locations': self._terms(rng, locations, 1, 2),
+            'industries': self._terms(rng, self.industries, 1, 2),
+            'company_size': rng.sample(self.company_sizes, rng.randint(1, 2)),
+            'values': rng.sample(self.values, rng.randint(1, 3)),
+            'role_level': [rng.choice(self.role_levels)],
+            'min_salary': rng.randrange(low, high, 1000),
+            **currency
+        }
+
+    @staticmethod
+    def _terms(rng: random.Random, pool: List[str], low: int, high: int) -> List[str]:
+        """Pick terms the way people type them: varying case, sometimes only a word of the term"""
+        terms = []
+        for term in rng.sample(pool, min(rng.randint(low, high), len(pool))):
+            roll = rng.random()
+            if roll < 0.15:
+                term = term.lower()
+            elif roll < 0.25 and ' ' in term:
+                term = rng.choice([word for word in term.split() if len(word) > 2] or [term])
+            terms.append(term)
+        return terms
+
+
+def write_jsonl(jobs: Iterator[Dict[str, Any]], path: str) -> int:
+    """Write jobs as a JSON Lines feed and return the number written"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for job in jobs:
+            f.write(json.dumps(job))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic job feed (JSON Lines)")
+    parser.add_argument('path', help="Output .jsonl file")
+    parser.add_argument('--jobs', default='100k', help="Number of jobs (e.g. 1k, 100k, 1m or 25000)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    count = parse_sizes(args.jobs)[0]
+    written = write_jsonl(CatalogGenerator(args.seed).iter_jobs(count), args.path)
+    print(f"Wrote {written} jobs to {args.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+from typing import Dict, List, Iterable, Iterator, Optional, Tuple
+
+# Bit offsets set in each byte value, for expanding a bitmap into positions
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+class BitmapIndex:
+    """
+    One bitmap of catalog positions per value of a categorical field.
+    Bitmaps are bytearrays with one bit per position, so adding or removing a job is
+    O(1); queries turn them into Python ints, whose AND/OR run word by word in C.
+    """
+
+    def __init__(self):
+        self._bitmaps = {}  # value -> bytearray, bit i set when the job at position i has the value
+        self._counts = {}  # value -> number of set bits
+
+    def __len__(self) -> int:
+        return len(self._bitmaps)
+
+    def add(self, value: str, position: int):
+        bitmap = self._bitmaps.get(value)
+        if bitmap is None:
+            bitmap = self._bitmaps[value] = bytearray()
+        index, bit = position >> 3, 1 << (position & 7)
+        if index >= len(bitmap):
+            # Grow geometrically so appending jobs one by one stays linear
+            bitmap.extend(bytes(max(index + 1 - len(bitmap), len(bitmap) // 2)))
+        if not bitmap[index] & bit:
+            bitmap[index] |= bit
+            self._counts[value] = self._counts.get(value, 0) + 1
+
+    def discard(self, value: str, position: int):
+        bitmap = self._bitmaps.get(value)
+        index, bit = position >> 3, 1 << (position & 7)
+        if bitmap is None or index >= len(bitmap) or not bitmap[index] & bit:
+            return
+        bitmap[index] &= ~bit & 0xFF
+        self._counts[value] -= 1
+        if not self._counts[value]:
+            del self._bitmaps[value], self._counts[value]
+
+    def values(self) -> List[str]:
+        return list(self._bitmaps)
+
+    def count(self, value: str) -> int:
+        """Number of positions carrying `value`"""
+        return self._counts.get(value, 0)
+
+    def bitmap(self, value: str) -> int:
+        """Positions carrying `value` as an int bitmap (bit i = position i)"""
+        bitmap = self._bitmaps.get(value)
+        return int.from_bytes(bitmap, 'little') if bitmap is not None else 0
+
+    def union(self, values: Iterable[str]) -> int:
+        """Positions carrying any of `values`"""
+        mask = 0
+        for value in values:
+            mask |= self.bitmap(value)
+        return mask
+
+    def items(self) -> Iterator[Tuple[str, bytes]]:
+        for value, bitmap in self._bitmaps.items():
+            yield value, bytes(bitmap)
+
+    @classmethod
+    def from_bytes(cls, bitmaps: Dict[str, bytes]) -> 'BitmapIndex':
+        index = cls()
+        index._bitmaps = {value: bytearray(bitmap) for value, bitmap in bitmaps.items()}
+        index._counts = {value: int.from_bytes(bitmap, 'little').bit_count() for value, bitmap in bitmaps.items()}
+        return index
+
+
+def bitmap_positions(mask: int, size: int, candidates: Optional[Iterable[int]] = None) -> List[int]:
+    """
+    Positions below `size` whose bit is set in `mask`, in ascending order
+
+    With `candidates` (ascending positions), only those are tested.
+    """
+    data = (mask & ((1 << size) - 1)).to_bytes((size + 7) >> 3, 'little')
+    if candidates is not None:
+        return [position for position in candidates if data[position >> 3] >> (position & 7) & 1]
+    positions = []
+    for index, byte in enumerate(data):
+        if byte:
+            base = index << 3
+            positions.extend(base + bit for bit in _BYTE_BITS[byte])
+    return positions
+
+
+def partition_positions(mask: int, size: int, candidates: Iterable[int]) -> Tuple[List[int], List[int]]:
+    """Split ascending `candidates` (all below `size`) into those whose bit is set in `mask` and the rest"""
+    data = (mask & ((1 << size) - 1)).to_bytes((size + 7) >> 3, 'little')
+    passing, failing = [], []
+    for position in candidates:
+        (passing if data[position >> 3] >> (position & 7) & 1 else failing).append(position)
+    return passing, failing
@@ -0,0 +1,435 @@
+import os
+import sys
+import json
+import math
+import mmap
+import struct
+import logging
+import argparse
+from array import array
+from typing import Dict, List, Any, Optional, Tuple, Callable, Iterator
+
+from job_data import JobDatabase, JobRecord
+from bitmap_index import BitmapIndex
+from chunked_column import ChunkedColumn
+
+MAGIC = b'JOBSNAP1'
+FORMAT_VERSION = 4
+ALIGNMENT = 8
+
+# Single-valued normalized fields stored as string table ids
+CATEGORICAL_FIELDS = ['title', 'location', 'industry', 'company_size', 'currency']
+
+# Multi-valued normalized fields stored as (offsets, string ids) pairs
+SET_FIELDS = ['skills', 'values']
+
+# Overlay value of mapped positions that still hold the item from the file
+_UNCHANGED = object()
+
+
+def _encode_id(job_id: Any) -> str:
+    """Job ids are stored JSON-encoded so non-string ids survive the round trip"""
+    return json.dumps(job_id)
+
+
+def write_snapshot(job_db: JobDatabase, path: str) -> int:
+    """
+    Write the catalog of `job_db` to a binary snapshot file (removed jobs are left out)
+
+    Layout: magic, directory offset, then 8-byte aligned sections (columnar arrays,
+    a string table, per-field postings and the original job JSON), then a JSON
+    directory of section offsets. The file is written next to `path` and renamed
+    into place, so readers never see a partial snapshot.
+
+    Returns:
+        Number of jobs written
+    """
+    snapshot = job_db.snapshot()
+    jobs = [job for job in snapshot.jobs if job is not None]
+    records = [JobRecord(position, job) for position, job in enumerate(jobs)]
+    strings = {}
+
+    def string_id(value: str) -> int:
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(strings)
+        return sid
+
+    sections = {}
+    for field in CATEGORICAL_FIELDS:
+        sections[field] = array('I', (string_id(getattr(record, field)) for record in records))
+
+    encoded_ids = [_encode_id(job.get('job_id')) for job in jobs]
+    sections['job_id'] = array('I', (string_id(job_id) for job_id in encoded_ids))
+    sections['job_id.order'] = array('I', sorted(range(len(jobs)), key=encoded_ids.__getitem__))
+
+    sections['salary.flag'] = array('B', (record.salary_range is not None for record in records))
+    sections['salary.min'] = array('q', (record.salary_range[0] if record.salary_range else 0 for record in records))
+    sections['salary.max'] = array('q', (record.salary_range[1] if record.salary_range else 0 for record in records))
+
+    sections['expires_at'] = array('d', (math.nan if record.expires_at is None else record.expires_at
+                                         for record in records))
+    expiring = [record for record in records if record.expires_at is not None]
+    expiring.sort(key=lambda record: (record.expires_at, record.position))
+    sections['expiry.order'] = array('I', (record.position for record in expiring))
+
+    for field in SET_FIELDS:
+        offsets, ids = array('Q', [0]), array('I')
+        for record in records:
+            ids.extend(sorted(string_id(term) for term in getattr(record, field)))
+            offsets.append(len(ids))
+        sections[f'{field}.offsets'], sections[f'{field}.ids'] = offsets, ids
+
+    # Inverted indexes: term -> ascending positions, in the same shape as JobDatabase._index
+    for name in JobDatabase.INDEXED_FIELDS:
+        postings = {}
+        for position, record in enumerate(records):
+            value = getattr(record, name)
+            for term in value if isinstance(value, frozenset) else [value]:
+                if term:
+                    postings.setdefault(term, array('I')).append(position)
+        terms, offsets, positions = array('I'), array('Q', [0]), array('I')
+        for term, term_positions in postings.items():
+            terms.append(string_id(term))
+            positions.extend(term_positions)
+            offsets.append(len(positions))
+        sections[f'postings.{name}.terms'] = terms
+        sections[f'postings.{name}.offsets'] = offsets
+        sections[f'postings.{name}.positions'] = positions
+
+    # Filter bitmaps: value -> one bit per position, as kept by JobDatabase
+    for field in JobDatabase.FILTER_FIELDS:
+        bitmaps = BitmapIndex()
+        for position, job in enumerate(jobs):
+            value = JobDatabase.filter_value(job, field)
+            if value:
+                bitmaps.add(value, position)
+        values, bitmap_data = zip(*bitmaps.items()) if len(bitmaps) else ((), ())
+        sections[f'bitmaps.{field}.values'] = array('I', (string_id(value) for value in values))
+        sections[f'bitmaps.{field}.offsets'], sections[f'bitmaps.{field}.data'] = _blob_table(bitmap_data)
+
+    sections['jobs.offsets'], sections['jobs.data'] = _blob_table(
+        json.dumps(job, separators=(',', ':')).encode('utf-8') for job in jobs)
+    sections['strings.offsets'], sections['strings.data'] = _blob_table(
+        value.encode('utf-8') for value in strings)
+
+    directory = {'format': FORMAT_VERSION, 'byteorder': sys.byteorder, 'count': len(records), 'sections': {}}
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', 0))
+        for name, data in sections.items():
+            f.write(b'\0' * (-f.tell() % ALIGNMENT))
+            typecode = data.typecode if isinstance(data, array) else 'B'
+            directory['sections'][name] = [f.tell(), len(data) * (data.itemsize if isinstance(data, array) else 1),
+                                           typecode]
+            f.write(data)
+        directory_offset = f.tell()
+        f.write(json.dumps(directory).encode('utf-8'))
+        f.seek(len(MAGIC))
+        f.write(struct.pack('<Q', directory_offset))
+    os.replace(temp_path, path)
+    return len(records)
+
+
+def _blob_table(blobs) -> Tuple[array, bytes]:
+    """Concatenate byte strings into (offsets, data); item i is data[offsets[i]:offsets[i + 1]]"""
+    offsets = array('Q', [0])
+    chunks = []
+    size = 0
+    for blob in blobs:
+        chunks.append(blob)
+        size += len(blob)
+        offsets.append(size)
+    return offsets, b''.join(chunks)
+
+
+class MappedJobRecord(JobRecord):
+    """JobRecord read from a snapshot; the original job dict is decoded from the file on access"""
+
+    __slots__ = ('_catalog',)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached while the `job` slot is unset, i.e. for jobs still in the file
+        if name == 'job':
+            return self._catalog.job(self.position)
+        raise AttributeError(name)
+
+
+class MappedCatalog:
+    """
+    Read-only view of a catalog snapshot file through mmap.
+    Sections are used in place as typed memoryviews, so processes opening the same
+    file share its pages; records and job dicts are only built when accessed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a job catalog snapshot")
+
+        (directory_offset,) = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        directory = json.loads(bytes(buffer[directory_offset:]))
+        if directory['format'] != FORMAT_VERSION or directory['byteorder'] != sys.byteorder:
+            raise ValueError(f"Unsupported snapshot format in {path}; rebuild it with catalog_snapshot.py")
+
+        self.size = directory['count']
+        self._sections = {
+            name: buffer[offset:offset + length].cast(typecode)
+            for name, (offset, length, typecode) in directory['sections'].items()
+        }
+        self._strings = [None] * (len(self._sections['strings.offsets']) - 1)
+        self._records = [None] * self.size
+
+        # term -> (start, end) into each field's posting positions; vocabularies are small
+        self._postings = {}
+        for name in JobDatabase.INDEXED_FIELDS:
+            offsets = self._sections[f'postings.{name}.offsets']
+            self._postings[name] = {
+                self.string(sid): (offsets[i], offsets[i + 1])
+                for i, sid in enumerate(self._sections[f'postings.{name}.terms'])
+            }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def string(self, sid: int) -> str:
+        """Return entry `sid` of the string table"""
+        value = self._strings[sid]
+        if value is None:
+            offsets = self._sections['strings.offsets']
+            value = sys.intern(str(self._sections['strings.data'][offsets[sid]:offsets[sid + 1]], 'utf-8'))
+            self._strings[sid] = value
+        return value
+
+    def job(self, position: int) -> Dict[str, Any]:
+        """Decode the original job dict at `position` (a fresh dict on every call)"""
+        offsets = self._sections['jobs.offsets']
+        return json.loads(bytes(self._sections['jobs.data'][offsets[position]:offsets[position + 1]]))
+
+    def record(self, position: int) -> MappedJobRecord:
+        """Return the normalized record at `position`, building it on first access"""
+        record = self._records[position]
+        if record is None:
+            sections = self._sections
+            record = MappedJobRecord.__new__(MappedJobRecord)
+            record._catalog = self
+            record.position = position
+            for field in CATEGORICAL_FIELDS:
+                setattr(record, field, self.string(sections[field][position]))
+            for field in SET_FIELDS:
+                offsets, ids = sections[f'{field}.offsets'], sections[f'{field}.ids']
+                setattr(record, field, frozenset(self.string(sid) for sid in ids[offsets[position]:offsets[position + 1]]))
+            record.salary_range = ((sections['salary.min'][position], sections['salary.max'][position])
+                                   if sections['salary.flag'][position] else None)
+            expires_at = sections['expires_at'][position]
+            record.expires_at = None if math.isnan(expires_at) else expires_at
+            self._records[position] = record
+        return record
+
+    def position_of(self, job_id: Any) -> Optional[int]:
+        """Binary search the sorted job id column"""
+        key = _encode_id(job_id)
+        order, ids = self._sections['job_id.order'], self._sections['job_id']
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(ids[order[middle]]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and self.string(ids[order[low]]) == key:
+            return order[low]
+        return None
+
+    def expiring(self) -> List[Tuple[float, int]]:
+        """Return (expires_at, position) of jobs with an expiry time, earliest first"""
+        expires_at = self._sections['expires_at']
+        return [(expires_at[position], position) for position in self._sections['expiry.order']]
+
+    def terms(self, name: str) -> Dict[str, Tuple[int, int]]:
+        """Return the vocabulary of an indexed field with spans into its postings"""
+        return self._postings[name]
+
+    def positions(self, name: str, span: Tuple[int, int]) -> memoryview:
+        """Return the posting positions of one term (a read-only view into the file)"""
+        return self._sections[f'postings.{name}.positions'][span[0]:span[1]]
+
+    def salary_ranges(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield (position, low, high) of every job with a salary range, in base currency units"""
+        flags, lows, highs = self._sections['salary.flag'], self._sections['salary.min'], self._sections['salary.max']
+        for position in range(self.size):
+            if flags[position]:
+                yield position, lows[position], highs[position]
+
+    def bitmaps(self, field: str) -> Dict[str, bytes]:
+        """Return the filter bitmaps of a field: value -> bitmap bytes (bit i = position i)"""
+        offsets, data = self._sections[f'bitmaps.{field}.offsets'], self._sections[f'bitmaps.{field}.data']
+        return {
+            self.string(sid): bytes(data[offsets[i]:offsets[i + 1]])
+            for i, sid in enumerate(self._sections[f'bitmaps.{field}.values'])
+        }
+
+
+class MappedSequence:
+    """
+    Catalog column backed by a snapshot file. Replaced items are kept in a sparse
+    chunked overlay and jobs added since in a chunked column; `freeze()` returns an
+    immutable copy that shares the file-backed part and every unchanged chunk.
+    """
+
+    def __init__(self, size: int, getter: Callable[[int], Any], replaced=None, extra=None):
+        self._size = size
+        self._getter = getter
+        self._replaced = ChunkedColumn(size, fill=_UNCHANGED) if replaced is None else replaced
+        self._extra = ChunkedColumn() if extra is None else extra
+
+    def __len__(self) -> int:
+        return self._size + len(self._extra)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("catalog index out of range")
+        if index < self._size:
+            item = self._replaced[index]
+            return self._getter(index) if item is _UNCHANGED else item
+        return self._extra[index - self._size]
+
+    def __setitem__(self, index: int, item: Any):
+        if not 0 <= index < len(self):
+            raise IndexError("catalog index out of range")
+        if index < self._size:
+            self._replaced[index] = item
+        else:
+            self._extra[index - self._size] = item
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, item: Any):
+        self._extra.append(item)
+
+    def freeze(self) -> 'MappedSequence':
+        return MappedSequence(self._size, self._getter, self._replaced.freeze(), self._extra.freeze())
+
+
+class MappedPostings:
+    """
+    Inverted index over snapshot postings.
+    Reads return views into the file; a term is copied into a set the first time a
+    write touches it, and removed terms are marked with None.
+    """
+
+    def __init__(self, catalog: MappedCatalog, name: str):
+        self._catalog = catalog
+        self._name = name
+        self._spans = catalog.terms(name)
+        self._overlay = {}
+
+    def __contains__(self, term: str) -> bool:
+        if term in self._overlay:
+            return self._overlay[term] is not None
+        return term in self._spans
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def get(self, term: str, default=None):
+        if term in self._overlay:
+            positions = self._overlay[term]
+            return default if positions is None else positions
+        span = self._spans.get(term)
+        if span is None:
+            return default
+        return self._catalog.positions(self._name, span)
+
+    def __getitem__(self, term: str):
+        positions = self._overlay.get(term)
+        if positions is None:
+            if term in self._overlay:
+                raise KeyError(term)
+            positions = self._overlay[term] = set(self._catalog.positions(self._name, self._spans[term]))
+        return positions
+
+    def __setitem__(self, term: str, positions):
+        self._overlay[term] = positions
+
+    def __delitem__(self, term: str):
+        if term not in self:
+            raise KeyError(term)
+        self._overlay[term] = None
+
+    def keys(self):
+        return {term for term in self._spans.keys() | self._overlay.keys() if term in self}
+
+
+class MappedIdMap:
+    """job_id -> position map: binary search over the snapshot, plus a dict for newer jobs"""
+
+    def __init__(self, catalog: MappedCatalog):
+        self._catalog = catalog
+        self._overlay = {}
+
+    def get(self, job_id: Any, default=None) -> Optional[int]:
+        if job_id in self._overlay:
+            position = self._overlay[job_id]  # None once removed
+        else:
+            position = self._catalog.position_of(job_id)
+        return default if position is None else position
+
+    def __contains__(self, job_id: Any) -> bool:
+        return self.get(job_id) is not None
+
+    def __len__(self) -> int:
+        size = len(self._catalog)
+        for job_id, position in self._overlay.items():
+            in_snapshot = self._catalog.position_of(job_id) is not None
+            if position is None and in_snapshot:
+                size -= 1
+            elif position is not None and not in_snapshot:
+                size += 1
+        return size
+
+    def __setitem__(self, job_id: Any, position: int):
+        self._overlay[job_id] = position
+
+    def __delitem__(self, job_id: Any):
+        if job_id not in self:
+            raise KeyError(job_id)
+        self._overlay[job_id] = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build a binary catalog snapshot for fast worker startup")
+    parser.add_argument('output', help="Snapshot file to write")
+    parser.add_argument('--feed', help="Build from a JSONL/CSV feed instead of the sample jobs")
+    parser.add_argument('--database-url', help="Build from the SQL job database")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.database_url:
+        from sql_job_database import SQLJobDatabase
+        job_db = SQLJobDatabase(args.database_url, seed_sample_jobs=False)
+    elif args.feed:
+        from job_ingest import JobIngestor
+        job_db = JobDatabase(jobs=[])
+        JobIngestor(job_db).ingest(args.feed)
+    else:
+        job_db = JobDatabase()
+
+    count = write_snapshot(job_db, args.output)
+    print(f"Wrote {count} jobs to {args.output} ({os.path.getsize(args.output)} bytes)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
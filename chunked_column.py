@@ -0,0 +1,102 @@
+import operator
+from itertools import repeat
+from typing import Any, Iterator, List, Optional
+
+# Items per chunk (a power of two, so positions split with a shift and a mask)
+CHUNK_BITS = 10
+CHUNK_SIZE = 1 << CHUNK_BITS
+_CHUNK_MASK = CHUNK_SIZE - 1
+
+
+class ColumnView:
+    """
+    Read-only sequence over the chunks of a ChunkedColumn.
+    A view returned by ChunkedColumn.freeze() never changes: the column copies a
+    chunk before its first write after the freeze, so views share every chunk
+    that has not been written since. Chunks that were never written are None and
+    read as `fill`.
+    """
+
+    __slots__ = ('_chunks', '_size', '_fill')
+
+    def __init__(self, chunks: List[Optional[list]], size: int, fill: Any = None):
+        self._chunks = chunks
+        self._size = size
+        self._fill = fill
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index):
+        if type(index) is int and 0 <= index < self._size:
+            chunk = self._chunks[index >> CHUNK_BITS]
+            return self._fill if chunk is None else chunk[index & _CHUNK_MASK]
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step == 1:
+                return list(self._iter_range(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        index = operator.index(index)
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("column index out of range")
+        return self[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._iter_range(0, self._size)
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[Any]:
+        while start < stop:
+            offset = start & _CHUNK_MASK
+            end = min(stop, start - offset + CHUNK_SIZE)
+            chunk = self._chunks[start >> CHUNK_BITS]
+            if chunk is None:
+                yield from repeat(self._fill, end - start)
+            else:
+                yield from chunk[offset:offset + end - start]
+            start = end
+
+
+class ChunkedColumn(ColumnView):
+    """
+    Catalog column stored in fixed-size chunks, with O(1) snapshots.
+    freeze() copies the list of chunk references, not the items; a write copies
+    at most the one chunk it touches, so publishing a version after a change
+    costs time proportional to the change, not to the column length.
+    """
+
+    __slots__ = ('_owned',)
+
+    def __init__(self, size: int = 0, fill: Any = None):
+        super().__init__([None] * ((size + _CHUNK_MASK) >> CHUNK_BITS), size, fill)
+        self._owned = set()  # Chunks written since the last freeze(), not shared with a view
+
+    def __setitem__(self, index: int, item: Any):
+        if not 0 <= index < self._size:
+            raise IndexError("column index out of range")
+        self._writable_chunk(index >> CHUNK_BITS)[index & _CHUNK_MASK] = item
+
+    def append(self, item: Any):
+        offset = self._size & _CHUNK_MASK
+        if not offset:
+            self._chunks.append([])
+            self._owned.add(len(self._chunks) - 1)
+        self._writable_chunk(self._size >> CHUNK_BITS).append(item)
+        self._size += 1
+
+    def freeze(self) -> ColumnView:
+        """Immutable view of the column as it is now"""
+        self._owned = set()
+        return ColumnView(list(self._chunks), self._size, self._fill)
+
+    def _writable_chunk(self, chunk_index: int) -> list:
+        chunk = self._chunks[chunk_index]
+        if chunk_index not in self._owned:
+            if chunk is None:
+                chunk = [self._fill] * min(CHUNK_SIZE, self._size - (chunk_index << CHUNK_BITS))
+            else:
+                chunk = list(chunk)
+            self._chunks[chunk_index] = chunk
+            self._owned.add(chunk_index)
+        return chunk
@@ -0,0 +1,61 @@
+import os
+import json
+from typing import Dict, Any, Optional, Tuple
+
+CURRENCY_RATES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'currency_rates.json')
+
+
+class CurrencyRates:
+    """
+    Local exchange rate table used to bring salaries into one unit.
+    Rates are amounts of the base currency per unit of each currency; they are
+    read from a file, never fetched, so scores only change when the file does.
+    """
+
+    def __init__(self, base: str, rates: Dict[str, float], location_currencies: Optional[Dict[str, str]] = None):
+        self.base = base.upper()
+        self.rates = {currency.upper(): float(rate) for currency, rate in rates.items()}
+        if self.rates.get(self.base) != 1.0:
+            raise ValueError(f"Base currency {self.base} must have a rate of 1.0")
+        # Place (lowercase) -> currency of jobs there when the job names none
+        self.location_currencies = {place.lower().strip(): currency.upper()
+                                    for place, currency in (location_currencies or {}).items()}
+        for currency in self.location_currencies.values():
+            self.rate(currency)
+
+    @classmethod
+    def load(cls, path: str = CURRENCY_RATES_FILE) -> 'CurrencyRates':
+        """Load a rate table ({"base", "rates", "location_currencies"}) from a JSON file"""
+        with open(path, encoding='utf-8') as f:
+            table = json.load(f)
+        return cls(table['base'], table['rates'], table.get('location_currencies'))
+
+    def rate(self, currency: str) -> float:
+        rate = self.rates.get(currency.upper())
+        if rate is None:
+            raise ValueError(f"Unknown currency {currency!r}")
+        return rate
+
+    def currency_of(self, job: Dict[str, Any], place_path: Tuple[str, ...]) -> str:
+        """
+        The job's `currency`, or the currency of its location, or the base currency
+
+        `place_path` is the location resolved by LocationNormalizer. Its places are looked
+        up whole, broadest first, so the country decides ("London, Ontario" is in Canada)
+        and a place merely containing a name ("Indianapolis") does not match it.
+        """
+        currency = job.get('currency')
+        if currency:
+            currency = str(currency).upper().strip()
+            self.rate(currency)
+            return currency
+        for place in place_path:
+            currency = self.location_currencies.get(place)
+            if currency is not None:
+                return currency
+        return self.base
+
+    def normalize(self, amount: Any, currency: str) -> Any:
+        """Convert an amount to the base currency; base amounts are returned unchanged"""
+        rate = self.rate(currency)
+        return amount if rate == 1.0 else round(amount * rate)
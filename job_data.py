@@ -1,6 +1,101 @@
-import json
+import os
+import sys
+import time
+import heapq
 import logging
-from typing import List, Dict, Any
+import threading
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable, Set, Optional, Sequence, Tuple, Callable
+from substring_index import SubstringIndex
+from bitmap_index import BitmapIndex
+from salary_index import SalaryIndex
+from location_index import LocationIndex, LocationNormalizer
+from currency_rates import CurrencyRates
+from chunked_column import ChunkedColumn
+from job_ingest import iter_jsonl
+
+SAMPLE_JOBS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sample_jobs.jsonl')
+
+# Entry of the catalog change log; `record` is None for removals
+JobChange = namedtuple('JobChange', ['version', 'op', 'job_id', 'position', 'record'])
+
+
+@lru_cache(maxsize=1 << 16)
+def _normalize(value: Any) -> str:
+    """Lowercase, strip and intern a job field value (memoized: catalog values repeat a lot)"""
+    return sys.intern(value.lower().strip()) if value else ''
+
+
+class JobRecord:
+    """
+    Normalized representation of a job listing used for scoring.
+    Built once when the job enters the catalog; the original dict is kept in `job`.
+    `salary_range` is converted to the base currency of CURRENCY_RATES.
+    """
+    
+    __slots__ = ('position', 'job', 'title', 'location', 'industry', 'company_size',
+                 'skills', 'values', 'currency', 'salary_range', 'expires_at')
+    
+    # Exchange rates used to normalize salaries, loaded from data/currency_rates.json
+    CURRENCY_RATES = CurrencyRates.load()
+    
+    def __init__(self, position: int, job: Dict[str, Any]):
+        self.position = position
+        self.job = job
+        self.title = _normalize(job.get('title'))
+        self.location = _normalize(job.get('location'))
+        self.industry = _normalize(job.get('industry'))
+        self.company_size = _normalize(job.get('company_size'))
+        self.skills = frozenset(_normalize(skill) for skill in job.get('required_skills') or [])
+        self.values = frozenset(_normalize(value) for value in job.get('values_promoted') or [])
+        self.currency = self.CURRENCY_RATES.currency_of(job, JobDatabase.LOCATIONS.resolve(self.location))
+        self.salary_range = self._parse_salary(job.get('salary_range'), self.currency)
+        expires_at = job.get('expires_at')
+        self.expires_at = None if expires_at is None else self.parse_expiry(expires_at)
+    
+    @classmethod
+    def _parse_salary(cls, salary_range: Any, currency: str) -> Optional[Tuple[int, int]]:
+        """Return the salary range as an (int, int) pair in the base currency, or None if unusable"""
+        if not salary_range or len(salary_range) != 2:
+            return None
+        rates = cls.CURRENCY_RATES
+        return rates.normalize(int(salary_range[0]), currency), rates.normalize(int(salary_range[1]), currency)
+    
+    @staticmethod
+    def parse_expiry(expires_at: Any) -> Optional[float]:
+        """Return `expires_at` (UNIX seconds or an ISO 8601 string, UTC if no offset) as a timestamp"""
+        if expires_at is None or expires_at == '':
+            return None
+        if isinstance(expires_at, (int, float)) and not isinstance(expires_at, bool):
+            return float(expires_at)
+        if not isinstance(expires_at, str):
+            raise ValueError(f"Invalid expires_at: {expires_at!r}")
+        moment = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+
+
+class CatalogSnapshot:
+    """
+    Immutable view of the catalog at one version.
+    Readers share a snapshot without copying; writers never modify a published one.
+    `jobs` and `records` are frozen catalog columns (read-only sequences).
+    """
+    
+    __slots__ = ('version', 'jobs', 'records')
+    
+    def __init__(self, version: int, jobs: Sequence[Dict[str, Any]], records: Sequence[JobRecord]):
+        self.version = version
+        self.jobs = jobs
+        self.records = records
+    
+    def __len__(self) -> int:
+        return len(self.records)
+
 
 class JobDatabase:
     """
@@ -8,364 +103,124 @@ class JobDatabase:
     In a production system, this would connect to a real database.
     """
     
-    def __init__(self):
+    # Inverted indexes kept over normalized JobRecord attributes
+    INDEXED_FIELDS = ['skills', 'title', 'location', 'industry', 'company_size', 'values']
+    
+    # Indexes whose vocabulary also gets a substring index for partial matching
+    SUBSTRING_INDEXED_FIELDS = ['skills', 'title', 'industry']
+    
+    # Place hierarchy the location vocabulary is resolved against, from data/locations.json
+    LOCATIONS = LocationNormalizer.load()
+    
+    # Categorical job fields with a bitmap index, for filter_jobs()
+    FILTER_FIELDS = ['role_level', 'employment_type']
+    
+    # Number of recent changes kept for changes_since()
+    CHANGE_LOG_SIZE = 10000
+    
+    def __init__(self, jobs: Optional[Iterable[Dict[str, Any]]] = None):
         self.logger = logging.getLogger(__name__)
-        self._jobs = self._load_sample_jobs()
+        self._jobs = ChunkedColumn()
+        self._records = ChunkedColumn()
+        self._positions_by_id = {}  # job_id -> catalog position
+        self.version = 0  # Incremented on every catalog change
+        self._lock = threading.RLock()  # Serializes writers and snapshot builds
+        self._snapshot = None  # Published CatalogSnapshot; None until first read after a write
+        self._index = {name: {} for name in self.INDEXED_FIELDS}
+        self._substring_index = {name: SubstringIndex() for name in self.SUBSTRING_INDEXED_FIELDS}
+        self._location_index = LocationIndex(self.LOCATIONS)
+        self._bitmaps = {field: BitmapIndex() for field in self.FILTER_FIELDS}
+        self._salary_index = SalaryIndex()
+        self._value_counts = {}  # field -> {value: job count}, for fields get_unique_values() was asked for
+        self._expiry = []  # Min-heap of (expires_at, position); stale entries are skipped when popped
+        self._next_expiry = float('inf')
+        self._changes = deque(maxlen=self.CHANGE_LOG_SIZE)
+        self._pending_changes = []
+        self._subscribers = []
+        self._write_depth = 0
+        for job in self._load_sample_jobs() if jobs is None else jobs:
+            self._append_job(job)
+    
+    @classmethod
+    def open_snapshot(cls, path: str) -> 'JobDatabase':
+        """
+        Open a catalog snapshot written by catalog_snapshot.py
+        
+        The file is memory-mapped: records and job dicts are built on first access and
+        workers opening the same file share its pages. Jobs added later live in memory.
+        """
+        from catalog_snapshot import MappedCatalog, MappedSequence, MappedPostings, MappedIdMap
+        catalog = MappedCatalog(path)
+        db = cls(jobs=[])
+        db._jobs = MappedSequence(len(catalog), catalog.job)
+        db._records = MappedSequence(len(catalog), catalog.record)
+        db._positions_by_id = MappedIdMap(catalog)
+        db._index = {name: MappedPostings(catalog, name) for name in cls.INDEXED_FIELDS}
+        for name, substring_index in db._substring_index.items():
+            for term in db._index[name].keys():
+                substring_index.add(term)
+        for term in db._index['location'].keys():
+            db._location_index.add(term)
+        db._bitmaps = {field: BitmapIndex.from_bytes(catalog.bitmaps(field)) for field in cls.FILTER_FIELDS}
+        db._salary_index = SalaryIndex(catalog.salary_ranges)
+        db._expiry = catalog.expiring()  # Sorted by time, so already a heap
+        db._next_expiry = db._expiry[0][0] if db._expiry else float('inf')
+        db.version = len(catalog)
+        db.logger.info(f"Opened catalog snapshot {path} with {len(catalog)} jobs")
+        return db
     
     def _load_sample_jobs(self) -> List[Dict[str, Any]]:
         """Load sample job data for demonstration"""
-        sample_jobs = [
-            {
-                "job_id": "RED-456",
-                "title": "Senior UX Designer",
-                "company": "Reddit",
-                "location": "Remote in USA",
-                "salary_range": [146000, 232000],
-                "employment_type": "Full-Time",
-                "company_size": "51-200 Employees",
-                "industry": "AI & Machine Learning",
-                "required_skills": ["Figma", "Prototyping", "UX Research"],
-                "values_promoted": ["Impactful Work", "Transparency & Communication"],
-                "experience_required": "5-8 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "GGL-320",
-                "title": "Design Manager",
-                "company": "Google",
-                "location": "Mountain View, CA",
-                "salary_range": [180000, 280000],
-                "employment_type": "Full-Time",
-                "company_size": "10000+ Employees",
-                "industry": "Technology",
-                "required_skills": ["Design Leadership", "Figma", "User Research"],
-                "values_promoted": ["Innovation", "Mentorship & Career Development"],
-                "experience_required": "7-10 years",
-                "role_level": "Manager"
-            },
-            {
-                "job_id": "AIRBNB-123",
-                "title": "Product Designer",
-                "company": "Airbnb",
-                "location": "San Francisco, CA",
-                "salary_range": [160000, 220000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Travel & Hospitality",
-                "required_skills": ["Figma", "UI/UX Design", "Prototyping"],
-                "values_promoted": ["Work-Life Balance", "Impactful Work"],
-                "experience_required": "4-6 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "UBER-789",
-                "title": "Senior Product Designer",
-                "company": "Uber",
-                "location": "Remote in USA",
-                "salary_range": [155000, 240000],
-                "employment_type": "Full-Time",
-                "company_size": "5000-10000 Employees",
-                "industry": "Transportation",
-                "required_skills": ["Sketch", "Figma", "User Research", "Wireframing"],
-                "values_promoted": ["Innovation", "Work-Life Balance"],
-                "experience_required": "5-8 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "SLACK-555",
-                "title": "UI/UX Designer",
-                "company": "Slack",
-                "location": "New York City",
-                "salary_range": [130000, 190000],
-                "employment_type": "Full-Time",
-                "company_size": "501-1000 Employees",
-                "industry": "Software",
-                "required_skills": ["Figma", "UI/UX Design", "Prototyping"],
-                "values_promoted": ["Transparency & Communication", "Mentorship & Career Development"],
-                "experience_required": "3-5 years",
-                "role_level": "Mid-level"
-            },
-            {
-                "job_id": "NETFLIX-444",
-                "title": "Senior UX Researcher",
-                "company": "Netflix",
-                "location": "Los Angeles, CA",
-                "salary_range": [170000, 250000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Entertainment",
-                "required_skills": ["User Research", "Data Analysis", "Prototyping"],
-                "values_promoted": ["Innovation", "Impactful Work"],
-                "experience_required": "6-9 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "SPOTIFY-333",
-                "title": "Product Designer",
-                "company": "Spotify",
-                "location": "Remote in USA",
-                "salary_range": [145000, 200000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Music & Audio",
-                "required_skills": ["Figma", "UI/UX Design", "User Research"],
-                "values_promoted": ["Work-Life Balance", "Innovation"],
-                "experience_required": "4-7 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "TESLA-777",
-                "title": "UX Designer",
-                "company": "Tesla",
-                "location": "Austin, TX",
-                "salary_range": [120000, 180000],
-                "employment_type": "Full-Time",
-                "company_size": "5000-10000 Employees",
-                "industry": "Automotive",
-                "required_skills": ["Sketch", "Figma", "Wireframing"],
-                "values_promoted": ["Innovation", "Impactful Work"],
-                "experience_required": "2-5 years",
-                "role_level": "Mid-level"
-            },
-            {
-                "job_id": "MICROSOFT-888",
-                "title": "Senior Design Lead",
-                "company": "Microsoft",
-                "location": "Seattle, WA",
-                "salary_range": [190000, 290000],
-                "employment_type": "Full-Time",
-                "company_size": "10000+ Employees",
-                "industry": "Technology",
-                "required_skills": ["Design Leadership", "Figma", "Strategic Design"],
-                "values_promoted": ["Mentorship & Career Development", "Innovation"],
-                "experience_required": "8-12 years",
-                "role_level": "Lead"
-            },
-            {
-                "job_id": "ADOBE-999",
-                "title": "UI Designer",
-                "company": "Adobe",
-                "location": "San Jose, CA",
-                "salary_range": [125000, 175000],
-                "employment_type": "Full-Time",
-                "company_size": "5000-10000 Employees",
-                "industry": "Software",
-                "required_skills": ["Adobe Creative Suite", "Figma", "UI/UX Design"],
-                "values_promoted": ["Creativity", "Work-Life Balance"],
-                "experience_required": "3-6 years",
-                "role_level": "Mid-level"
-            },
-            {
-                "job_id": "STRIPE-111",
-                "title": "Product Designer",
-                "company": "Stripe",
-                "location": "Remote in USA",
-                "salary_range": [165000, 230000],
-                "employment_type": "Contract",
-                "company_size": "1000-5000 Employees",
-                "industry": "Fintech",
-                "required_skills": ["Figma", "Prototyping", "User Research"],
-                "values_promoted": ["Innovation", "Transparency & Communication"],
-                "experience_required": "5-8 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "ZOOM-222",
-                "title": "Senior Visual Designer",
-                "company": "Zoom",
-                "location": "San Jose, CA",
-                "salary_range": [140000, 200000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Communication",
-                "required_skills": ["Adobe Creative Suite", "Branding", "UI/UX Design"],
-                "values_promoted": ["Work-Life Balance", "Global Impact"],
-                "experience_required": "6-9 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "FLIPKART-301",
-                "title": "Senior UX Designer",
-                "company": "Flipkart",
-                "location": "Bangalore, India",
-                "salary_range": [1800000, 3000000],
-                "employment_type": "Full-Time",
-                "company_size": "10000+ Employees",
-                "industry": "E-commerce",
-                "required_skills": ["Figma", "User Research", "Prototyping", "UI/UX Design"],
-                "values_promoted": ["Innovation", "Impactful Work"],
-                "experience_required": "5-8 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "PAYTM-302",
-                "title": "Product Designer",
-                "company": "Paytm",
-                "location": "Noida, India",
-                "salary_range": [1500000, 2500000],
-                "employment_type": "Full-Time",
-                "company_size": "5000-10000 Employees",
-                "industry": "Fintech",
-                "required_skills": ["Sketch", "Figma", "UI/UX Design", "Wireframing"],
-                "values_promoted": ["Innovation", "Financial Inclusion"],
-                "experience_required": "4-7 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "SWIGGY-303",
-                "title": "UI/UX Designer",
-                "company": "Swiggy",
-                "location": "Bangalore, India",
-                "salary_range": [1200000, 2000000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Food & Delivery",
-                "required_skills": ["Figma", "UI/UX Design", "User Research", "Prototyping"],
-                "values_promoted": ["Work-Life Balance", "Innovation"],
-                "experience_required": "3-6 years",
-                "role_level": "Mid-level"
-            },
-            {
-                "job_id": "ZOMATO-304",
-                "title": "Senior Product Designer",
-                "company": "Zomato",
-                "location": "Gurgaon, India",
-                "salary_range": [1600000, 2800000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Food & Delivery",
-                "required_skills": ["Figma", "Prototyping", "Design Systems", "User Research"],
-                "values_promoted": ["Impactful Work", "Innovation"],
-                "experience_required": "5-8 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "BYJUS-305",
-                "title": "UX Designer",
-                "company": "BYJU'S",
-                "location": "Bangalore, India",
-                "salary_range": [1000000, 1800000],
-                "employment_type": "Full-Time",
-                "company_size": "5000-10000 Employees",
-                "industry": "Education Technology",
-                "required_skills": ["Figma", "User Research", "Wireframing", "UI/UX Design"],
-                "values_promoted": ["Education Impact", "Innovation"],
-                "experience_required": "2-5 years",
-                "role_level": "Mid-level"
-            },
-            {
-                "job_id": "OLA-306",
-                "title": "Design Lead",
-                "company": "Ola",
-                "location": "Bangalore, India",
-                "salary_range": [2500000, 4000000],
-                "employment_type": "Full-Time",
-                "company_size": "5000-10000 Employees",
-                "industry": "Transportation",
-                "required_skills": ["Design Leadership", "Figma", "Strategic Design", "Team Management"],
-                "values_promoted": ["Innovation", "Sustainable Transportation"],
-                "experience_required": "7-10 years",
-                "role_level": "Lead"
-            },
-            {
-                "job_id": "RAZORPAY-307",
-                "title": "Senior UX Designer",
-                "company": "Razorpay",
-                "location": "Bangalore, India",
-                "salary_range": [1700000, 2900000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Fintech",
-                "required_skills": ["Figma", "User Research", "Prototyping", "Design Systems"],
-                "values_promoted": ["Innovation", "Financial Empowerment"],
-                "experience_required": "4-7 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "PHONEPE-308",
-                "title": "Product Designer",
-                "company": "PhonePe",
-                "location": "Pune, India",
-                "salary_range": [1400000, 2400000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Fintech",
-                "required_skills": ["Figma", "UI/UX Design", "Prototyping", "User Testing"],
-                "values_promoted": ["Financial Inclusion", "Innovation"],
-                "experience_required": "3-6 years",
-                "role_level": "Mid-level"
-            },
-            {
-                "job_id": "FRESHWORKS-309",
-                "title": "Senior Visual Designer",
-                "company": "Freshworks",
-                "location": "Chennai, India",
-                "salary_range": [1300000, 2200000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Software",
-                "required_skills": ["Adobe Creative Suite", "Figma", "Branding", "UI/UX Design"],
-                "values_promoted": ["Work-Life Balance", "Global Impact"],
-                "experience_required": "5-8 years",
-                "role_level": "Senior"
-            },
-            {
-                "job_id": "MYNTRA-310",
-                "title": "UI Designer",
-                "company": "Myntra",
-                "location": "Bangalore, India",
-                "salary_range": [1100000, 1900000],
-                "employment_type": "Contract",
-                "company_size": "1000-5000 Employees",
-                "industry": "E-commerce",
-                "required_skills": ["Figma", "UI/UX Design", "Fashion Design", "Mobile Design"],
-                "values_promoted": ["Creativity", "Innovation"],
-                "experience_required": "3-5 years",
-                "role_level": "Mid-level"
-            },
-            {
-                "job_id": "INMOBI-311",
-                "title": "Senior UX Researcher",
-                "company": "InMobi",
-                "location": "Bangalore, India",
-                "salary_range": [1600000, 2700000],
-                "employment_type": "Full-Time",
-                "company_size": "1000-5000 Employees",
-                "industry": "Ad Technology",
-                "required_skills": ["User Research", "Data Analysis", "Survey Design", "Usability Testing"],
-                "values_promoted": ["Innovation", "Data-Driven Insights"],
-                "experience_required": "5-8 years",
-                "role_level": "Senior"
-            }
-        ]
+        sample_jobs = []
+        for row, (_, job) in enumerate(iter_jsonl(SAMPLE_JOBS_FILE)):
+            if isinstance(job, Exception):  # Unparsable line: skipped, as the ingest CLI does
+                self.logger.warning(f"Skipping sample job row {row}: {job}")
+                continue
+            sample_jobs.append(job)
         
         self.logger.info(f"Loaded {len(sample_jobs)} sample jobs")
         return sample_jobs
     
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Return the current immutable catalog snapshot
+        
+        The snapshot is built once per catalog version, on the first read after a
+        write, and swapped in as a whole, so readers never see a partial update.
+        Removed jobs leave None in `jobs` and `records`, so positions stay stable.
+        """
+        if self._next_expiry <= time.time():
+            self.expire_jobs()
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                # Frozen columns share every chunk the writes since the last snapshot did not touch
+                self._snapshot = CatalogSnapshot(self.version, self._jobs.freeze(), self._records.freeze())
+            return self._snapshot
+    
     def get_all_jobs(self) -> List[Dict[str, Any]]:
         """Return all available jobs"""
-        return self._jobs.copy()
+        return [job for job in self.snapshot().jobs if job is not None]
+    
+    def get_records(self) -> Sequence[JobRecord]:
+        """Return normalized records in catalog order (shared, not copied; removed jobs are None)"""
+        return self.snapshot().records
     
     def get_job_by_id(self, job_id: str) -> Dict[str, Any]:
         """Get a specific job by ID"""
-        for job in self._jobs:
-            if job.get('job_id') == job_id:
-                return job.copy()
-        return None
+        position = self._positions_by_id.get(job_id)
+        if position is None:
+            return None
+        return self._jobs[position].copy()
     
     def add_job(self, job: Dict[str, Any]) -> bool:
         """Add a new job to the database"""
         try:
-            required_fields = ['job_id', 'title', 'company', 'location']
-            for field in required_fields:
-                if field not in job:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            # Check if job ID already exists
-            if self.get_job_by_id(job['job_id']):
-                raise ValueError(f"Job ID {job['job_id']} already exists")
-            
-            self._jobs.append(job)
+            with self._writing():
+                self._validate_job(job)
+                self._append_job(job)
             self.logger.info(f"Added job {job['job_id']}")
             return True
             
@@ -373,13 +228,366 @@ class JobDatabase:
             self.logger.error(f"Error adding job: {e}")
             return False
     
+    def add_jobs(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate and add many jobs in a single pass
+        
+        Returns:
+            Report with the number of inserted jobs and per-row failures
+            ({'row': index in `jobs`, 'job_id': ..., 'error': message})
+        """
+        inserted = 0
+        failures = []
+        with self._writing():  # Publish the whole batch as one snapshot
+            for row, job in enumerate(jobs):
+                try:
+                    self._validate_job(job)
+                    self._append_job(job)
+                    inserted += 1
+                except Exception as e:
+                    job_id = job.get('job_id') if isinstance(job, dict) else None
+                    failures.append({'row': row, 'job_id': job_id, 'error': str(e)})
+        
+        self.logger.info(f"Added {inserted} jobs, {len(failures)} rejected")
+        return {'inserted': inserted, 'failed': failures}
+    
+    def update_job(self, job: Dict[str, Any]) -> bool:
+        """Replace the job with the same job_id; it keeps its catalog position"""
+        try:
+            with self._writing():
+                self._validate_job(job, existing=True)
+                self._replace_job(self._positions_by_id.get(job['job_id']), job)
+            self.logger.info(f"Updated job {job['job_id']}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error updating job: {e}")
+            return False
+    
+    def remove_job(self, job_id: str) -> bool:
+        """Remove a job from the database"""
+        try:
+            with self._writing():
+                position = self._positions_by_id.get(job_id)
+                if position is None:
+                    raise ValueError(f"Job ID {job_id} not found")
+                self._remove_job(position, 'remove')
+            self.logger.info(f"Removed job {job_id}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error removing job: {e}")
+            return False
+    
+    def expire_jobs(self, now: Optional[float] = None) -> int:
+        """
+        Remove jobs whose `expires_at` has passed
+        
+        Runs automatically when a snapshot is taken; returns the number of removed jobs.
+        """
+        now = time.time() if now is None else now
+        expired = 0
+        with self._writing():
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, position = heapq.heappop(self._expiry)
+                record = self._records[position]
+                # Entries of jobs updated or removed since they were scheduled are stale
+                if record is not None and record.expires_at == expires_at:
+                    self._remove_job(position, 'expire')
+                    expired += 1
+            self._next_expiry = self._expiry[0][0] if self._expiry else float('inf')
+        if expired:
+            self.logger.info(f"Expired {expired} jobs")
+        return expired
+    
+    def subscribe(self, callback: Callable[[List[JobChange]], None]):
+        """
+        Call `callback` with the list of JobChange entries of every write
+        
+        Callbacks run under the write lock, before readers can see the new version.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+    
+    def unsubscribe(self, callback: Callable[[List[JobChange]], None]):
+        """Stop sending changes to `callback`"""
+        with self._lock:
+            self._subscribers.remove(callback)
+    
+    def changes_since(self, version: int) -> Optional[List[JobChange]]:
+        """Return changes after `version`, or None if the change log no longer reaches back that far"""
+        with self._lock:
+            if version >= self.version:
+                return []
+            if not self._changes or self._changes[0].version > version + 1:
+                return None
+            return [change for change in self._changes if change.version > version]
+    
+    def _validate_job(self, job: Dict[str, Any], existing: bool = False):
+        """Raise ValueError if the job cannot be added (or, with `existing`, updated)"""
+        if not isinstance(job, dict):
+            raise ValueError("Job must be a dictionary")
+        
+        required_fields = ['job_id', 'title', 'company', 'location']
+        for field in required_fields:
+            if field not in job:
+                raise ValueError(f"Missing required field: {field}")
+        
+        JobRecord.parse_expiry(job.get('expires_at'))
+        
+        # Check if job ID already exists
+        if existing:
+            if job['job_id'] not in self._positions_by_id:
+                raise ValueError(f"Job ID {job['job_id']} not found")
+        elif job['job_id'] in self._positions_by_id:
+            raise ValueError(f"Job ID {job['job_id']} already exists")
+    
+    def index_stats(self) -> Dict[str, Any]:
+        """Return the number of live jobs, the catalog version and the term count of each index"""
+        with self._lock:
+            return {
+                'jobs': len(self._positions_by_id),
+                'version': self.version,
+                'terms': {name: len(index) for name, index in self._index.items()}
+            }
+    
+    def get_index_terms(self, index_name: str) -> Iterable[str]:
+        """Return the normalized terms present in an inverted index"""
+        return self._index[index_name].keys()
+    
+    def has_term(self, index_name: str, term: str) -> bool:
+        """Check whether any job carries the given normalized term"""
+        return term in self._index[index_name]
+    
+    def find_related_terms(self, index_name: str, term: str) -> Set[str]:
+        """Return indexed terms that contain `term` or are contained in it"""
+        with self._lock:
+            return self._substring_index[index_name].find_related(term)
+    
+    def find_terms_containing(self, index_name: str, fragment: str) -> Set[str]:
+        """Return indexed terms that contain `fragment`"""
+        with self._lock:
+            return self._substring_index[index_name].find_containing(fragment)
+    
+    def match_locations(self, location: str) -> Dict[str, float]:
+        """Return indexed locations matching a preferred location, with their match score"""
+        with self._lock:
+            return self._location_index.match(location)
+    
+    def find_jobs(self, index_name: str, terms: Iterable[str]) -> Set[int]:
+        """
+        Return catalog positions of jobs carrying any of the given normalized terms
+        
+        May include jobs added after a snapshot was taken; callers filter by snapshot size.
+        """
+        postings = self._index[index_name]
+        positions = set()
+        with self._lock:
+            for term in terms:
+                positions.update(postings.get(term, ()))
+        return positions
+    
+    def filter_jobs(self, filters: Dict[str, Iterable[str]]) -> int:
+        """
+        Return the jobs passing categorical filters as an int bitmap (bit i = catalog position i)
+        
+        `filters` maps FILTER_FIELDS to accepted normalized values: a job passes when it
+        has one of the accepted values of every filtered field. May include jobs added
+        after a snapshot was taken; callers only look at positions within the snapshot.
+        """
+        mask = None
+        with self._lock:
+            for field, values in filters.items():
+                field_mask = self._bitmaps[field].union(values)
+                mask = field_mask if mask is None else mask & field_mask
+        return -1 if mask is None else mask
+    
+    def salary_bands(self, min_salary: float, width: float, version: int) -> Optional[Dict[float, List[int]]]:
+        """
+        Look up the jobs in each salary band for a normalized minimum salary
+        
+        Returns:
+            SalaryIndex.bands() of the catalog at `version`, or None if the catalog
+            has changed since (the index only reflects the latest version)
+        """
+        with self._lock:
+            if version != self.version:
+                return None
+            return self._salary_index.bands(min_salary, width)
+    
+    @staticmethod
+    def filter_value(job: Dict[str, Any], field: str) -> str:
+        """Normalized value of a filter field; '' when missing or not a string"""
+        value = job.get(field)
+        return _normalize(value) if isinstance(value, str) else ''
+    
+    @contextmanager
+    def _writing(self):
+        """Hold the write lock; subscribers get the changes once the outermost write finishes"""
+        with self._lock:
+            self._write_depth += 1
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if not self._write_depth and self._pending_changes:
+                    changes, self._pending_changes = self._pending_changes, []
+                    for callback in self._subscribers:
+                        try:
+                            callback(changes)
+                        except Exception as e:
+                            self.logger.error(f"Error notifying change subscriber: {e}")
+    
+    # The methods below change the catalog; callers hold the write lock.
+    
+    def _append_job(self, job: Dict[str, Any]) -> JobRecord:
+        """Append a job to the catalog and index its normalized record"""
+        record = JobRecord(len(self._jobs), job)
+        self._jobs.append(job)
+        self._records.append(record)
+        self._positions_by_id[job.get('job_id')] = record.position
+        for index_name in self.INDEXED_FIELDS:
+            value = getattr(record, index_name)
+            terms = value if isinstance(value, frozenset) else [value]
+            for term in terms:
+                if term:
+                    self._add_posting(index_name, term, record.position)
+        self._update_bitmaps(job, record.position, add=True)
+        if record.salary_range is not None:
+            self._salary_index.add(record.position, record.salary_range)
+        if self._value_counts:
+            self._count_values(job, 1)
+        if record.expires_at is not None:
+            self._schedule_expiry(record)
+        self._record_change('add', job.get('job_id'), record.position, record)
+        return record
+    
+    def _replace_job(self, position: int, job: Dict[str, Any]) -> JobRecord:
+        """Swap in a new version of the job at `position`, touching only the index terms that changed"""
+        old_job = self._jobs[position]
+        old_record = self._records[position]
+        record = JobRecord(position, job)
+        self._jobs[position] = job
+        self._records[position] = record
+        for index_name in self.INDEXED_FIELDS:
+            old_terms = self._record_terms(old_record, index_name)
+            new_terms = self._record_terms(record, index_name)
+            for term in old_terms - new_terms:
+                self._remove_posting(index_name, term, position)
+            for term in new_terms - old_terms:
+                self._add_posting(index_name, term, position)
+        self._update_bitmaps(old_job, position, add=False)
+        self._update_bitmaps(job, position, add=True)
+        if old_record.salary_range != record.salary_range:
+            self._salary_index.discard(position)
+            if record.salary_range is not None:
+                self._salary_index.add(position, record.salary_range)
+        self._count_values(old_job, -1)
+        self._count_values(job, 1)
+        if record.expires_at is not None:
+            self._schedule_expiry(record)
+        self._record_change('update', job.get('job_id'), position, record)
+        return record
+    
+    def _remove_job(self, position: int, op: str):
+        """Drop the job at `position`, leaving a None tombstone so other positions stay valid"""
+        job = self._jobs[position]
+        record = self._records[position]
+        self._jobs[position] = None
+        self._records[position] = None
+        del self._positions_by_id[job.get('job_id')]
+        for index_name in self.INDEXED_FIELDS:
+            for term in self._record_terms(record, index_name):
+                self._remove_posting(index_name, term, position)
+        self._update_bitmaps(job, position, add=False)
+        if record.salary_range is not None:
+            self._salary_index.discard(position)
+        self._count_values(job, -1)
+        self._record_change(op, job.get('job_id'), position, None)
+    
+    def _record_change(self, op: str, job_id: Any, position: int, record: Optional[JobRecord]):
+        """Bump the catalog version and log the change"""
+        self.version += 1
+        self._snapshot = None
+        change = JobChange(self.version, op, job_id, position, record)
+        self._changes.append(change)
+        if self._subscribers:
+            self._pending_changes.append(change)
+    
+    @staticmethod
+    def _record_terms(record: JobRecord, index_name: str) -> Set[str]:
+        value = getattr(record, index_name)
+        return {term for term in value if term} if isinstance(value, frozenset) else {value} - {''}
+    
+    def _update_bitmaps(self, job: Dict[str, Any], position: int, add: bool):
+        """Set or clear the job's bit in the bitmap of each of its filter field values"""
+        for field, bitmaps in self._bitmaps.items():
+            value = self.filter_value(job, field)
+            if not value:
+                continue
+            if add:
+                bitmaps.add(value, position)
+            else:
+                bitmaps.discard(value, position)
+    
+    def _schedule_expiry(self, record: JobRecord):
+        heapq.heappush(self._expiry, (record.expires_at, record.position))
+        self._next_expiry = self._expiry[0][0]
+    
+    def _count_values(self, job: Dict[str, Any], delta: int):
+        """Keep the get_unique_values() vocabularies in step with the catalog"""
+        for field, counts in self._value_counts.items():
+            self._count_field(counts, job.get(field), delta)
+    
+    @staticmethod
+    def _count_field(counts: Dict[Any, int], value: Any, delta: int):
+        values = value if isinstance(value, list) else [value] if value else []
+        for item in values:
+            count = counts.get(item, 0) + delta
+            if count:
+                counts[item] = count
+            else:
+                del counts[item]
+    
+    def _add_posting(self, index_name: str, term: str, position: int):
+        """Record that the job at `position` carries `term`"""
+        postings = self._index[index_name]
+        if term not in postings:
+            postings[term] = set()
+            self._add_term(index_name, term)
+        postings[term].add(position)
+    
+    def _remove_posting(self, index_name: str, term: str, position: int):
+        """Record that the job at `position` no longer carries `term`"""
+        postings = self._index[index_name]
+        positions = postings[term]
+        positions.discard(position)
+        if not positions:
+            del postings[term]
+            self._remove_term(index_name, term)
+    
+    def _add_term(self, index_name: str, term: str):
+        """Register a term that appears in the catalog for the first time"""
+        if index_name in self._substring_index:
+            self._substring_index[index_name].add(term)
+        elif index_name == 'location':
+            self._location_index.add(term)
+    
+    def _remove_term(self, index_name: str, term: str):
+        """Forget a term no job carries any more"""
+        if index_name in self._substring_index:
+            self._substring_index[index_name].discard(term)
+        elif index_name == 'location':
+            self._location_index.discard(term)
+    
     def get_unique_values(self, field: str) -> List[str]:
         """Get unique values for a specific field across all jobs"""
-        values = set()
-        for job in self._jobs:
-            value = job.get(field)
-            if isinstance(value, list):
-                values.update(value)
-            elif value:
-                values.add(value)
-        return sorted(list(values))
+        with self._lock:
+            counts = self._value_counts.get(field)
+            if counts is None:
+                # Counted once, then kept up to date by every write
+                counts = self._value_counts[field] = {}
+                for job in self._jobs:
+                    if job is not None:
+                        self._count_field(counts, job.get(field), 1)
+            return sorted(counts)
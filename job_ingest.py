@@ -0,0 +1,216 @@
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# CSV columns holding lists are '|'-separated, e.g. "Figma|Prototyping"
+CSV_LIST_FIELDS = ['required_skills', 'values_promoted']
+
+
+def iter_jsonl(path: str, offset: int = 0) -> Iterator[Tuple[int, Any]]:
+    """
+    Stream jobs from a JSON Lines file starting at byte `offset`
+
+    Yields:
+        (byte offset just past the line, parsed job or the exception raised while parsing it)
+    """
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                yield offset, json.loads(line)
+            except ValueError as e:
+                yield offset, e
+
+
+def iter_csv(path: str, offset: int = 0) -> Iterator[Tuple[int, Any]]:
+    """
+    Stream jobs from a CSV file with a header row, starting at byte `offset`
+
+    `salary_range` is written as "min-max"; list columns are '|'-separated.
+
+    Yields:
+        (byte offset just past the row, parsed job or the exception raised while parsing it)
+    """
+    with open(path, 'rb') as f:
+        header = next(csv.reader([_read_csv_record(f).decode('utf-8-sig')]))
+        offset = max(offset, f.tell())
+        f.seek(offset)
+        while True:
+            record = _read_csv_record(f)
+            if not record:
+                break
+            offset += len(record)
+            if not record.strip():
+                continue
+            try:
+                row = next(csv.reader([record.decode('utf-8')]))
+                if len(row) != len(header):
+                    raise ValueError(f"Expected {len(header)} columns, got {len(row)}")
+                yield offset, _job_from_csv_row(dict(zip(header, row)))
+            except ValueError as e:
+                yield offset, e
+
+
+def _read_csv_record(f) -> bytes:
+    """Read one CSV record, following quoted fields across line breaks"""
+    record = f.readline()
+    while record.count(b'"') % 2:
+        line = f.readline()
+        if not line:
+            break
+        record += line
+    return record
+
+
+def _job_from_csv_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Convert a CSV row of strings into a job dictionary"""
+    job = {field: value.strip() for field, value in row.items() if value and value.strip()}
+    for field in CSV_LIST_FIELDS:
+        if field in job:
+            job[field] = [item.strip() for item in job[field].split('|') if item.strip()]
+    if 'salary_range' in job:
+        low, _, high = job['salary_range'].partition('-')
+        try:
+            job['salary_range'] = [int(low), int(high)]
+        except ValueError:
+            raise ValueError(f"Invalid salary_range: {row['salary_range']}")
+    return job
+
+
+FEED_READERS = {
+    '.jsonl': iter_jsonl,
+    '.ndjson': iter_jsonl,
+    '.csv': iter_csv
+}
+
+
+class JobIngestor:
+    """
+    Streams job feeds into a JobDatabase in bounded chunks.
+    Only one chunk of jobs is held in memory at a time; the byte offset after the
+    last committed chunk is reported so an interrupted load can be resumed.
+    """
+
+    def __init__(self, job_db, chunk_size: int = 1000, max_reported_failures: int = 1000):
+        if chunk_size <= 0:
+            raise ValueError(f"Chunk size must be positive, got {chunk_size}")
+        self.job_db = job_db
+        self.chunk_size = chunk_size
+        self.max_reported_failures = max_reported_failures
+        self.logger = logging.getLogger(__name__)
+
+    def ingest(self, path: str, offset: int = 0, checkpoint=None) -> Dict[str, Any]:
+        """
+        Load a JSONL or CSV job feed
+
+        Args:
+            path: Feed file; the format is picked from the extension
+            offset: Byte offset to resume from (the 'offset' of an earlier report)
+            checkpoint: Optional callable invoked with the resume offset after every chunk
+
+        Returns:
+            Report with row counts, throughput, the resume offset and (capped) failures;
+            failure rows are counted from `offset`
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in FEED_READERS:
+            raise ValueError(f"Unsupported feed format: {extension}")
+
+        report = {'rows': 0, 'inserted': 0, 'failed': 0, 'failures': [], 'offset': offset}
+        started = time.monotonic()
+        chunk = []
+        chunk_rows = []
+        last_offset = offset
+
+        for last_offset, job in FEED_READERS[extension](path, offset):
+            row = report['rows']
+            report['rows'] += 1
+            if isinstance(job, Exception):
+                self._record_failure(report, row, None, str(job))
+            else:
+                chunk.append(job)
+                chunk_rows.append(row)
+
+            if len(chunk) >= self.chunk_size:
+                self._flush(report, chunk, chunk_rows, last_offset, started, checkpoint)
+                chunk, chunk_rows = [], []
+
+        if last_offset != report['offset']:
+            self._flush(report, chunk, chunk_rows, last_offset, started, checkpoint)
+
+        report['seconds'] = round(time.monotonic() - started, 3)
+        report['rows_per_second'] = round(report['rows'] / report['seconds'], 1) if report['seconds'] else 0.0
+        self.logger.info(f"Ingested {path}: {report['inserted']} of {report['rows']} rows "
+                         f"({report['rows_per_second']} rows/s), {report['failed']} rejected")
+        return report
+
+    def _flush(self, report: Dict[str, Any], chunk: List[Dict[str, Any]], chunk_rows: List[int],
+               offset: int, started: float, checkpoint):
+        """Add one chunk to the database and advance the resume offset"""
+        if chunk:
+            result = self.job_db.add_jobs(chunk)
+            report['inserted'] += result['inserted']
+            for failure in result['failed']:
+                self._record_failure(report, chunk_rows[failure['row']], failure['job_id'], failure['error'])
+        report['offset'] = offset
+        if checkpoint is not None:
+            checkpoint(offset)
+
+        elapsed = time.monotonic() - started
+        if self.logger.isEnabledFor(logging.DEBUG) and elapsed > 0:
+            self.logger.debug(f"{report['rows']} rows, {report['rows'] / elapsed:.0f} rows/s, offset {offset}")
+
+    def _record_failure(self, report: Dict[str, Any], row: int, job_id: Optional[str], error: str):
+        report['failed'] += 1
+        if len(report['failures']) < self.max_reported_failures:
+            report['failures'].append({'row': row, 'job_id': job_id, 'error': error})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load a JSONL or CSV job feed")
+    parser.add_argument('path', help="Feed file (.jsonl, .ndjson or .csv)")
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help="Persist into this SQL database (default: $DATABASE_URL; validate only if unset)")
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--offset', type=int, default=0, help="Byte offset to resume from")
+    parser.add_argument('--checkpoint', help="File that stores the resume offset after every chunk")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.database_url:
+        from sql_job_database import SQLJobDatabase
+        job_db = SQLJobDatabase(args.database_url, seed_sample_jobs=False)
+    else:
+        from job_data import JobDatabase
+        job_db = JobDatabase(jobs=[])
+
+    offset = args.offset
+    if args.checkpoint and os.path.exists(args.checkpoint) and not args.offset:
+        with open(args.checkpoint) as f:
+            offset = int(f.read().strip() or 0)
+
+    def write_checkpoint(position: int):
+        with open(args.checkpoint, 'w') as f:
+            f.write(str(position))
+
+    checkpoint = write_checkpoint if args.checkpoint else None
+    report = JobIngestor(job_db, chunk_size=args.chunk_size).ingest(args.path, offset, checkpoint)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0 if report['inserted'] or not report['rows'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
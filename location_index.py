@@ -0,0 +1,256 @@
+import os
+import re
+import json
+from functools import lru_cache
+from typing import Dict, List, Set, Tuple
+
+LOCATIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'locations.json')
+
+# Root of the remote part of the hierarchy: ('remote', country, region, ...) is remote work scoped to a place
+REMOTE = 'remote'
+
+_REMOTE_WORDS = re.compile(r'\b(?:remote|work from home|wfh)\b')
+# Words around a remote marker that say nothing about the place ("Remote in USA", "Remote - anywhere")
+_REMOTE_FILLER = {'in', 'from', 'within', 'across', 'based', 'only', 'anywhere', 'worldwide', 'global',
+                  'globally', 'fully', 'first', 'friendly', 'ok'}
+_SEPARATORS = re.compile(r'\s+[-–]\s+|[()/|;,]')
+
+# Match score of a job location within, or above, the preferred place (exact places score 1.0)
+RELATED_PLACE_SCORE = 0.8
+
+
+def _clean(text: str) -> str:
+    return ' '.join(text.lower().replace('.', '').split())
+
+
+class LocationNormalizer:
+    """
+    Resolves free-text locations to a path in a place hierarchy.
+    Paths run from the broadest place to the most specific one, e.g. "San Jose, CA" and
+    "san jose, california" both become ('united states', 'california', 'san jose'), and
+    "Remote in USA" becomes ('remote', 'united states'). Aliases (NYC, Bengaluru, CA) come
+    from data/locations.json; parts the gazetteer does not know are kept as they are.
+    """
+
+    def __init__(self, countries: Dict[str, List[str]], regions: Dict[str, Dict[str, List[str]]],
+                 cities: Dict[str, Dict[str, Dict[str, List[str]]]]):
+        self._countries = {}  # alias -> country
+        self._regions = {}  # alias -> [(country, region)], in gazetteer order
+        self._cities = {}  # alias -> [(country, region or None, city)], in gazetteer order
+        for country, aliases in countries.items():
+            for alias in [country] + aliases:
+                self._countries[_clean(alias)] = _clean(country)
+        for country, country_regions in regions.items():
+            for region, aliases in country_regions.items():
+                for alias in [region] + aliases:
+                    self._regions.setdefault(_clean(alias), []).append((_clean(country), _clean(region)))
+        for country, country_cities in cities.items():
+            for region, region_cities in country_cities.items():
+                for city, aliases in region_cities.items():
+                    place = (_clean(country), _clean(region) or None, _clean(city))
+                    for alias in [city] + aliases:
+                        self._cities.setdefault(_clean(alias), []).append(place)
+        self._known_countries = set(self._countries.values())
+        self.resolve = lru_cache(maxsize=1 << 16)(self._resolve)
+
+    @classmethod
+    def load(cls, path: str = LOCATIONS_FILE) -> 'LocationNormalizer':
+        """Load a gazetteer ({"countries", "regions", "cities"}) from a JSON file"""
+        with open(path, encoding='utf-8') as f:
+            gazetteer = json.load(f)
+        return cls(gazetteer['countries'], gazetteer.get('regions', {}), gazetteer.get('cities', {}))
+
+    def _resolve(self, text: str) -> Tuple[str, ...]:
+        """Path of a free-text location in the place hierarchy; () for an empty location"""
+        text = _clean(text or '')
+        remote = bool(_REMOTE_WORDS.search(text))
+        if remote:
+            text = _REMOTE_WORDS.sub(',', text)
+        parts = []
+        for part in _SEPARATORS.split(text):
+            words = part.split()
+            if remote:
+                words = [word for word in words if word not in _REMOTE_FILLER]
+            if words:
+                parts.append(' '.join(words))
+        path = self._place(parts)
+        return (REMOTE,) + path if remote else path
+
+    def _place(self, parts: List[str]) -> Tuple[str, ...]:
+        """
+        Resolve comma-separated parts, broadest (rightmost) first
+
+        The leftmost part is tried as a city before a region or country ("LA", "New York");
+        the others as a country before a region or city ("..., CA"). Parts the gazetteer
+        does not know, or that contradict the parts already resolved, go below the known ones.
+        """
+        country = region = city = None
+        unknown = []
+        for index in range(len(parts) - 1, -1, -1):
+            part = parts[index]
+            kinds = ('city', 'region', 'country') if index == 0 else ('country', 'region', 'city')
+            for kind in kinds:
+                if kind == 'country' and country is None and region is None and city is None:
+                    country = self._countries.get(part)
+                    if country is not None:
+                        break
+                elif kind == 'region' and region is None and city is None:
+                    matches = [match for match in self._regions.get(part, ()) if country in (None, match[0])]
+                    if matches:
+                        country, region = self._pick(matches, parts[:index])
+                        break
+                elif kind == 'city' and city is None:
+                    matches = [match for match in self._cities.get(part, ())
+                               if country in (None, match[0]) and region in (None, match[1])]
+                    if matches:
+                        country, city_region, city = self._pick(matches, parts[:index])
+                        region = region or city_region
+                        break
+            else:
+                unknown.append(part)
+        known = tuple(place for place in (country, region, city) if place is not None)
+        return known + tuple(unknown)
+
+    def _pick(self, matches: List[Tuple], other_parts: List[str]) -> Tuple:
+        """First of several same-named places, unless a city among `other_parts` lies in another"""
+        if len(matches) > 1:
+            for part in other_parts:
+                for country, region, _ in self._cities.get(part, ()):
+                    for match in matches:
+                        if match[:2] == (country, region) or (len(match) == 3 and match[0] == country):
+                            return match
+        return matches[0]
+
+    def is_placed(self, path: Tuple[str, ...]) -> bool:
+        """Whether a path starts at a known country (or is remote), rather than at an unknown place"""
+        return bool(path) and (path[0] == REMOTE or path[0] in self._known_countries)
+
+    def path_score(self, preferred: Tuple[str, ...], job: Tuple[str, ...]) -> float:
+        """
+        Score a job location path against a preferred location path
+
+        Same place: 1.0. Remote preferences match remote jobs whose scope contains, or
+        lies within, theirs (1.0). Otherwise places within or above the preferred one,
+        remote jobs scoped within it, and same-named places of which one could not be
+        placed in a country score RELATED_PLACE_SCORE.
+        """
+        if not preferred or not job:
+            return 0.0
+        if preferred[0] == REMOTE:
+            if job[0] == REMOTE and (job[:len(preferred)] == preferred or preferred[:len(job)] == job):
+                return 1.0
+            return 0.0
+        if job[0] == REMOTE:
+            # Remote work scoped within the preferred place
+            within = len(job) > len(preferred) and job[1:1 + len(preferred)] == preferred
+            return RELATED_PLACE_SCORE if within else 0.0
+        if job == preferred:
+            return 1.0
+        if job[:len(preferred)] == preferred or preferred[:len(job)] == job:
+            return RELATED_PLACE_SCORE
+        if job[-1] == preferred[-1] and not (self.is_placed(job) and self.is_placed(preferred)):
+            return RELATED_PLACE_SCORE
+        return 0.0
+
+    def score(self, preferred_location: str, job_location: str) -> float:
+        """path_score() of two free-text locations"""
+        return self.path_score(self.resolve(preferred_location), self.resolve(job_location))
+
+
+class LocationIndex:
+    """
+    Hierarchical index over the distinct job locations of the catalog.
+    Every location string is resolved once, when it first appears, and filed under its
+    node in the hierarchy (remote scope -> country -> region -> city). A preferred
+    location is resolved to a node and matched by walking that node's subtree and
+    ancestors, with the same scores as LocationNormalizer.path_score().
+    """
+
+    def __init__(self, normalizer: LocationNormalizer):
+        self.normalizer = normalizer
+        self._paths = {}  # location -> path
+        self._terms = {}  # node -> locations resolving to exactly that node
+        self._subtree = {}  # node -> locations at or below it, plus remote locations scoped at or below it
+        self._by_leaf = {}  # most specific place name -> non-remote nodes ending with it
+
+    def __contains__(self, location: str) -> bool:
+        return location in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def add(self, location: str):
+        """Add a location to the index"""
+        if location in self._paths:
+            return
+        path = self._paths[location] = self.normalizer.resolve(location)
+        if not path:
+            return
+        self._terms.setdefault(path, set()).add(location)
+        for node in self._ancestry(path):
+            self._subtree.setdefault(node, set()).add(location)
+        if path[0] != REMOTE:
+            self._by_leaf.setdefault(path[-1], set()).add(path)
+
+    def discard(self, location: str):
+        """Remove a location from the index if present"""
+        path = self._paths.pop(location, None)
+        if not path:
+            return
+        self._remove(self._terms, path, location)
+        for node in self._ancestry(path):
+            self._remove(self._subtree, node, location)
+        if path[0] != REMOTE and path not in self._terms:
+            self._remove(self._by_leaf, path[-1], path)
+
+    def match(self, location: str) -> Dict[str, float]:
+        """Indexed locations matching a preferred location, with their match score"""
+        preferred = self.normalizer.resolve(location)
+        if not preferred:
+            return {}
+        scores = {}
+        if preferred[0] == REMOTE:
+            # Remote jobs scoped within the preferred scope, or more broadly than it
+            for depth in range(1, len(preferred)):
+                scores.update(dict.fromkeys(self._terms.get(preferred[:depth], ()), 1.0))
+            scores.update(dict.fromkeys(self._subtree.get(preferred, ()), 1.0))
+            return scores
+        for depth in range(1, len(preferred)):
+            scores.update(dict.fromkeys(self._terms.get(preferred[:depth], ()), RELATED_PLACE_SCORE))
+        scores.update(dict.fromkeys(self._subtree.get(preferred, ()), RELATED_PLACE_SCORE))
+        placed = self.normalizer.is_placed(preferred)
+        for node in self._by_leaf.get(preferred[-1], ()):
+            if not (placed and self.normalizer.is_placed(node)):
+                scores.update(dict.fromkeys(self._terms[node], RELATED_PLACE_SCORE))
+        scores.update(dict.fromkeys(self._terms.get(preferred, ()), 1.0))
+        return scores
+
+    def related(self, location: str) -> Set[str]:
+        """
+        Indexed locations that `location` matches as a preference, or that would match it
+
+        For reverse lookups, e.g. the saved preferred locations a new job location can score for.
+        """
+        related = set(self.match(location))
+        path = self.normalizer.resolve(location)
+        if path and path[0] == REMOTE:
+            # Places of the remote scope, which score remote work within them
+            for depth in range(2, len(path) + 1):
+                related.update(self._terms.get(path[1:depth], ()))
+        return related
+
+    @staticmethod
+    def _ancestry(path: Tuple[str, ...]) -> List[Tuple[str, ...]]:
+        """Nodes whose subtree holds a location at `path`: its prefixes, and for remote work the places of its scope"""
+        nodes = [path[:depth] for depth in range(1, len(path) + 1)]
+        if path[0] == REMOTE:
+            nodes.extend(path[1:depth] for depth in range(2, len(path) + 1))
+        return nodes
+
+    @staticmethod
+    def _remove(nodes: Dict, node, item):
+        items = nodes.get(node)
+        if items is not None:
+            items.discard(item)
+            if not items:
+                del nodes[node]
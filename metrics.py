@@ -0,0 +1,220 @@
+import bisect
+import threading
+from typing import Dict, List, Any, Tuple, Callable, Iterable
+
+# Upper bounds (seconds) for request and stage latencies
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds (seconds) for a single component scorer call on one job
+COMPONENT_BUCKETS = (1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 1e-4, 1e-3)
+
+# A metric family produced by a collector: (name, type, help, [(labels, value), ...])
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram, optionally split by label values.
+    observe() is a bisect plus a few integer updates, cheap enough for per-request stages.
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [count per bucket..., count above the last bucket, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label_values: Tuple[str, ...] = ()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict[str, Any]]:
+        """Return cumulative bucket counts, count and sum per label values"""
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        result = {}
+        for labels, values in series.items():
+            cumulative = []
+            running = 0
+            for count in values[:-1]:
+                running += count
+                cumulative.append(running)
+            result[labels] = {'buckets': cumulative[:-1], 'count': running, 'sum': values[-1]}
+        return result
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self.snapshot().items()):
+            labels = dict(zip(self.label_names, label_values))
+            for bound, count in zip(self.buckets, series['buckets']):
+                lines.append(f"{self.name}_bucket{_format_labels(labels, le=_format_value(bound))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels, le='+Inf')} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series['count']}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values"""
+
+    def __init__(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, label_values: Tuple[str, ...] = ()):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, label_values: Tuple[str, ...] = ()) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for label_values, value in values:
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.label_names, label_values)))} "
+                         f"{_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the process's metrics and renders them in the Prometheus text format.
+    Values owned by other components (cache counters, index sizes) are read at
+    scrape time through registered collectors instead of being pushed on every change.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, documentation: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(name, lambda: Histogram(name, documentation, label_names, buckets))
+
+    def counter(self, name: str, documentation: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._register(name, lambda: Counter(name, documentation, label_names))
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        """Add a callable returning metric families; it is called on every render()"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def unregister_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """Render every metric and collector in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, name: str, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+
+def cache_collector(cache, prefix: str = 'job_recommendation_cache') -> Callable[[], List[MetricFamily]]:
+    """Collector exposing RecommendationCache.stats()"""
+    def collect():
+        stats = cache.stats()
+        families = []
+        for name, value in stats.items():
+            if name in ('size', 'max_size'):
+                families.append((f"{prefix}_{name}", 'gauge', f"Result cache {name.replace('_', ' ')}",
+                                 [({}, value)]))
+            else:
+                families.append((f"{prefix}_{name}_total", 'counter', f"Result cache {name.replace('_', ' ')}",
+                                 [({}, value)]))
+        return families
+    return collect
+
+
+def catalog_collector(job_db, prefix: str = 'job_catalog') -> Callable[[], List[MetricFamily]]:
+    """Collector exposing JobDatabase.index_stats()"""
+    def collect():
+        stats = job_db.index_stats()
+        return [
+            (f"{prefix}_jobs", 'gauge', "Jobs in the catalog", [({}, stats['jobs'])]),
+            (f"{prefix}_version", 'gauge', "Catalog version (incremented on every change)",
+             [({}, stats['version'])]),
+            (f"{prefix}_index_terms", 'gauge', "Distinct terms per inverted index",
+             [({'index': name}, count) for name, count in sorted(stats['terms'].items())])
+        ]
+    return collect
+
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    labels = dict(labels, **extra)
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+# Process-wide registry, served at /metrics
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'job_recommendation_stage_seconds',
+    "Time spent in each stage of a recommendation request",
+    ('stage',)
+)
+
+COMPONENT_SECONDS = REGISTRY.histogram(
+    'job_recommendation_component_seconds',
+    "Time one component scorer takes on one job (sampled)",
+    ('component',),
+    COMPONENT_BUCKETS
+)
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'job_recommendation_request_seconds',
+    "End-to-end recommend_jobs latency by outcome (cached, scored or partial)",
+    ('outcome',)
+)
+
+PRUNED_JOBS = REGISTRY.counter(
+    'job_recommendation_pruned_jobs_total',
+    "Jobs abandoned by pruned scoring before all components were scored"
+)
@@ -0,0 +1,129 @@
+import zlib
+import random
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Modulus of the MinHash permutations (a Mersenne prime above every 32-bit token hash)
+_PRIME = (1 << 61) - 1
+
+
+class MinHashLSH:
+    """
+    MinHash signatures of job term sets, stored in banded LSH tables.
+    A signature has `bands * rows` minimums of random hash permutations; two sets
+    agree on each one with probability equal to their Jaccard similarity, so a job
+    lands in the same bucket as a query in at least one band with probability
+    1 - (1 - s**rows) ** bands. More bands raise recall, more rows raise precision.
+    """
+
+    # Stale bucket entries (left by updated or removed jobs) that always trigger a rebuild
+    MIN_REBUILD = 4096
+
+    def __init__(self, bands: int = 16, rows: int = 2, seed: int = 1):
+        if bands < 1 or rows < 1:
+            raise ValueError("bands and rows must be positive")
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(bands * rows)]
+        self._token_signatures = {}  # token -> its permuted hashes; the term vocabulary is small
+        self._tables = [{} for _ in range(bands)]  # per band: bucket key -> positions
+        self._indexed = 0
+        self._stale = 0
+        self.version = None  # Catalog version the tables reflect; None until first built
+        self._lock = threading.Lock()
+
+    def signature(self, tokens: Iterable[Hashable]) -> Optional[Tuple[int, ...]]:
+        """MinHash signature of a token set, or None when it is empty"""
+        signatures = [self._token_signature(token) for token in tokens]
+        if not signatures:
+            return None
+        if len(signatures) == 1:
+            return signatures[0]
+        return tuple(map(min, *signatures))
+
+    def _token_signature(self, token: Hashable) -> Tuple[int, ...]:
+        signature = self._token_signatures.get(token)
+        if signature is None:
+            value = zlib.crc32(repr(token).encode('utf-8'))
+            signature = self._token_signatures[token] = tuple((a * value + b) % _PRIME
+                                                              for a, b in self._permutations)
+        return signature
+
+    def _bucket_keys(self, signature: Tuple[int, ...]) -> List[int]:
+        rows = self.rows
+        return [hash(signature[start:start + rows]) for start in range(0, len(signature), rows)]
+
+    def add(self, position: int, tokens: Iterable[Hashable]):
+        """Index the token set of the job at `position`"""
+        signature = self.signature(tokens)
+        if signature is None:
+            return
+        for table, key in zip(self._tables, self._bucket_keys(signature)):
+            bucket = table.get(key)
+            if bucket is None:
+                table[key] = [position]
+            else:
+                bucket.append(position)
+        self._indexed += 1
+
+    def discard(self, position: int):
+        """
+        Forget the job at `position`
+
+        Bucket entries are left in place and only counted: callers re-check candidates
+        against the catalog, and the tables are rebuilt once too many are stale.
+        """
+        self._stale += 1
+
+    def query(self, tokens: Iterable[Hashable]) -> Set[int]:
+        """Positions sharing a bucket with the token set in at least one band (may include stale entries)"""
+        signature = self.signature(tokens)
+        if signature is None:
+            return set()
+        positions = set()
+        for table, key in zip(self._tables, self._bucket_keys(signature)):
+            bucket = table.get(key)
+            if bucket is not None:
+                positions.update(bucket)
+        return positions
+
+    def sync(self, job_db: Any, snapshot: Any, tokens_of: Callable[[Any], Iterable[Hashable]]):
+        """
+        Bring the tables up to (at least) the version of a catalog snapshot
+
+        Replays job_db.changes_since() when the change log reaches back far enough,
+        and indexes the snapshot from scratch otherwise.
+        """
+        with self._lock:
+            if self.version is not None and self.version >= snapshot.version:
+                return
+            changes = None
+            if self.version is not None and self._stale <= max(self.MIN_REBUILD, self._indexed >> 2):
+                changes = job_db.changes_since(self.version)
+            if changes is None:
+                self._rebuild(snapshot, tokens_of)
+                return
+            for change in changes:
+                if change.op != 'add':
+                    self.discard(change.position)
+                if change.record is not None:
+                    self.add(change.position, tokens_of(change.record))
+            if changes:
+                self.version = changes[-1].version
+
+    def _rebuild(self, snapshot: Any, tokens_of: Callable[[Any], Iterable[Hashable]]):
+        self._tables = [{} for _ in range(self.bands)]
+        self._indexed = self._stale = 0
+        for record in snapshot.records:
+            if record is not None:
+                self.add(record.position, tokens_of(record))
+        self.version = snapshot.version
+
+    def stats(self) -> Dict[str, int]:
+        """Indexed job entries, stale ones among them and buckets per band"""
+        return {
+            'indexed': self._indexed,
+            'stale': self._stale,
+            'buckets': sum(len(table) for table in self._tables) // self.bands
+        }
@@ -0,0 +1,308 @@
+import atexit
+import heapq
+import itertools
+import logging
+import math
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from job_data import JobRecord
+from metrics import COMPONENT_SECONDS, PRUNED_JOBS
+
+# Catalog loaded by a worker process: base segment, catalog version, scoring engine and records
+_worker_state = {'base': None, 'version': None, 'engine': None, 'records': None}
+
+
+def _read_segment(name: str, size: int) -> Any:
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        with segment.buf[:size] as view:
+            return pickle.loads(view)
+    finally:
+        segment.close()
+
+
+def _load_catalog(engine_cls, catalog: Tuple):
+    """
+    Attach to a published catalog and keep its records for later requests
+
+    `catalog` is the base segment, (name, size, version), and the change segments published
+    on top of it, each (name, size, from version, to version) and each continuing the one
+    before. The base is read once; later requests only read the change segments ending
+    past the version the worker holds.
+    """
+    (name, size, version), deltas = catalog
+    target = deltas[-1][3] if deltas else version
+    if _worker_state['base'] != name or _worker_state['version'] > target:
+        records, title_synonyms = _read_segment(name, size)
+        engine = engine_cls(None)
+        engine.set_title_synonyms(title_synonyms)
+        _worker_state.update(base=name, version=version, engine=engine, records=records)
+    records = _worker_state['records']
+    for delta_name, delta_size, _, delta_version in deltas:
+        if delta_version <= _worker_state['version']:
+            continue
+        # The final (position, record) of every job changed in the segment's versions, in
+        # position order; positions past the end are added jobs. Applying a segment that
+        # starts before the held version gives the same records, so merged segments work too.
+        for position, record in _read_segment(delta_name, delta_size):
+            if position < len(records):
+                records[position] = record
+            else:
+                records.append(record)
+        _worker_state['version'] = delta_version
+    return _worker_state['engine'], records
+
+
+def _score_shard(engine_cls, weights: Dict[str, float], pruning: bool, catalog: Tuple, prefs: Dict[str, Any],
+                 positions: List[int], limit: int, scale: float) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
+    """
+    Worker entry point: score one shard of candidate positions
+
+    Returns its top-k and the metrics recorded while scoring, which the web process
+    records in its own registry (the one /metrics serves).
+    """
+    engine, records = _load_catalog(engine_cls, catalog)
+    engine.weights = weights
+    engine.pruning = pruning
+    engine.worker_metrics = {'component_seconds': [], 'pruned_jobs': 0}
+    return engine._select_top(prefs, records, positions, limit, scale), engine.worker_metrics
+
+
+class _Delta:
+    """A change segment: the jobs changed between two catalog versions, with their records at the later one"""
+
+    __slots__ = ('segment', 'size', 'start', 'end', 'positions')
+
+    def __init__(self, segment: shared_memory.SharedMemory, size: int, start: int, end: int, positions: Set[int]):
+        self.segment = segment
+        self.size = size
+        self.start = start
+        self.end = end
+        self.positions = positions
+
+
+class _Generation:
+    """A catalog published whole (the base segment) and the change segments published on top of it"""
+
+    __slots__ = ('synonyms', 'base', 'size', 'version', 'deltas', 'changed')
+
+    def __init__(self, synonyms: int, base: shared_memory.SharedMemory, size: int, version: int):
+        self.synonyms = synonyms  # id() of the title synonym table the catalog was published with
+        self.base = base
+        self.size = size
+        self.version = version  # Catalog version of the base segment
+        self.deltas = []  # Consecutive change segments, oldest (and largest) first
+        self.changed = set()  # Positions changed since the base version
+
+    @property
+    def latest(self) -> int:
+        return self.deltas[-1].end if self.deltas else self.version
+
+    def catalog(self, version: int) -> Optional[Tuple]:
+        """Worker catalog descriptor at `version`, or None when this generation does not hold it"""
+        count = 0
+        if version != self.version:
+            count = next((i + 1 for i, delta in enumerate(self.deltas) if delta.end == version), 0)
+            if not count:
+                return None
+        return ((self.base.name, self.size, self.version),
+                tuple((delta.segment.name, delta.size, delta.start, delta.end) for delta in self.deltas[:count]))
+
+    def segments(self) -> List[shared_memory.SharedMemory]:
+        return [self.base] + [delta.segment for delta in self.deltas]
+
+
+class ShardedScorer:
+    """
+    Scores catalog shards in worker processes for JobRecommendationEngine.
+    The normalized catalog is published into a shared memory segment; after a catalog
+    change only the changed jobs are published, as a small change segment the workers
+    apply on top of the records they already hold. Requests only send preferences,
+    candidate positions and segment names to the workers.
+    """
+
+    # Changed jobs, as a share of the catalog, after which the catalog is republished whole
+    REPUBLISH_FRACTION = 0.125
+
+    # Changed jobs that are always published as change segments, whatever the catalog size
+    MIN_REPUBLISH = 1024
+
+    def __init__(self, engine, shards: int):
+        self.engine = engine
+        self.shards = shards
+        self.logger = logging.getLogger(__name__)
+        self._executor = None
+        self._generations = []  # Published catalogs, newest last
+        self._retired = []  # Segments no longer published, freed once no request uses them
+        self._readers = {}  # Segment name -> requests in flight whose catalog includes the segment
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def select_top(self, prefs: Dict[str, Any], snapshot: Any, candidates,
+                   limit: int, scale: float = 1.0) -> List[Tuple[int, int]]:
+        """
+        Score candidates across worker processes and merge the per-shard top-k
+
+        Returns:
+            (rounded score, -position) pairs, best first, as in the serial path
+        """
+        catalog = self._publish(snapshot)
+        positions = list(candidates)
+        shard_size = math.ceil(len(positions) / self.shards)
+
+        futures = []
+        try:
+            for start in range(0, len(positions), shard_size):
+                futures.append(self._get_executor().submit(
+                    _score_shard, type(self.engine), dict(self.engine.weights), self.engine.pruning, catalog,
+                    prefs, positions[start:start + shard_size], limit, scale))
+            shard_results = []
+            for future in futures:
+                shard_top, worker_metrics = future.result()
+                shard_results.append(shard_top)
+                for component, seconds in worker_metrics['component_seconds']:
+                    COMPONENT_SECONDS.observe(seconds, (component,))
+                if worker_metrics['pruned_jobs']:
+                    PRUNED_JOBS.inc(worker_metrics['pruned_jobs'])
+        finally:
+            wait(futures)  # When a shard failed, the others may still be reading the segments
+            self._release_catalog(catalog)
+        return heapq.nlargest(limit, itertools.chain.from_iterable(shard_results))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.shards)
+        return self._executor
+
+    def _publish(self, snapshot: Any) -> Tuple:
+        """
+        Publish the catalog at the snapshot's version to shared memory, if not done yet
+
+        Returns the worker catalog descriptor. Its segments are not freed until the
+        descriptor is passed to _release_catalog, even if newer catalogs replace them.
+        """
+        with self._lock:
+            catalog = self._find_or_publish(snapshot)
+            for name in self._segment_names(catalog):
+                self._readers[name] = self._readers.get(name, 0) + 1
+            self._free_retired()
+            return catalog
+
+    def _release_catalog(self, catalog: Tuple):
+        """Let the segments of a descriptor returned by _publish be freed once no longer published"""
+        with self._lock:
+            for name in self._segment_names(catalog):
+                readers = self._readers.pop(name) - 1
+                if readers:
+                    self._readers[name] = readers
+            self._free_retired()
+
+    @staticmethod
+    def _segment_names(catalog: Tuple) -> List[str]:
+        (name, _, _), deltas = catalog
+        return [name] + [delta[0] for delta in deltas]
+
+    def _find_or_publish(self, snapshot: Any) -> Tuple:
+        """_publish without the segment accounting; callers hold self._lock"""
+        synonyms = id(self.engine.TITLE_SYNONYMS)
+        for generation in reversed(self._generations):
+            catalog = generation.catalog(snapshot.version) if generation.synonyms == synonyms else None
+            if catalog is not None:
+                return catalog
+
+        generation = self._generations[-1] if self._generations else None
+        if generation is not None and generation.synonyms == synonyms and generation.latest < snapshot.version:
+            if self._publish_changes(generation, snapshot):
+                return generation.catalog(snapshot.version)
+
+        # Republish when the title synonym table changed, the change log no longer
+        # reaches back or too many jobs changed since the catalog was last published whole
+        records = snapshot.records
+        payload = pickle.dumps(([self._strip(record) for record in records], self.engine.TITLE_SYNONYMS),
+                               protocol=pickle.HIGHEST_PROTOCOL)
+        generation = _Generation(synonyms, self._write_segment(payload), len(payload), snapshot.version)
+        self._generations.append(generation)
+
+        # Keep the previous generation for requests with snapshots from before the republish
+        while len(self._generations) > 2:
+            self._retired.extend(self._generations.pop(0).segments())
+
+        self.logger.debug(f"Published {len(records)} jobs ({len(payload)} bytes) to shared memory")
+        return generation.catalog(snapshot.version)
+
+    def _publish_changes(self, generation: _Generation, snapshot: Any) -> bool:
+        """
+        Publish the jobs changed since the generation's latest version as a change segment
+
+        Like a log-structured merge, the new segment is merged with the ones before it while
+        they are no larger, so a generation has O(log changes) segments and each changed job
+        is written O(log changes) times. Returns False when the catalog must be republished whole.
+        """
+        job_db = self.engine.job_db
+        changes = job_db.changes_since(generation.latest) if hasattr(job_db, 'changes_since') else None
+        if changes is None:
+            return False
+        positions = {change.position for change in changes if change.version <= snapshot.version}
+        records = snapshot.records
+        if len(generation.changed | positions) > max(self.MIN_REPUBLISH, len(records) * self.REPUBLISH_FRACTION):
+            return False
+        generation.changed |= positions
+
+        start = generation.latest
+        while generation.deltas and len(generation.deltas[-1].positions) <= len(positions):
+            merged = generation.deltas.pop()
+            self._retired.append(merged.segment)
+            positions |= merged.positions
+            start = merged.start
+        payload = pickle.dumps([(position, self._strip(records[position])) for position in sorted(positions)],
+                               protocol=pickle.HIGHEST_PROTOCOL)
+        generation.deltas.append(_Delta(self._write_segment(payload), len(payload), start, snapshot.version,
+                                        positions))
+        self.logger.debug(f"Published {len(positions)} changed jobs ({len(payload)} bytes) to shared memory")
+        return True
+
+    @staticmethod
+    def _strip(record: Optional[JobRecord]) -> Optional[JobRecord]:
+        """Copy of a record with only what workers need: the normalized fields, not the job dict"""
+        if record is None:  # Removed job
+            return None
+        copied = JobRecord.__new__(JobRecord)
+        for slot in JobRecord.__slots__:
+            setattr(copied, slot, getattr(record, slot))
+        copied.job = {'job_id': record.job.get('job_id')}
+        return copied
+
+    @staticmethod
+    def _write_segment(payload: bytes) -> shared_memory.SharedMemory:
+        segment = shared_memory.SharedMemory(create=True, size=len(payload))
+        segment.buf[:len(payload)] = payload
+        return segment
+
+    def _release(self, segment: shared_memory.SharedMemory):
+        segment.close()
+        segment.unlink()
+
+    def _free_retired(self):
+        """Free the retired segments no request in flight uses; callers hold self._lock"""
+        in_use = []
+        for segment in self._retired:
+            if segment.name in self._readers:
+                in_use.append(segment)
+            else:
+                self._release(segment)
+        self._retired = in_use
+
+    def close(self):
+        """Shut down worker processes and free shared memory"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            while self._generations:
+                self._retired.extend(self._generations.pop().segments())
+            while self._retired:
+                self._release(self._retired.pop())
@@ -0,0 +1,309 @@
+import queue
+import logging
+import threading
+from collections import namedtuple
+from typing import Dict, List, Any, Callable, Optional, Set
+
+from substring_index import SubstringIndex
+from location_index import LocationIndex, LocationNormalizer
+from job_data import JobDatabase
+
+# A saved profile: raw preferences as saved, their normalized form and the alert threshold
+SavedProfile = namedtuple('SavedProfile', ['profile_id', 'preferences', 'prefs', 'min_score'])
+
+# A new job scoring at least a saved profile's min_score
+MatchEvent = namedtuple('MatchEvent', ['profile_id', 'job_id', 'match_score', 'breakdown', 'version'])
+
+
+class QueueSink:
+    """
+    Match event sink backed by an in-process queue.
+    Events are put without blocking, so a full queue never stalls catalog writes;
+    consumers take them with get() or drain().
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.queue = queue.Queue(maxsize)
+
+    def __call__(self, event: MatchEvent):
+        self.queue.put_nowait(event)  # Raises queue.Full when the consumer falls behind
+
+    def drain(self, max_events: Optional[int] = None) -> List[MatchEvent]:
+        """Take up to `max_events` pending events (all of them when None) without waiting"""
+        events = []
+        while max_events is None or len(events) < max_events:
+            try:
+                events.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+
+class ProfileStore:
+    """
+    Saved candidate preference profiles, indexed by skills, locations and industries.
+    Each index maps a normalized term to the profiles using it, and the term
+    vocabularies get the same partial matching as the catalog's (substrings for skills
+    and industries, the place hierarchy for locations), so the profiles a job can
+    match are found from the job's own terms.
+    """
+
+    # Preference lists whose terms are indexed
+    INDEXED_PREFERENCES = ('skills', 'locations', 'industries')
+
+    def __init__(self, locations: Optional[LocationNormalizer] = None):
+        self._profiles = {}  # profile_id -> SavedProfile
+        self._postings = {pref_key: {} for pref_key in self.INDEXED_PREFERENCES}  # term -> profile ids
+        self._skill_terms = SubstringIndex()
+        self._location_terms = LocationIndex(locations or JobDatabase.LOCATIONS)
+        self._industry_terms = SubstringIndex()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, profile_id: str) -> bool:
+        return profile_id in self._profiles
+
+    def get(self, profile_id: str) -> Optional[SavedProfile]:
+        return self._profiles.get(profile_id)
+
+    def profiles(self) -> List[SavedProfile]:
+        with self._lock:
+            return list(self._profiles.values())
+
+    def save(self, profile: SavedProfile):
+        """Add a profile, replacing any saved under the same id"""
+        with self._lock:
+            self.remove(profile.profile_id)
+            self._profiles[profile.profile_id] = profile
+            for pref_key in self.INDEXED_PREFERENCES:
+                postings = self._postings[pref_key]
+                for term in self._terms(profile, pref_key):
+                    if term not in postings:
+                        postings[term] = set()
+                        self._vocabulary(pref_key).add(term)
+                    postings[term].add(profile.profile_id)
+
+    def remove(self, profile_id: str) -> bool:
+        """Forget a profile; returns whether it was saved"""
+        with self._lock:
+            profile = self._profiles.pop(profile_id, None)
+            if profile is None:
+                return False
+            for pref_key in self.INDEXED_PREFERENCES:
+                postings = self._postings[pref_key]
+                for term in self._terms(profile, pref_key):
+                    profile_ids = postings[term]
+                    profile_ids.discard(profile_id)
+                    if not profile_ids:
+                        del postings[term]
+                        self._vocabulary(pref_key).discard(term)
+            return True
+
+    def candidates(self, record: Any) -> Set[str]:
+        """Ids of the profiles sharing a skill, location or industry term with a job record"""
+        with self._lock:
+            profile_ids = set()
+            postings = self._postings
+            for skill in record.skills:
+                if skill:
+                    for term in self._skill_terms.find_related(skill):
+                        profile_ids |= postings['skills'][term]
+            if record.location:
+                for term in self._location_terms.related(record.location):
+                    profile_ids |= postings['locations'][term]
+            if record.industry:
+                for term in self._industry_terms.find_related(record.industry):
+                    profile_ids |= postings['industries'][term]
+            return profile_ids
+
+    def _vocabulary(self, pref_key: str):
+        if pref_key == 'skills':
+            return self._skill_terms
+        if pref_key == 'locations':
+            return self._location_terms
+        return self._industry_terms
+
+    @staticmethod
+    def _terms(profile: SavedProfile, pref_key: str) -> Set[str]:
+        return {term for term in profile.prefs[pref_key] if term}
+
+
+class ProfilePercolator:
+    """
+    Reverse matching for job alerts: scores each new job against saved profiles.
+    A job is only scored against the profiles sharing one of its skill, location or
+    industry terms, plus the few "broad" profiles whose min_score a job could reach
+    without sharing any; so the work per job follows the matches, not the profile count.
+    Matches go to `sink`, any callable taking a MatchEvent.
+    Jobs are percolated from the catalog's change log by a background thread, after
+    their write has finished, so saved profiles never hold up catalog writes.
+    """
+
+    # Alert threshold (0-100 match score) of profiles saved without one
+    DEFAULT_MIN_SCORE = 70
+
+    def __init__(self, engine, sink: Optional[Callable[[MatchEvent], None]] = None,
+                 store: Optional[ProfileStore] = None, max_profiles: Optional[int] = None):
+        self.engine = engine
+        self.sink = sink if sink is not None else QueueSink()
+        self.profiles = store if store is not None else ProfileStore()
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._broad = set()  # ids of profiles checked against every job
+        self._broad_weights = dict(engine.weights)  # Weights the broad set was computed with
+        self.max_profiles = max_profiles  # Saved profiles allowed (None: no limit)
+        self._job_db = None
+        self._version = None  # Catalog version percolated up to
+        self._changed = None  # Set after every write to the attached catalog
+        self._stop = None
+        self._consumer = None
+        self._consumer_lock = threading.Lock()  # Serializes catch_up() calls
+        self._stats = {'jobs': 0, 'checked': 0, 'matches': 0}
+
+    def attach(self, job_db: JobDatabase):
+        """Percolate every job added to `job_db` from now on"""
+        self.detach()
+        with self._consumer_lock:
+            self._job_db = job_db
+            self._version = job_db.version
+            self._changed = threading.Event()
+            self._stop = threading.Event()
+            self._consumer = threading.Thread(target=self._consume, args=(self._changed, self._stop),
+                                              name='profile-percolator', daemon=True)
+            self._consumer.start()
+        job_db.subscribe(self._on_catalog_change)
+
+    def detach(self):
+        """Stop percolating; jobs added before the call may not have been percolated yet"""
+        with self._consumer_lock:
+            job_db, consumer = self._job_db, self._consumer
+            if job_db is None:
+                return
+            self._job_db = self._consumer = None
+            self._stop.set()
+            self._changed.set()
+        job_db.unsubscribe(self._on_catalog_change)
+        if consumer is not threading.current_thread():
+            consumer.join()
+
+    def catch_up(self) -> int:
+        """
+        Percolate the jobs added to the attached catalog since the last call
+
+        The background thread calls this after every write; call it directly to have the
+        jobs added so far percolated before it returns. Returns the number of jobs percolated.
+        """
+        with self._consumer_lock:
+            job_db = self._job_db
+            if job_db is None:
+                return 0
+            changes = job_db.changes_since(self._version)
+            if changes is None:
+                latest = job_db.version
+                self.logger.warning(f"Change log no longer reaches back to version {self._version}; "
+                                    f"jobs added up to version {latest} were not percolated")
+                self._version = latest
+                return 0
+            percolated = 0
+            for change in changes:
+                self._version = change.version
+                if change.op != 'add':
+                    continue
+                percolated += 1
+                for event in self.percolate(change.record, change.version):
+                    try:
+                        self.sink(event)
+                    except Exception as e:
+                        self.logger.error(f"Error delivering match of job {event.job_id} "
+                                          f"to profile {event.profile_id}: {e}")
+            return percolated
+
+    def save_profile(self, profile_id: str, preferences: Dict[str, Any],
+                     min_score: Optional[float] = None) -> SavedProfile:
+        """Save (or replace) a profile; raises ValueError for invalid preferences or min_score"""
+        min_score = self.DEFAULT_MIN_SCORE if min_score is None else min_score
+        if isinstance(min_score, bool) or not isinstance(min_score, (int, float)) or not 0 <= min_score <= 100:
+            raise ValueError(f"min_score must be a number between 0 and 100, got {min_score!r}")
+        profile = SavedProfile(str(profile_id), dict(preferences),
+                               self.engine._normalize_preferences(preferences), min_score)
+        with self._lock:
+            if (self.max_profiles is not None and profile.profile_id not in self.profiles
+                    and len(self.profiles) >= self.max_profiles):
+                raise ValueError(f"At most {self.max_profiles} alert profiles can be saved")
+            self.profiles.save(profile)
+            if self._is_broad(profile):
+                self._broad.add(profile.profile_id)
+            else:
+                self._broad.discard(profile.profile_id)
+        return profile
+
+    def remove_profile(self, profile_id: str) -> bool:
+        with self._lock:
+            self._broad.discard(profile_id)
+            return self.profiles.remove(profile_id)
+
+    def percolate(self, record: Any, version: Optional[int] = None) -> List[MatchEvent]:
+        """Match events of the saved profiles a job record scores at least min_score for"""
+        with self._lock:
+            if self.engine.weights != self._broad_weights:
+                self._refresh_broad()
+            profile_ids = self.profiles.candidates(record) | self._broad
+            events = []
+            for profile_id in profile_ids:
+                profile = self.profiles.get(profile_id)
+                if profile is None:
+                    continue
+                scored = self.engine._score_record(profile.prefs, record)
+                if scored is None:
+                    continue
+                match_score = round(scored[0])
+                if match_score >= profile.min_score:
+                    events.append(MatchEvent(profile_id, record.job.get('job_id'), match_score, scored[1], version))
+            self._stats['jobs'] += 1
+            self._stats['checked'] += len(profile_ids)
+            self._stats['matches'] += len(events)
+            return events
+
+    def stats(self) -> Dict[str, int]:
+        """Saved and broad profiles, percolated jobs, profiles scored against them and matches"""
+        with self._lock:
+            return {'profiles': len(self.profiles), 'broad_profiles': len(self._broad), **self._stats}
+
+    def _on_catalog_change(self, changes: List[Any]):
+        # Called under the catalog's write lock: only wake the background thread
+        changed = self._changed
+        if changed is not None:
+            changed.set()
+
+    def _consume(self, changed: threading.Event, stop: threading.Event):
+        """Background thread: percolate new jobs after each write until detached"""
+        while True:
+            changed.wait()
+            changed.clear()
+            if stop.is_set():
+                return
+            try:
+                self.catch_up()
+            except Exception as e:
+                self.logger.error(f"Error percolating new jobs: {e}")
+
+    def _is_broad(self, profile: SavedProfile) -> bool:
+        """Whether a job sharing no indexed term with the profile could still reach its min_score"""
+        prefs = profile.prefs
+
+        def best(pref_key: str, indexed: bool) -> float:
+            if not prefs[pref_key]:
+                return 0.5  # Neutral score if no preference
+            # Without a shared term an indexed component scores 0; empty terms match anything
+            return 0.0 if indexed and all(prefs[pref_key]) else 1.0
+
+        scores = (best('skills', True), best('titles', False), best('locations', True),
+                  best('industries', True), best('company_size', False), best('values', False), 1.0)
+        return round(self.engine._weighted_total(scores) * 100) >= profile.min_score
+
+    def _refresh_broad(self):
+        """Recompute the broad profiles after the engine's weights changed"""
+        self._broad_weights = dict(self.engine.weights)
+        self._broad = {profile.profile_id for profile in self.profiles.profiles() if self._is_broad(profile)}
@@ -0,0 +1,134 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Iterable, Callable
+
+
+def canonical_preferences_key(preferences: Dict[str, Any], limit: int,
+                              unordered_keys: Iterable[str] = ()) -> str:
+    """
+    Hash preferences into a cache key that is stable across equivalent submissions
+
+    Preference terms are lowercased and stripped; lists named in `unordered_keys`
+    are sorted as well. Lists whose order can change the score keep their order.
+    """
+    unordered_keys = set(unordered_keys)
+    canonical = {'limit': limit}
+    for key, value in preferences.items():
+        if key == 'request_id':
+            continue
+        if isinstance(value, list):
+            value = [term.lower().strip() if isinstance(term, str) else term for term in value]
+            if key in unordered_keys:
+                value.sort(key=str)
+        elif isinstance(value, str):
+            value = value.lower().strip()
+        canonical[key] = value
+    payload = json.dumps(canonical, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class RecommendationCache:
+    """
+    Bounded LRU cache of recommendation results with per-entry TTL.
+    Entries are tied to a catalog version. A newer version drops every entry unless
+    the owner reported the changes through invalidate_matching() first, which only
+    drops the entries those changes affect.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0):
+        if max_size <= 0:
+            raise ValueError(f"Cache size must be positive, got {max_size}")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.logger = logging.getLogger(__name__)
+        self._entries = OrderedDict()  # key -> (expires_at, results, context)
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.targeted_invalidations = 0
+
+    def get(self, key: str, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Return cached results for `key`, or None on a miss"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, results, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, key: str, version: int, results: List[Dict[str, Any]], context: Any = None):
+        """Store results computed against catalog `version`; `context` is passed to invalidate_matching()"""
+        with self._lock:
+            self._check_version(version)
+            if version != self._version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, results, context)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, version: Optional[int] = None):
+        """Drop every cached entry (and, with `version`, reject results computed before it)"""
+        with self._lock:
+            self._clear()
+            if version is not None:
+                self._version = max(version, self._version or 0)
+
+    def invalidate_matching(self, version: int, affected: Callable[[Any, List[Dict[str, Any]]], bool]):
+        """
+        Advance to catalog `version`, dropping only entries for which
+        `affected(context, results)` is true; the rest stay valid for the new version
+        """
+        with self._lock:
+            stale = [key for key, (_, results, context) in self._entries.items() if affected(context, results)]
+            for key in stale:
+                del self._entries[key]
+            self.targeted_invalidations += len(stale)
+            self._version = max(version, self._version or 0)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current cache size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'targeted_invalidations': self.targeted_invalidations,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
+
+    def _check_version(self, version: int):
+        """Forget entries computed against an older catalog"""
+        if self._version is None or version > self._version:
+            if self._entries:
+                self.logger.debug(f"Catalog changed to version {version}, clearing cache")
+                self._clear()
+            self._version = version
+
+    def _clear(self):
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
@@ -1,7 +1,34 @@
+import os
 import re
+import json
 import math
-from typing import Dict, List, Any, Tuple
+import time
+import heapq
+import bisect
+import itertools
+import threading
+from typing import Dict, List, Any, Tuple, Optional, Iterable, Set, FrozenSet
 import logging
+from vectorized_scoring import VectorizedScorer
+from parallel_scoring import ShardedScorer
+from recommendation_cache import RecommendationCache, canonical_preferences_key
+from minhash_lsh import MinHashLSH
+from bitmap_index import bitmap_positions, partition_positions
+from job_data import JobRecord, JobDatabase
+from metrics import STAGE_SECONDS, COMPONENT_SECONDS, REQUEST_SECONDS, PRUNED_JOBS
+
+TITLE_SYNONYMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'title_synonyms.json')
+
+
+def load_title_synonyms(path: str = TITLE_SYNONYMS_FILE) -> Dict[str, List[str]]:
+    """Load the job title synonym table (title -> synonyms) from a JSON file"""
+    with open(path, encoding='utf-8') as f:
+        synonyms = json.load(f)
+    return {
+        title.lower().strip(): [synonym.lower().strip() for synonym in title_synonyms]
+        for title, title_synonyms in synonyms.items()
+    }
+
 
 class JobRecommendationEngine:
     """
@@ -20,25 +47,101 @@ class JobRecommendationEngine:
         'salary': 0.05       # 5%
     }
     
-    # Semantic matching for job titles
-    TITLE_SYNONYMS = {
-        'ux designer': ['user experience designer', 'product designer', 'interaction designer'],
-        'ui designer': ['user interface designer', 'visual designer', 'product designer'],
-        'product designer': ['ux designer', 'ui designer', 'user experience designer'],
-        'senior ux designer': ['senior product designer', 'lead ux designer'],
-        'frontend developer': ['front-end developer', 'ui developer', 'web developer'],
-        'backend developer': ['back-end developer', 'server-side developer'],
-        'full stack developer': ['fullstack developer', 'full-stack developer'],
-        'data scientist': ['machine learning engineer', 'data analyst'],
-        'software engineer': ['software developer', 'programmer'],
-        'design manager': ['design lead', 'head of design'],
-        'engineering manager': ['engineering lead', 'tech lead']
+    # Scored criteria, in the order their weighted scores are accumulated
+    COMPONENTS = ('skills', 'title', 'location', 'industry', 'company_size', 'values', 'salary')
+    
+    # Semantic matching for job titles, loaded from data/title_synonyms.json
+    TITLE_SYNONYMS = load_title_synonyms()
+    
+    # Scoring backends: per-job Python loop or NumPy arrays over the whole catalog
+    BACKENDS = ('python', 'numpy')
+    
+    # Smallest candidate set worth fanning out to worker processes
+    PARALLEL_MIN_JOBS = 5000
+    
+    # Preference key -> catalog index its terms are resolved against
+    PREFERENCE_INDEXES = {
+        'skills': 'skills',
+        'titles': 'title',
+        'locations': 'location',
+        'industries': 'industry',
+        'company_size': 'company_size',
+        'values': 'values'
+    }
+    
+    # Indexes whose postings approximate retrieval replaces with MinHash LSH lookups
+    LSH_INDEXES = ('skills', 'values')
+    
+    # Preference key -> job field it filters on (see JobDatabase.FILTER_FIELDS)
+    FILTER_PREFERENCES = {
+        'role_level': 'role_level',
+        'role_types': 'employment_type'
     }
     
-    def __init__(self, job_database):
+    # How jobs failing a filter are treated: excluded, or scored with a penalty
+    FILTER_MODES = ('hard', 'soft')
+    
+    # Factor applied to the match score of jobs failing a soft filter
+    SOFT_FILTER_FACTOR = 0.5
+    
+    # Preference lists whose order never changes the score (sorted in cache keys)
+    UNORDERED_PREFERENCES = ('titles', 'company_size', 'values', 'role_level', 'role_types')
+    
+    # Writes touching more jobs than this clear the result cache instead of checking each entry
+    TARGETED_INVALIDATION_MAX_CHANGES = 64
+    
+    # Candidates scored between deadline checks
+    DEADLINE_CHECK_INTERVAL = 1024
+    
+    # Jobs at catalog positions divisible by this get per-component timings recorded
+    COMPONENT_SAMPLE_INTERVAL = 64
+    
+    # Component scorers as called by _score_components, for sampled per-component timings
+    TIMED_COMPONENTS = (
+        ('skills', lambda self, prefs, record: self._match_skills(prefs['skills'], prefs['skill_matches'],
+                                                                  record.skills)),
+        ('title', lambda self, prefs, record: self._categorical_score(prefs, 'title', record.title)),
+        ('location', lambda self, prefs, record: self._categorical_score(prefs, 'location', record.location)),
+        ('industry', lambda self, prefs, record: self._categorical_score(prefs, 'industry', record.industry)),
+        ('company_size', lambda self, prefs, record: self._categorical_score(prefs, 'company_size',
+                                                                             record.company_size)),
+        ('values', lambda self, prefs, record: self._match_values(prefs['values'], record.values)),
+        ('salary', lambda self, prefs, record: self._match_salary(prefs['min_salary'], record.salary_range))
+    )
+    
+    # Distance (in base currency units) within which a salary range outside the
+    # minimum salary still gets a partial salary score
+    SALARY_BAND_WIDTH = 20000
+    
+    # Slack when comparing a job's score upper bound with the k-th best score, so float
+    # rounding in the bound can never prune a job exhaustive scoring would keep
+    PRUNING_EPSILON = 1e-9
+    
+    def __init__(self, job_database, backend: str = 'python', shards: int = 0,
+                 cache: Optional[RecommendationCache] = None, pruning: bool = False,
+                 lsh: Optional[MinHashLSH] = None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown scoring backend {backend!r}, expected one of {self.BACKENDS}")
+        if shards > 1 and backend != 'python':
+            raise ValueError("Sharded scoring is only available with the python backend")
+        if pruning and backend != 'python':
+            raise ValueError("Pruned scoring is only available with the python backend")
         self.job_db = job_database
         self.weights = self.DEFAULT_WEIGHTS.copy()
         self.logger = logging.getLogger(__name__)
+        self.backend = backend
+        self.pruning = pruning
+        self._vector_scorer = VectorizedScorer(self) if backend == 'numpy' else None
+        self._sharded_scorer = ShardedScorer(self, shards) if shards > 1 else None
+        self.cache = cache
+        self.lsh = lsh  # Approximate retrieval of skill/value candidates when set
+        self._local = threading.local()  # Per-thread stats of the last request
+        # Set in sharding worker processes, whose own registry is never served: sampled
+        # component timings and pruned counts are collected here and returned to the web process
+        self.worker_metrics = None
+        self.set_title_synonyms(self.TITLE_SYNONYMS)
+        if cache is not None and job_database is not None:
+            job_database.subscribe(self._on_catalog_change)
     
     def set_weights(self, weights: Dict[str, float]):
         """Update the weights for matching criteria"""
@@ -47,6 +150,35 @@ class JobRecommendationEngine:
             raise ValueError(f"Weights must sum to 1.0, got {total_weight}")
         self.weights.update(weights)
     
+    def set_title_synonyms(self, synonyms: Dict[str, List[str]]):
+        """Replace the title synonym table and precompute title-pair similarities"""
+        similarity = {}
+        titles_by_synonym = {}
+        
+        # Direct synonyms in either direction
+        for title, title_synonyms in synonyms.items():
+            for synonym in title_synonyms:
+                similarity[(title, synonym)] = 0.9
+                similarity[(synonym, title)] = 0.9
+                titles_by_synonym.setdefault(synonym, set()).add(title)
+        
+        # Titles sharing a synonym
+        for titles in titles_by_synonym.values():
+            for title in titles:
+                for other in titles:
+                    if title != other:
+                        similarity.setdefault((title, other), 0.8)
+        
+        similar_titles = {}
+        for title, other in similarity:
+            similar_titles.setdefault(title, set()).add(other)
+        
+        self.TITLE_SYNONYMS = synonyms
+        self._title_similarity = similarity
+        self._similar_titles = similar_titles
+        if self.cache is not None:
+            self.cache.invalidate()
+    
     def recommend_jobs(self, preferences: Dict[str, Any], limit: int = 20) -> List[Dict[str, Any]]:
         """
         Generate job recommendations based on candidate preferences
@@ -58,115 +190,771 @@ class JobRecommendationEngine:
         Returns:
             List of job recommendations with match scores
         """
+        return self.recommend_jobs_with_deadline(preferences, limit)[0]
+    
+    def recommend_jobs_with_deadline(self, preferences: Dict[str, Any], limit: int = 20,
+                                     deadline: Optional[float] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Generate job recommendations, scoring only until `deadline` (a time.monotonic() value)
+        
+        The deadline is checked between chunks of candidates by the python backend's
+        serial path; the numpy backend and sharded scoring check it once before scoring.
+        
+        Returns:
+            Tuple of (recommendations, complete). Incomplete results are the best of
+            the jobs scored before the deadline and are not cached.
+        """
         try:
-            jobs = self.job_db.get_all_jobs()
-            self.logger.debug(f"Evaluating {len(jobs)} jobs against preferences")
+            request_started = started = time.perf_counter()
+            if self.cache is not None:
+                cache_key = canonical_preferences_key(preferences, limit, self.UNORDERED_PREFERENCES)
             
-            if not jobs:
+            snapshot = self.job_db.snapshot()
+            started = self._observe_stage('catalog_fetch', started)
+            stats = self._local.stats = {'catalog_version': snapshot.version, 'catalog_size': len(snapshot.records),
+                                         'cache_hit': False}
+            if self.cache is not None:
+                cached = self.cache.get(cache_key, snapshot.version)
+                started = self._observe_stage('cache_lookup', started)
+                if cached is not None:
+                    stats['cache_hit'] = True
+                    REQUEST_SECONDS.observe(started - request_started, ('cached',))
+                    return list(cached), True
+            
+            if not snapshot.records:
                 self.logger.warning("No jobs available in database")
-                return []
+                return [], True
             
-            scored_jobs = []
+            term_cache = {}
+            prefs = self._compile_preferences(preferences, term_cache)
+            self._observe_stage('compile', started)
+            recommendations, complete = self._recommend(prefs, snapshot, limit, term_cache, deadline, stats)
+            if self.cache is not None and complete:
+                self.cache.put(cache_key, snapshot.version, recommendations, dict(preferences))
+            REQUEST_SECONDS.observe(time.perf_counter() - request_started, ('scored' if complete else 'partial',))
+            return list(recommendations), complete
             
-            for job in jobs:
-                try:
-                    match_score, breakdown = self._calculate_match_score(preferences, job)
-                    
-                    if match_score > 0:  # Only include jobs with some match
-                        scored_jobs.append({
-                            'job_id': job.get('job_id'),
-                            'job_title': job.get('title'),
-                            'company': job.get('company'),
-                            'location': job.get('location'),
-                            'salary_range': job.get('salary_range'),
-                            'employment_type': job.get('employment_type'),
-                            'match_score': round(match_score),
-                            'breakdown': breakdown,
-                            'job_details': job
-                        })
-                except Exception as e:
-                    self.logger.error(f"Error scoring job {job.get('job_id', 'unknown')}: {e}")
-                    continue
+        except Exception as e:
+            self.logger.error(f"Error generating recommendations: {e}")
+            raise
+    
+    def last_request_stats(self) -> Dict[str, Any]:
+        """
+        Return catalog and candidate counts of the calling thread's last recommend_jobs call
+        
+        Keys: catalog_version, catalog_size, cache_hit and, when the request was scored,
+        candidates (jobs sharing a preference term, or the whole catalog) and complete.
+        """
+        return dict(getattr(self._local, 'stats', None) or {})
+    
+    def recommend_jobs_batch(self, preference_sets: List[Dict[str, Any]],
+                             limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Generate job recommendations for many candidate profiles in one call
+        
+        The catalog is fetched once, index lookups for preference terms are shared
+        across the batch, and identical preference sets are only scored once.
+        
+        Args:
+            preference_sets: Preference dictionaries, each optionally carrying a 'request_id'
+            limit: Maximum number of recommendations per preference set
+            
+        Returns:
+            Recommendations keyed by request id (the list position when no id is given)
+        """
+        try:
+            snapshot = self.job_db.snapshot()
+            term_cache = {}
+            results_by_prefs = {}
+            results = {}
             
-            # Sort by match score (descending) and limit results
-            scored_jobs.sort(key=lambda x: x['match_score'], reverse=True)
+            for i, preferences in enumerate(preference_sets):
+                if not isinstance(preferences, dict):
+                    raise ValueError(f"Preference set {i} must be an object")
+                request_id = str(preferences.get('request_id', i))
+                if request_id in results:
+                    raise ValueError(f"Duplicate request id {request_id}")
+                
+                key = canonical_preferences_key(preferences, limit)
+                if key not in results_by_prefs:
+                    prefs = self._compile_preferences(preferences, term_cache)
+                    results_by_prefs[key] = self._recommend(prefs, snapshot, limit, term_cache)[0] if snapshot.records else []
+                results[request_id] = results_by_prefs[key]
             
-            self.logger.debug(f"Generated {len(scored_jobs)} scored recommendations")
-            return scored_jobs[:limit]
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Scored {len(results_by_prefs)} distinct of {len(results)} preference sets")
+            return results
             
         except Exception as e:
-            self.logger.error(f"Error generating recommendations: {e}")
+            self.logger.error(f"Error generating batch recommendations: {e}")
             raise
     
-    def _calculate_match_score(self, preferences: Dict[str, Any], job: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
+    def _recommend(self, prefs: Dict[str, Any], snapshot: Any, limit: int,
+                   term_cache: Dict[Tuple[str, str], Any], deadline: Optional[float] = None,
+                   stats: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Score candidate jobs of a catalog snapshot and return the top `limit`
+        
+        The candidate count and completeness are added to `stats` when given.
+        
+        Returns:
+            Tuple of (recommendations, whether every candidate was scored before `deadline`)
+        """
+        if limit <= 0:
+            if stats is not None:
+                stats['candidates'] = 0
+                stats['complete'] = True
+            return [], True
+        started = time.perf_counter()
+        records = snapshot.records
+        candidates = self._generate_candidates(prefs, term_cache, snapshot, limit)
+        salary_floor = None
+        if candidates is not None:
+            # The index may already hold jobs added after the snapshot was taken
+            candidates = candidates[:bisect.bisect_left(candidates, len(records))]
+        elif prefs['min_salary'] and self._vector_scorer is None:
+            candidates, salary_floor = self._salary_candidates(prefs, snapshot, limit)
+        started = self._observe_stage('candidates', started)
+        penalized = []  # Jobs failing a soft filter, scored with SOFT_FILTER_FACTOR
+        if prefs['filters']:
+            candidates, penalized = self._apply_filters(prefs, len(records), candidates)
+            started = self._observe_stage('filter', started)
+        if stats is not None:
+            stats['candidates'] = (len(records) if candidates is None else len(candidates)) + len(penalized)
+            stats['complete'] = True
+        
+        if deadline is not None and time.monotonic() >= deadline:
+            if stats is not None:
+                stats['complete'] = False
+            return [], False
+        
+        if self._vector_scorer is not None:
+            recommendations = self._vector_scorer.top_k(prefs, snapshot, candidates, limit, penalized)
+            self._observe_stage('scoring', started)
+            return recommendations, True
+        
+        if candidates is None:
+            candidates = range(len(records))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Evaluating {len(candidates)} of {len(records)} jobs against preferences")
+        
+        top_jobs, complete = self._score_candidates(prefs, snapshot, candidates, penalized, limit, deadline)
+        if salary_floor is not None and complete and (len(top_jobs) < limit or top_jobs[-1][0] <= salary_floor):
+            # Fewer than `limit` jobs beat one outside every salary band: score the whole catalog
+            candidates, penalized = (self._apply_filters(prefs, len(records), None) if prefs['filters']
+                                     else (range(len(records)), []))
+            if stats is not None:
+                stats['candidates'] = len(candidates) + len(penalized)
+            top_jobs, complete = self._score_candidates(prefs, snapshot, candidates, penalized, limit, deadline)
+        if stats is not None:
+            stats['complete'] = complete
+        started = self._observe_stage('scoring', started)
+        
+        # Build response entries and breakdowns only for the final top-k
+        recommendations = []
+        for _, neg_position in top_jobs:
+            record = records[-neg_position]
+            match_score, breakdown = self._calculate_match_score(prefs, record)
+            if penalized and self._is_listed(penalized, -neg_position):
+                match_score *= self.SOFT_FILTER_FACTOR
+            recommendations.append(self._build_recommendation(record, match_score, breakdown))
+        self._observe_stage('top_k', started)
+        
+        return recommendations, complete
+    
+    def _score_candidates(self, prefs: Dict[str, Any], snapshot: Any, candidates: List[int], penalized: List[int],
+                          limit: int, deadline: Optional[float]) -> Tuple[List[Tuple[int, int]], bool]:
+        """
+        Select the top `limit` of the candidates and of the `penalized` jobs (scored with SOFT_FILTER_FACTOR)
+        
+        Returns:
+            Tuple of ((rounded score, -position) pairs, best first, whether every job was scored before `deadline`)
+        """
+        records = snapshot.records
+        complete = True
+        top_jobs = []
+        groups = [(candidates, 1.0), (penalized, self.SOFT_FILTER_FACTOR)] if penalized else [(candidates, 1.0)]
+        for group, scale in groups:
+            if self._sharded_scorer is not None and len(group) >= self.PARALLEL_MIN_JOBS:
+                group_top = self._sharded_scorer.select_top(prefs, snapshot, group, limit, scale)
+            elif deadline is None:
+                group_top = self._select_top(prefs, records, group, limit, scale)
+            else:
+                group_top, complete = self._select_top_before(prefs, records, group, limit, deadline, scale)
+            top_jobs = heapq.nlargest(limit, itertools.chain(top_jobs, group_top)) if top_jobs else group_top
+            if not complete:
+                break
+        return top_jobs, complete
+    
+    def _salary_candidates(self, prefs: Dict[str, Any], snapshot: Any,
+                           limit: int) -> Tuple[Optional[List[int]], Optional[int]]:
+        """
+        Candidates for preferences without any term, where only the salary score differs between jobs
+        
+        Jobs in a salary band (found with range lookups on the salary index) are the only
+        ones that can score above a job outside every band. Jobs in the same band that
+        pass the same filters score the same, so only the first `limit` of them can win.
+        
+        Returns:
+            Tuple of (ascending candidate positions, rounded score of a job outside every
+            band, or None when such jobs are not recommended at all). (None, None) when
+            the index has moved past the snapshot.
+        """
+        bands = self.job_db.salary_bands(prefs['min_salary'], self.SALARY_BAND_WIDTH, snapshot.version)
+        if bands is None:
+            return None, None
+        mask = self.job_db.filter_jobs(prefs['filters']) if prefs['filters'] else None
+        positions = []
+        for band in bands.values():
+            if mask is None:
+                positions.extend(band[:limit])
+                continue
+            passing, failing = partition_positions(mask, len(snapshot.records), band)
+            positions.extend(passing[:limit])
+            if prefs['filter_mode'] == 'soft':
+                positions.extend(failing[:limit])
+        positions.sort()
+        floor = self._weighted_total([0.0 if component == 'salary' else 0.5 for component in self.COMPONENTS]) * 100
+        return positions, round(floor) if floor > 0 else None
+    
+    def _apply_filters(self, prefs: Dict[str, Any], size: int,
+                       candidates: Optional[List[int]]) -> Tuple[List[int], List[int]]:
+        """
+        Evaluate the request's filters on the catalog bitmaps
+        
+        Returns:
+            Tuple of (candidates passing every filter, candidates failing one). In hard
+            mode the failing jobs are dropped, so the second list is empty.
+        """
+        mask = self.job_db.filter_jobs(prefs['filters'])
+        if prefs['filter_mode'] == 'hard':
+            return bitmap_positions(mask, size, candidates), []
+        return partition_positions(mask, size, range(size) if candidates is None else candidates)
+    
+    @staticmethod
+    def _is_listed(positions: List[int], position: int) -> bool:
+        """Check whether `position` is in an ascending list of positions"""
+        index = bisect.bisect_left(positions, position)
+        return index < len(positions) and positions[index] == position
+    
+    def _select_top_before(self, prefs: Dict[str, Any], records: List[Any], candidates: List[int], limit: int,
+                           deadline: float, scale: float = 1.0) -> Tuple[List[Tuple[int, int]], bool]:
+        """
+        _select_top in chunks, merging each chunk's top-k, until `deadline` passes
+        
+        Returns:
+            Tuple of (top jobs of the chunks scored, whether every candidate was scored)
+        """
+        top_jobs = []
+        for start in range(0, len(candidates), self.DEADLINE_CHECK_INTERVAL):
+            if time.monotonic() >= deadline:
+                self.logger.info(f"Deadline reached after scoring {start} of {len(candidates)} candidates")
+                return top_jobs, False
+            chunk = self._select_top(prefs, records, candidates[start:start + self.DEADLINE_CHECK_INTERVAL],
+                                     limit, scale)
+            top_jobs = heapq.nlargest(limit, itertools.chain(top_jobs, chunk))
+        return top_jobs, True
+    
+    def _select_top(self, prefs: Dict[str, Any], records: List[Any], candidates: Iterable[int],
+                    limit: int, scale: float = 1.0) -> List[Tuple[int, int]]:
+        """
+        Score candidate jobs and keep the best `limit` of them
+        
+        Candidates must be in ascending position order. Scores are multiplied by
+        `scale` before ranking (soft filter penalties).
+        
+        Returns:
+            (rounded score, -position) pairs, best first
+        """
+        if self.pruning:
+            return self._select_top_pruned(prefs, records, candidates, limit, scale)
+        
+        # Bounded min-heap of (rounded score, -position): the root is the weakest
+        # of the best `limit` jobs, ties going to the earlier catalog position
+        top_jobs = []
+        scored_count = 0
+        sample_interval = self.COMPONENT_SAMPLE_INTERVAL
+        
+        for position in candidates:
+            record = records[position]
+            if record is None:  # Removed job
+                continue
+            try:
+                if position % sample_interval:
+                    match_score = self._score_job(prefs, record)
+                else:
+                    match_score = self._score_job_timed(prefs, record)
+            except Exception as e:
+                self.logger.error(f"Error scoring job {record.job.get('job_id', 'unknown')}: {e}")
+                continue
+            
+            if match_score <= 0:  # Only include jobs with some match
+                continue
+            scored_count += 1
+            
+            entry = (round(match_score * scale), -position)
+            if len(top_jobs) < limit:
+                heapq.heappush(top_jobs, entry)
+            elif entry > top_jobs[0]:
+                heapq.heapreplace(top_jobs, entry)
+        
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Selected {len(top_jobs)} of {scored_count} scored jobs")
+        return sorted(top_jobs, reverse=True)
+    
+    def _select_top_pruned(self, prefs: Dict[str, Any], records: List[Any], candidates: Iterable[int],
+                           limit: int, scale: float = 1.0) -> List[Tuple[int, int]]:
+        """
+        _select_top that stops scoring a job once it can no longer enter the top `limit`
+        
+        Components are scored in descending weight order. After each one, the job's score
+        so far plus the most the remaining components could add is compared with the k-th
+        best score. Candidates come in ascending position order, so a later job only
+        displaces the k-th best with a strictly higher rounded score. Jobs that are scored
+        in full get the same total as _score_job, so results match exhaustive scoring.
+        The threshold is divided by `scale`, as bounds are on unscaled scores.
+        """
+        steps, constant_scores, max_total = self._pruning_plan(prefs)
+        top_jobs = []
+        scored_count = 0
+        pruned_count = 0
+        threshold = float('-inf')  # Weighted total a job must reach to still possibly enter top_jobs
+        sample_interval = self.COMPONENT_SAMPLE_INTERVAL
+        
+        for position in candidates:
+            record = records[position]
+            if record is None:  # Removed job
+                continue
+            try:
+                if not position % sample_interval:
+                    match_score = self._score_job_timed(prefs, record)
+                else:
+                    scores = list(constant_scores)
+                    bound = max_total
+                    pruned = False
+                    for index, weight, max_score, scorer in steps:
+                        score = scorer(record)
+                        scores[index] = score
+                        bound -= (max_score - score) * weight
+                        if bound < threshold:
+                            pruned = True
+                            break
+                    if pruned:
+                        pruned_count += 1
+                        continue
+                    # Combined in COMPONENTS order, exactly as _score_job does
+                    match_score = self._weighted_total(scores) * 100
+            except Exception as e:
+                self.logger.error(f"Error scoring job {record.job.get('job_id', 'unknown')}: {e}")
+                continue
+            
+            if match_score <= 0:  # Only include jobs with some match
+                continue
+            scored_count += 1
+            
+            entry = (round(match_score * scale), -position)
+            if len(top_jobs) < limit:
+                heapq.heappush(top_jobs, entry)
+            elif entry > top_jobs[0]:
+                heapq.heapreplace(top_jobs, entry)
+            else:
+                continue
+            if len(top_jobs) == limit:
+                threshold = ((top_jobs[0][0] + 0.5) / 100 - self.PRUNING_EPSILON) / scale
+        
+        if self.worker_metrics is not None:
+            self.worker_metrics['pruned_jobs'] += pruned_count
+        elif pruned_count:
+            PRUNED_JOBS.inc(pruned_count)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"Selected {len(top_jobs)} of {scored_count} scored jobs, pruned {pruned_count}")
+        return sorted(top_jobs, reverse=True)
+    
+    def _pruning_plan(self, prefs: Dict[str, Any]) -> Tuple[List[Tuple[int, float, float, Any]], List[float], float]:
+        """
+        Prepare pruned scoring for one request
+        
+        Returns:
+            Tuple of (steps, constant_scores, max_total). Steps are (component index,
+            weight, highest possible score, scorer) for components that depend on the
+            job, heaviest first; constant_scores holds the fixed score of every other
+            component in COMPONENTS order; max_total is the best weighted total possible.
+        """
+        match_skills = self._match_skills
+        match_values = self._match_values
+        match_salary = self._match_salary
+        skills, skill_matches = prefs['skills'], prefs['skill_matches']
+        values, min_salary = prefs['values'], prefs['min_salary']
+        
+        # component -> (highest possible score, scorer), or a constant score
+        plan = {
+            'skills': (1.0, lambda record: match_skills(skills, skill_matches, record.skills)) if skills else 0.5,
+            'values': (1.0, lambda record: match_values(values, record.values)) if values else 0.5,
+            'salary': (1.0, lambda record: match_salary(min_salary, record.salary_range)) if min_salary else 1.0
+        }
+        for field in ('title', 'location', 'industry', 'company_size'):
+            field_scores = prefs['scores'][field]
+            if field_scores is None:
+                plan[field] = 0.5
+            else:
+                plan[field] = (max(field_scores.values(), default=0.0),
+                               lambda record, get=field_scores.get, field=field: get(getattr(record, field), 0.0))
+        
+        steps = []
+        constant_scores = []
+        max_total = 0.0
+        for index, component in enumerate(self.COMPONENTS):
+            weight = self.weights[component]
+            entry = plan[component]
+            if isinstance(entry, tuple):
+                max_score, scorer = entry
+                steps.append((index, weight, max_score, scorer))
+                constant_scores.append(0.0)
+            else:
+                max_score = entry
+                constant_scores.append(entry)
+            max_total += max_score * weight
+        steps.sort(key=lambda step: -step[1])
+        return steps, constant_scores, max_total
+    
+    def _on_catalog_change(self, changes: List[Any]):
+        """Drop cached results that a catalog change could alter"""
+        version = changes[-1].version
+        if len(changes) > self.TARGETED_INVALIDATION_MAX_CHANGES:
+            self.cache.invalidate(version)
+            return
+        
+        changed_ids = {change.job_id for change in changes}
+        new_records = [change.record for change in changes if change.record is not None]
+        
+        def affected(preferences, results):
+            # Results listing a changed job are stale; a new or updated job can only
+            # enter results whose preferences it matches
+            if preferences is None or any(result['job_id'] in changed_ids for result in results):
+                return True
+            return any(self._may_match(preferences, record) for record in new_records)
+        
+        self.cache.invalidate_matching(version, affected)
+    
+    def _may_match(self, preferences: Dict[str, Any], record) -> bool:
+        """Check whether a job would be a scoring candidate for raw preferences"""
+        has_terms = False
+        for pref_key, index_name in self.PREFERENCE_INDEXES.items():
+            for term in preferences.get(pref_key) or []:
+                has_terms = True
+                term = term.lower().strip()
+                if index_name == 'skills':
+                    matched = any(skill and (term in skill or skill in term) for skill in record.skills)
+                elif index_name == 'title':
+                    matched = self._match_titles([term], record.title) > 0
+                elif index_name == 'location':
+                    matched = self._match_locations([term], record.location) > 0
+                elif index_name == 'industry':
+                    matched = self._match_industries([term], record.industry) > 0
+                elif index_name == 'values':
+                    matched = term in record.values
+                else:
+                    matched = term == record.company_size
+                if matched:
+                    return True
+        # Without indexable preferences every job is scored
+        return not has_terms
+    
+    def _score_record(self, prefs: Dict[str, Any], record) -> Optional[Tuple[float, Dict[str, int]]]:
+        """
+        Score one job record against normalized preferences without the catalog indexes
+        
+        Gives the score recommend_jobs would, also for a job the per-request lookup
+        tables were not compiled against (e.g. one that is being added).
+        
+        Returns:
+            Tuple of (match score, breakdown), or None when the job fails a hard filter
+        """
+        factor = 1.0
+        for field, accepted in prefs['filters'].items():
+            if JobDatabase.filter_value(record.job, field) not in accepted:
+                if prefs['filter_mode'] == 'hard':
+                    return None
+                factor = self.SOFT_FILTER_FACTOR
+        
+        skill_matches = [frozenset(skill for skill in record.skills if skill and (term in skill or skill in term))
+                         for term in prefs['skills']]
+        company_size = 0.5  # Neutral score if no preference
+        if prefs['company_size']:
+            company_size = 1.0 if record.company_size and record.company_size in prefs['company_size'] else 0.0
+        scores = (
+            self._match_skills(prefs['skills'], skill_matches, record.skills),
+            self._match_titles(prefs['titles'], record.title),
+            self._match_locations(prefs['locations'], record.location),
+            self._match_industries(prefs['industries'], record.industry),
+            company_size,
+            self._match_values(prefs['values'], record.values),
+            self._match_salary(prefs['min_salary'], record.salary_range)
+        )
+        breakdown = {name: round(score * 100) for name, score in zip(self.COMPONENTS, scores)}
+        return self._weighted_total(scores) * 100 * factor, breakdown
+    
+    @staticmethod
+    def _observe_stage(stage: str, started: float) -> float:
+        """Record the time since `started` for a stage and return the current time"""
+        now = time.perf_counter()
+        STAGE_SECONDS.observe(now - started, (stage,))
+        return now
+    
+    def _build_recommendation(self, record, match_score: float, breakdown: Dict[str, int]) -> Dict[str, Any]:
+        """Build the response entry for a scored job"""
+        job = record.job
+        return {
+            'job_id': job.get('job_id'),
+            'job_title': job.get('title'),
+            'company': job.get('company'),
+            'location': job.get('location'),
+            'salary_range': job.get('salary_range'),
+            'employment_type': job.get('employment_type'),
+            'currency': record.currency,
+            'match_score': round(match_score),
+            'breakdown': breakdown,
+            'job_details': job
+        }
+    
+    def _normalize_preferences(self, preferences: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize preference terms, the minimum salary and filters (ValueError for an unknown mode or currency)"""
+        prefs = {
+            key: [term.lower().strip() for term in preferences.get(key) or []]
+            for key in self.PREFERENCE_INDEXES
+        }
+        # Minimum salary in base currency units, like JobRecord.salary_range
+        min_salary = preferences.get('min_salary', 0)
+        currency = preferences.get('salary_currency')
+        if min_salary and currency:
+            min_salary = JobRecord.CURRENCY_RATES.normalize(min_salary, str(currency).strip())
+        prefs['min_salary'] = min_salary
+        
+        # Filters: job field -> accepted normalized values (any of them passes)
+        filters = {}
+        for pref_key, field in self.FILTER_PREFERENCES.items():
+            values = preferences.get(pref_key) or []
+            if isinstance(values, str):
+                values = [values]
+            accepted = frozenset(value.lower().strip() for value in values if isinstance(value, str) and value.strip())
+            if accepted:
+                filters[field] = accepted
+        prefs['filters'] = filters
+        prefs['filter_mode'] = str(preferences.get('filter_mode') or 'hard').lower()
+        if prefs['filter_mode'] not in self.FILTER_MODES:
+            raise ValueError(f"Unknown filter mode {preferences.get('filter_mode')!r}, "
+                             f"expected one of {self.FILTER_MODES}")
+        return prefs
+    
+    def _compile_preferences(self, preferences: Dict[str, Any],
+                             term_cache: Dict[Tuple[str, str], Any]) -> Dict[str, Any]:
         """
-        Calculate match score between preferences and job
+        Normalize preference terms and resolve them against the catalog indexes once per request
+        
+        Besides the normalized term lists, the result holds per-component lookup tables
+        (indexed job value -> score), so scoring a job only needs dict and set lookups.
+        """
+        prefs = self._normalize_preferences(preferences)
+        
+        def resolved(pref_key):
+            index_name = self.PREFERENCE_INDEXES[pref_key]
+            return [self._resolve_term(index_name, term, term_cache)[0] for term in prefs[pref_key]]
+        
+        # Skills: the indexed skills each preferred skill partially matches
+        prefs['skill_matches'] = [frozenset(matches) for matches in resolved('skills')]
+        
+        # Single-valued fields: best title match; first matching preference otherwise
+        scores = {}
+        for field, pref_key in (('title', 'titles'), ('location', 'locations'),
+                                ('industry', 'industries'), ('company_size', 'company_size')):
+            if not prefs[pref_key]:
+                scores[field] = None
+                continue
+            field_scores = {}
+            for matches in resolved(pref_key):
+                for value, score in matches.items():
+                    if field == 'title':
+                        field_scores[value] = max(score, field_scores.get(value, 0.0))
+                    else:
+                        field_scores.setdefault(value, score)
+            scores[field] = field_scores
+        prefs['scores'] = scores
+        
+        return prefs
+    
+    def _resolve_term(self, index_name: str, term: str,
+                      term_cache: Dict[Tuple[str, str], Any]) -> Tuple[Dict[str, float], Set[int]]:
+        """
+        Resolve one preference term against an index, memoized in `term_cache`
+        
+        Returns:
+            Tuple of (indexed term -> component score, positions of jobs carrying those terms)
+        """
+        key = (index_name, term)
+        resolved = term_cache.get(key)
+        if resolved is None:
+            matches = self._match_index_terms(index_name, term)
+            resolved = term_cache[key] = (matches, self.job_db.find_jobs(index_name, matches))
+        return resolved
+    
+    def _match_index_terms(self, index_name: str, term: str) -> Dict[str, float]:
+        """Find the indexed terms a preference term matches, with the score it gives them"""
+        db = self.job_db
+        
+        if index_name == 'skills':
+            # Exact match, or partial match (contains) either way
+            return {skill: 1.0 if skill == term else 0.7 for skill in db.find_related_terms('skills', term)}
+        
+        if index_name == 'title':
+            titles = db.find_related_terms('title', term)
+            titles.update(title for title in self._similar_titles.get(term, ()) if db.has_term('title', title))
+            scores = {title: self._match_titles([term], title) for title in titles}
+        elif index_name == 'location':
+            # Resolved to a node of the place hierarchy; its subtree and ancestors are the matches
+            return db.match_locations(term)
+        elif index_name == 'industry':
+            scores = {industry: self._match_industries([term], industry)
+                      for industry in db.find_related_terms('industry', term)}
+        else:
+            # Company size and values only match exactly
+            return {term: 1.0} if db.has_term(index_name, term) else {}
+        
+        return {value: score for value, score in scores.items() if score > 0}
+    
+    def _generate_candidates(self, prefs: Dict[str, Any], term_cache: Dict[Tuple[str, str], Any],
+                             snapshot: Any = None, limit: int = 0) -> Optional[List[int]]:
+        """
+        Collect catalog positions of jobs matching at least one preference term
+        
+        With an LSH index (and a snapshot), skills and values only contribute the jobs
+        whose skill/value set is similar to the preferred one, instead of every job
+        sharing a term. The exact postings are used when that finds fewer than `limit` jobs.
+        
+        Returns:
+            Sorted job positions, or None when no indexable preference is given
+        """
+        approximate = None
+        if self.lsh is not None and snapshot is not None:
+            approximate = self._lsh_candidates(prefs, snapshot)
+            if approximate is not None and len(approximate) < limit:
+                approximate = None
+        positions = set() if approximate is None else approximate
+        has_terms = False
+        
+        for pref_key, index_name in self.PREFERENCE_INDEXES.items():
+            for term in prefs[pref_key]:
+                has_terms = True
+                if approximate is None or index_name not in self.LSH_INDEXES:
+                    positions |= self._resolve_term(index_name, term, term_cache)[1]
+        
+        if not has_terms:
+            return None
+        return sorted(positions)
+    
+    def _lsh_candidates(self, prefs: Dict[str, Any], snapshot: Any) -> Optional[Set[int]]:
+        """
+        Jobs of the snapshot sharing an LSH bucket with the preferred skills and values
+        
+        Preferred skills the catalog has are looked up as they are, others through the
+        indexed skills they partially match. Returns None without any such term.
+        """
+        tokens = []
+        for term, matches in zip(prefs['skills'], prefs['skill_matches']):
+            if term in matches:
+                tokens.append(('skills', term))
+            else:
+                tokens.extend(('skills', skill) for skill in matches)
+        tokens.extend(('values', value) for value in prefs['values'] if self.job_db.has_term('values', value))
+        if not tokens:
+            return None
+        
+        self.lsh.sync(self.job_db, snapshot, self._lsh_tokens)
+        records = snapshot.records
+        size = len(records)
+        # Buckets keep entries of removed jobs and may already hold jobs added after the snapshot
+        return {position for position in self.lsh.query(tokens)
+                if position < size and records[position] is not None}
+    
+    @staticmethod
+    def _lsh_tokens(record) -> List[Tuple[str, str]]:
+        """Tokens of a job in the LSH tables: its skills and promoted values"""
+        tokens = [('skills', skill) for skill in record.skills if skill]
+        tokens.extend(('values', value) for value in record.values if value)
+        return tokens
+    
+    def _calculate_match_score(self, prefs: Dict[str, Any], record) -> Tuple[float, Dict[str, float]]:
+        """
+        Calculate match score between normalized preferences and a job record
         
         Returns:
             Tuple of (total_match_score, score_breakdown)
         """
-        breakdown = {}
+        scores = self._score_components(prefs, record)
+        breakdown = {name: round(score * 100) for name, score in zip(self.COMPONENTS, scores)}
+        return self._weighted_total(scores) * 100, breakdown
+    
+    def _score_job(self, prefs: Dict[str, Any], record) -> float:
+        """Calculate only the total match score (0-100) of a job record"""
+        return self._weighted_total(self._score_components(prefs, record)) * 100
+    
+    def _score_job_timed(self, prefs: Dict[str, Any], record) -> float:
+        """_score_job, recording the time each component scorer takes"""
+        scores = []
+        for component, scorer in self.TIMED_COMPONENTS:
+            started = time.perf_counter()
+            scores.append(scorer(self, prefs, record))
+            elapsed = time.perf_counter() - started
+            if self.worker_metrics is None:
+                COMPONENT_SECONDS.observe(elapsed, (component,))
+            else:
+                self.worker_metrics['component_seconds'].append((component, elapsed))
+        return self._weighted_total(scores) * 100
+    
+    def _score_components(self, prefs: Dict[str, Any], record) -> Tuple[float, ...]:
+        """Score each matching criterion (0-1), in COMPONENTS order"""
+        return (
+            self._match_skills(prefs['skills'], prefs['skill_matches'], record.skills),
+            self._categorical_score(prefs, 'title', record.title),
+            self._categorical_score(prefs, 'location', record.location),
+            self._categorical_score(prefs, 'industry', record.industry),
+            self._categorical_score(prefs, 'company_size', record.company_size),
+            self._match_values(prefs['values'], record.values),
+            self._match_salary(prefs['min_salary'], record.salary_range)
+        )
+    
+    def _weighted_total(self, scores: Tuple[float, ...]) -> float:
+        """Combine component scores using the configured weights"""
         total_score = 0.0
-        
-        # Skills matching (30%)
-        skills_score = self._match_skills(preferences.get('skills', []), job.get('required_skills', []))
-        breakdown['skills'] = skills_score
-        total_score += skills_score * self.weights['skills']
-        
-        # Title/Role matching (20%)
-        title_score = self._match_titles(preferences.get('titles', []), job.get('title', ''))
-        breakdown['title'] = title_score
-        total_score += title_score * self.weights['title']
-        
-        # Location matching (15%)
-        location_score = self._match_locations(preferences.get('locations', []), job.get('location', ''))
-        breakdown['location'] = location_score
-        total_score += location_score * self.weights['location']
-        
-        # Industry matching (10%)
-        industry_score = self._match_industries(preferences.get('industries', []), job.get('industry', ''))
-        breakdown['industry'] = industry_score
-        total_score += industry_score * self.weights['industry']
-        
-        # Company size matching (10%)
-        size_score = self._match_company_size(preferences.get('company_size', []), job.get('company_size', ''))
-        breakdown['company_size'] = size_score
-        total_score += size_score * self.weights['company_size']
-        
-        # Values matching (10%)
-        values_score = self._match_values(preferences.get('values', []), job.get('values_promoted', []))
-        breakdown['values'] = values_score
-        total_score += values_score * self.weights['values']
-        
-        # Salary matching (5%)
-        salary_score = self._match_salary(preferences.get('min_salary', 0), job.get('salary_range', []))
-        breakdown['salary'] = salary_score
-        total_score += salary_score * self.weights['salary']
-        
-        # Convert to 0-100 scale
-        return total_score * 100, {k: round(v * 100) for k, v in breakdown.items()}
-    
-    def _match_skills(self, preferred_skills: List[str], job_skills: List[str]) -> float:
+        for name, score in zip(self.COMPONENTS, scores):
+            total_score += score * self.weights[name]
+        return total_score
+    
+    def _categorical_score(self, prefs: Dict[str, Any], field: str, job_value: str) -> float:
+        """Look up the score of a single-valued job field in the compiled preferences"""
+        scores = prefs['scores'][field]
+        if scores is None:
+            return 0.5  # Neutral score if no preference
+        return scores.get(job_value, 0.0)
+    
+    # The _match_* helpers below expect preference terms and job fields that are
+    # already lowercased and stripped (see _compile_preferences and JobRecord).
+    
+    def _match_skills(self, preferred_skills: List[str], skill_matches: List[FrozenSet[str]],
+                      job_skills: FrozenSet[str]) -> float:
         """Match skills with partial scoring for similar skills"""
         if not preferred_skills:
             return 0.5  # Neutral score if no preference
         if not job_skills:
             return 0.0
         
-        preferred_lower = [skill.lower().strip() for skill in preferred_skills]
-        job_skills_lower = [skill.lower().strip() for skill in job_skills]
-        
         matches = 0
-        for pref_skill in preferred_lower:
+        for pref_skill, related_skills in zip(preferred_skills, skill_matches):
             # Exact match
-            if pref_skill in job_skills_lower:
+            if pref_skill in job_skills:
                 matches += 1
-            else:
-                # Partial match (contains)
-                for job_skill in job_skills_lower:
-                    if pref_skill in job_skill or job_skill in pref_skill:
-                        matches += 0.7
-                        break
+            # Partial match (contains), resolved through the substring index
+            elif not job_skills.isdisjoint(related_skills):
+                matches += 0.7
         
         return min(matches / len(preferred_skills), 1.0)
     
@@ -177,70 +965,40 @@ class JobRecommendationEngine:
         if not job_title:
             return 0.0
         
-        job_title_lower = job_title.lower().strip()
         best_match = 0.0
         
         for pref_title in preferred_titles:
-            pref_title_lower = pref_title.lower().strip()
-            
             # Exact match
-            if pref_title_lower == job_title_lower:
+            if pref_title == job_title:
                 return 1.0
             
             # Semantic matching using synonyms
-            match_score = self._semantic_title_match(pref_title_lower, job_title_lower)
+            match_score = self._semantic_title_match(pref_title, job_title)
             best_match = max(best_match, match_score)
             
             # Partial string matching
-            if pref_title_lower in job_title_lower or job_title_lower in pref_title_lower:
+            if pref_title in job_title or job_title in pref_title:
                 best_match = max(best_match, 0.8)
         
         return best_match
     
     def _semantic_title_match(self, pref_title: str, job_title: str) -> float:
-        """Check semantic similarity between job titles"""
-        # Check if either title has synonyms that match the other
-        pref_synonyms = self.TITLE_SYNONYMS.get(pref_title, [])
-        job_synonyms = self.TITLE_SYNONYMS.get(job_title, [])
-        
-        # Check if job title is a synonym of preferred title
-        if job_title in pref_synonyms:
-            return 0.9
-        
-        # Check if preferred title is a synonym of job title
-        if pref_title in job_synonyms:
-            return 0.9
-        
-        # Check for overlapping synonyms
-        for synonym in pref_synonyms:
-            if synonym in job_synonyms:
-                return 0.8
-        
-        return 0.0
+        """Check semantic similarity between job titles using the precomputed table"""
+        return self._title_similarity.get((pref_title, job_title), 0.0)
     
     def _match_locations(self, preferred_locations: List[str], job_location: str) -> float:
-        """Match job locations"""
+        """Match job locations through the place hierarchy (aliases, remote scope, country/region/city)"""
         if not preferred_locations:
             return 0.5
         if not job_location:
             return 0.0
         
-        job_location_lower = job_location.lower().strip()
-        
+        locations = JobDatabase.LOCATIONS
         for pref_location in preferred_locations:
-            pref_location_lower = pref_location.lower().strip()
-            
-            # Exact match
-            if pref_location_lower == job_location_lower:
-                return 1.0
-            
-            # Remote matching
-            if 'remote' in pref_location_lower and 'remote' in job_location_lower:
-                return 1.0
-            
-            # City/state partial matching
-            if pref_location_lower in job_location_lower or job_location_lower in pref_location_lower:
-                return 0.8
+            # Same place (1.0), or a place within or above the preferred one (0.8)
+            score = locations.score(pref_location, job_location)
+            if score:
+                return score
         
         return 0.0
     
@@ -251,59 +1009,35 @@ class JobRecommendationEngine:
         if not job_industry:
             return 0.0
         
-        job_industry_lower = job_industry.lower().strip()
-        
         for pref_industry in preferred_industries:
-            pref_industry_lower = pref_industry.lower().strip()
-            
-            if pref_industry_lower == job_industry_lower:
+            if pref_industry == job_industry:
                 return 1.0
             
             # Partial match for related industries
-            if pref_industry_lower in job_industry_lower or job_industry_lower in pref_industry_lower:
+            if pref_industry in job_industry or job_industry in pref_industry:
                 return 0.7
         
         return 0.0
     
-    def _match_company_size(self, preferred_sizes: List[str], job_size: str) -> float:
-        """Match company sizes"""
-        if not preferred_sizes:
-            return 0.5
-        if not job_size:
-            return 0.0
-        
-        job_size_lower = job_size.lower().strip()
-        
-        for pref_size in preferred_sizes:
-            pref_size_lower = pref_size.lower().strip()
-            
-            if pref_size_lower == job_size_lower:
-                return 1.0
-        
-        return 0.0
-    
-    def _match_values(self, preferred_values: List[str], job_values: List[str]) -> float:
+    def _match_values(self, preferred_values: List[str], job_values: Iterable[str]) -> float:
         """Match company values"""
         if not preferred_values:
             return 0.5
         if not job_values:
             return 0.0
         
-        preferred_lower = [val.lower().strip() for val in preferred_values]
-        job_values_lower = [val.lower().strip() for val in job_values]
-        
         matches = 0
-        for pref_val in preferred_lower:
-            if pref_val in job_values_lower:
+        for pref_val in preferred_values:
+            if pref_val in job_values:
                 matches += 1
         
         return matches / len(preferred_values)
     
-    def _match_salary(self, min_salary: int, job_salary_range: List[int]) -> float:
+    def _match_salary(self, min_salary: int, job_salary_range: Optional[Tuple[int, int]]) -> float:
         """Match salary requirements"""
         if not min_salary:
             return 1.0  # No salary preference
-        if not job_salary_range or len(job_salary_range) != 2:
+        if not job_salary_range:
             return 0.0
         
         job_min, job_max = job_salary_range
@@ -315,12 +1049,12 @@ class JobRecommendationEngine:
         # Partial match if close to range
         if min_salary < job_min:
             gap = job_min - min_salary
-            if gap <= 20000:  # Within 20k
+            if gap <= self.SALARY_BAND_WIDTH:  # Within 20k
                 return 0.8
         
         if min_salary > job_max:
             gap = min_salary - job_max
-            if gap <= 20000:  # Within 20k
+            if gap <= self.SALARY_BAND_WIDTH:  # Within 20k
                 return 0.6
         
         return 0.0
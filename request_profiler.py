@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import logging
+import itertools
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+
+class _ActiveRequest:
+    """A request being watched by the profiler"""
+
+    __slots__ = ('endpoint', 'preferences', 'started', 'started_at', 'sample_from', 'stacks', 'samples')
+
+    def __init__(self, endpoint: str, preferences: Any, started: float, sample_from: float):
+        self.endpoint = endpoint
+        self.preferences = preferences
+        self.started = started
+        self.started_at = time.time()
+        self.sample_from = sample_from  # perf_counter() time the sampler starts taking stacks
+        self.stacks = None  # Counter of stack -> samples, created on the first sample
+        self.samples = 0
+
+
+class SlowRequestProfiler:
+    """
+    Stack-sampling profiler for requests that run past a latency threshold.
+    Requests register their thread on entry; a background thread samples the stacks
+    of registered threads only once they have been running for `threshold_ms`, so
+    requests that finish in time cost a dict insert and delete. Profiles of requests
+    that end up slower than the threshold are kept in a bounded ring buffer.
+    """
+
+    def __init__(self, threshold_ms: float = 500.0, interval_ms: float = 5.0, max_profiles: int = 20,
+                 max_stack_depth: int = 64, max_stacks: int = 50,
+                 stats_provider: Optional[Callable[[], Dict[str, Any]]] = None):
+        if threshold_ms <= 0 or interval_ms <= 0:
+            raise ValueError("Profiler threshold and sampling interval must be positive")
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.max_stack_depth = max_stack_depth
+        self.max_stacks = max_stacks
+        self.stats_provider = stats_provider
+        self.logger = logging.getLogger(__name__)
+        self._active = {}  # thread id -> _ActiveRequest
+        self._profiles = deque(maxlen=max_profiles)
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._sampler = None
+        self._closed = False
+        self.slow_requests = 0
+
+    @contextmanager
+    def profile(self, endpoint: str, preferences: Any = None):
+        """Watch the calling thread for the duration of the block"""
+        thread_id = threading.get_ident()
+        started = time.perf_counter()
+        request = _ActiveRequest(endpoint, preferences, started, started + self.threshold)
+        with self._condition:
+            idle = not self._active
+            self._active[thread_id] = request
+            if self._sampler is None:
+                self._start_sampler()
+            elif idle:
+                self._condition.notify()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active.pop(thread_id, None)
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                self._record(request, duration)
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        """Summaries of the kept profiles, newest first (stacks omitted)"""
+        with self._condition:
+            profiles = list(self._profiles)
+        return [{key: value for key, value in profile.items() if key != 'stacks'} for profile in reversed(profiles)]
+
+    def get_profile(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        with self._condition:
+            for profile in self._profiles:
+                if profile['id'] == profile_id:
+                    return profile
+        return None
+
+    @staticmethod
+    def collapsed(profile: Dict[str, Any]) -> str:
+        """Render a profile's stacks in the collapsed format read by flame graph tools"""
+        return ''.join(f"{entry['stack']} {entry['samples']}\n" for entry in profile['stacks'])
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _start_sampler(self):
+        self._sampler = threading.Thread(target=self._run, name='slow-request-profiler', daemon=True)
+        self._sampler.start()
+
+    def _run(self):
+        """Sampler loop: sleeps until the next registered request crosses the threshold"""
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                if not self._active:
+                    self._condition.wait()
+                    continue
+                now = time.perf_counter()
+                overdue = {thread_id: request for thread_id, request in self._active.items()
+                           if request.sample_from <= now}
+                if not overdue:
+                    next_due = min(request.sample_from for request in self._active.values())
+                    self._condition.wait(max(next_due - now, 0.0))
+                    continue
+
+            self._sample(overdue)
+            time.sleep(self.interval)
+
+    def _sample(self, overdue: Dict[int, _ActiveRequest]):
+        frames = sys._current_frames()
+        for thread_id, request in overdue.items():
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            stack = self._format_stack(frame)
+            with self._condition:
+                if self._active.get(thread_id) is not request:
+                    continue  # Finished while we were sampling
+                if request.stacks is None:
+                    request.stacks = Counter()
+                request.stacks[stack] += 1
+                request.samples += 1
+        del frames
+
+    def _format_stack(self, frame) -> Tuple[str, ...]:
+        """Stack as root-first 'function (file:line)' entries, keeping the innermost frames"""
+        entries = []
+        while frame is not None and len(entries) < self.max_stack_depth:
+            code = frame.f_code
+            entries.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        entries.reverse()
+        return tuple(entries)
+
+    def _record(self, request: _ActiveRequest, duration: float):
+        with self._condition:
+            stacks = request.stacks or Counter()
+            samples = request.samples
+
+        leaf_counts = Counter()
+        for stack, count in stacks.items():
+            leaf_counts[stack[-1]] += count
+
+        profile = {
+            'id': next(self._ids),
+            'endpoint': request.endpoint,
+            'started_at': request.started_at,
+            'duration_ms': round(duration * 1000, 3),
+            'threshold_ms': round(self.threshold * 1000, 3),
+            'preference_shape': preference_shape(request.preferences),
+            'request_stats': self._request_stats(),
+            'samples': samples,
+            'interval_ms': round(self.interval * 1000, 3),
+            'top_frames': [{'frame': frame, 'samples': count} for frame, count in leaf_counts.most_common(10)],
+            'stacks': [{'stack': ';'.join(stack), 'samples': count}
+                       for stack, count in stacks.most_common(self.max_stacks)]
+        }
+        with self._condition:
+            self._profiles.append(profile)
+            self.slow_requests += 1
+        self.logger.warning(f"Slow {request.endpoint} request: {profile['duration_ms']}ms, "
+                            f"{samples} stack samples (profile {profile['id']})")
+
+    def _request_stats(self) -> Dict[str, Any]:
+        if self.stats_provider is None:
+            return {}
+        try:
+            return self.stats_provider()
+        except Exception as e:
+            self.logger.error(f"Error collecting request stats: {e}")
+            return {}
+
+
+def preference_shape(preferences: Any) -> Dict[str, Any]:
+    """Describe preferences without their values: list lengths, and whether scalars are set"""
+    if not isinstance(preferences, dict):
+        return {}
+    shape = {}
+    for key, value in preferences.items():
+        if isinstance(value, (list, tuple)):
+            shape[key] = len(value)
+        else:
+            shape[key] = bool(value)
+    return shape
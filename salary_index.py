@@ -0,0 +1,101 @@
+import bisect
+from array import array
+from typing import Dict, List, Iterable, Optional, Tuple, Callable
+
+
+class SalaryIndex:
+    """
+    Sorted interval index over normalized salary ranges.
+    Ranges are kept in two sorted runs, one by low end and one by high end, so the
+    jobs whose range contains, starts just above or ends just below an amount are
+    found with binary searches. Writes go to a small overlay (new ranges, plus the
+    positions whose sorted entry is outdated) that is merged in once it grows.
+    """
+
+    # Overlay size that always triggers a rebuild of the sorted runs
+    MIN_REBUILD = 4096
+
+    def __init__(self, source: Optional[Callable[[], Iterable[Tuple[int, int, int]]]] = None):
+        self._source = source  # Yields (position, low, high) of the initial catalog; read on first query
+        self._low_keys, self._low_positions, self._low_highs = array('q'), array('I'), array('q')
+        self._high_keys, self._high_positions, self._high_lows = array('q'), array('I'), array('q')
+        self._pending = {}  # position -> (low, high) added since the last build
+        self._stale = set()  # positions whose entry in the sorted runs is outdated
+
+    def add(self, position: int, salary_range: Tuple[int, int]):
+        self._pending[position] = salary_range
+
+    def discard(self, position: int):
+        self._pending.pop(position, None)
+        if self._source is not None or self._low_keys:
+            self._stale.add(position)
+
+    def bands(self, amount: float, width: float) -> Dict[float, List[int]]:
+        """
+        Positions in each salary band for `amount`, the way _match_salary scores them
+
+        Returns:
+            {1.0: ranges containing `amount`, 0.8: ranges starting at most `width`
+            above it, 0.6: ranges ending at most `width` below it}, positions ascending
+        """
+        self._refresh()
+        low_keys, high_keys = self._low_keys, self._high_keys
+        stale = self._stale
+
+        # Containing: walk whichever of "low <= amount" and "high >= amount" is shorter
+        below = bisect.bisect_right(low_keys, amount)
+        above = len(high_keys) - bisect.bisect_left(high_keys, amount)
+        if below <= above:
+            highs, positions = self._low_highs, self._low_positions
+            contains = [positions[i] for i in range(below) if highs[i] >= amount]
+        else:
+            lows, positions = self._high_lows, self._high_positions
+            contains = [positions[i] for i in range(len(high_keys) - above, len(high_keys)) if lows[i] <= amount]
+
+        starts_above = self._low_positions[bisect.bisect_right(low_keys, amount):
+                                           bisect.bisect_right(low_keys, amount + width)].tolist()
+        ends_below = self._high_positions[bisect.bisect_left(high_keys, amount - width):
+                                          bisect.bisect_left(high_keys, amount)].tolist()
+
+        bands = {1.0: contains, 0.8: starts_above, 0.6: ends_below}
+        if stale:
+            for score, positions in bands.items():
+                bands[score] = [position for position in positions if position not in stale]
+        for position, (low, high) in self._pending.items():
+            if low <= amount <= high:
+                bands[1.0].append(position)
+            elif amount < low and low - amount <= width:
+                bands[0.8].append(position)
+            elif amount > high and amount - high <= width:
+                bands[0.6].append(position)
+        for positions in bands.values():
+            positions.sort()
+        return bands
+
+    def _refresh(self):
+        """Load the initial catalog, or merge the overlay once it is large"""
+        if self._source is not None:
+            source, self._source = self._source, None
+            self._build(source())
+        elif len(self._pending) + len(self._stale) > max(self.MIN_REBUILD, len(self._low_keys) >> 3):
+            self._build(())
+
+    def _build(self, extra: Iterable[Tuple[int, int, int]]):
+        """Rebuild the sorted runs from their live entries, the overlay and `extra`"""
+        stale = self._stale
+        entries = [(position, low, high)
+                   for low, position, high in zip(self._low_keys, self._low_positions, self._low_highs)
+                   if position not in stale]
+        entries.extend(entry for entry in extra if entry[0] not in stale)
+        entries.extend((position, low, high) for position, (low, high) in self._pending.items())
+
+        entries.sort(key=lambda entry: (entry[1], entry[0]))
+        self._low_keys = array('q', (entry[1] for entry in entries))
+        self._low_positions = array('I', (entry[0] for entry in entries))
+        self._low_highs = array('q', (entry[2] for entry in entries))
+        entries.sort(key=lambda entry: (entry[2], entry[0]))
+        self._high_keys = array('q', (entry[2] for entry in entries))
+        self._high_positions = array('I', (entry[0] for entry in entries))
+        self._high_lows = array('q', (entry[1] for entry in entries))
+        self._pending = {}
+        self._stale = set()
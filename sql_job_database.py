@@ -0,0 +1,238 @@
+import json
+from typing import List, Dict, Any, Iterable, Set
+
+from sqlalchemy import (BigInteger, Column, ForeignKey, Integer, MetaData, String, Table, Text,
+                        create_engine, delete, func, insert, select, update)
+
+from job_data import JobDatabase, JobRecord
+
+metadata = MetaData()
+
+# Normalized copies of the filterable fields are stored next to the original job JSON
+jobs_table = Table(
+    'jobs', metadata,
+    Column('seq', Integer, primary_key=True, autoincrement=True),
+    Column('job_id', String(64), nullable=False, unique=True),
+    Column('title_key', String(255), nullable=False, index=True),
+    Column('location_key', String(255), nullable=False, index=True),
+    Column('industry_key', String(255), nullable=False, index=True),
+    Column('company_size_key', String(64), nullable=False, index=True),
+    Column('employment_type', String(64), index=True),
+    Column('role_level', String(64), index=True),
+    Column('salary_min', BigInteger, index=True),
+    Column('salary_max', BigInteger, index=True),
+    Column('data', Text, nullable=False)
+)
+
+job_skills_table = Table(
+    'job_skills', metadata,
+    Column('job_seq', Integer, ForeignKey('jobs.seq', ondelete='CASCADE'), primary_key=True),
+    Column('skill', String(255), primary_key=True, index=True)
+)
+
+job_values_table = Table(
+    'job_values', metadata,
+    Column('job_seq', Integer, ForeignKey('jobs.seq', ondelete='CASCADE'), primary_key=True),
+    Column('value', String(255), primary_key=True, index=True)
+)
+
+
+class SQLJobDatabase(JobDatabase):
+    """
+    Job database persisted in a SQL database (PostgreSQL in production, SQLite locally).
+    Jobs are loaded into the in-memory catalog for scoring, while candidate lookups
+    are pushed down to indexed SQL columns instead of in-memory posting sets.
+    Updates and removals are written through to the database; other workers only
+    pick up newly inserted rows on refresh().
+    """
+
+    # Index name -> (term column, job sequence column) used for SQL-side prefiltering
+    TERM_COLUMNS = {
+        'skills': (job_skills_table.c.skill, job_skills_table.c.job_seq),
+        'values': (job_values_table.c.value, job_values_table.c.job_seq),
+        'title': (jobs_table.c.title_key, jobs_table.c.seq),
+        'location': (jobs_table.c.location_key, jobs_table.c.seq),
+        'industry': (jobs_table.c.industry_key, jobs_table.c.seq),
+        'company_size': (jobs_table.c.company_size_key, jobs_table.c.seq)
+    }
+
+    # Maximum number of terms per IN (...) clause
+    QUERY_CHUNK_SIZE = 500
+
+    def __init__(self, database_url: str, pool_size: int = 5, max_overflow: int = 10,
+                 seed_sample_jobs: bool = True):
+        super().__init__(jobs=[])
+        self._positions_by_seq = {}
+        self._seqs_by_position = {}
+        self._last_seq = 0
+
+        engine_options = {'pool_pre_ping': True}
+        if not database_url.startswith('sqlite'):
+            engine_options.update(pool_size=pool_size, max_overflow=max_overflow, pool_recycle=1800)
+        self._engine = create_engine(database_url, **engine_options)
+        metadata.create_all(self._engine)
+
+        if seed_sample_jobs and self._count_jobs() == 0:
+            with self._engine.begin() as conn:
+                for job in self._load_sample_jobs():
+                    self._insert_job(conn, job)
+
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Load jobs written since the last refresh (e.g. by other workers); returns the count"""
+        query = select(jobs_table.c.seq, jobs_table.c.data).where(
+            jobs_table.c.seq > self._last_seq).order_by(jobs_table.c.seq)
+        loaded = 0
+        with self._engine.connect() as conn, self._writing():
+            for seq, data in conn.execute(query):
+                self._track_seq(seq, self._append_job(json.loads(data)))
+                loaded += 1
+        if loaded:
+            self.logger.info(f"Loaded {loaded} jobs from the database")
+        return loaded
+
+    def add_job(self, job: Dict[str, Any]) -> bool:
+        """Add a new job to the database"""
+        try:
+            self._validate_job(job)
+            self._store_jobs([job])
+            self.logger.info(f"Added job {job['job_id']}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error adding job: {e}")
+            return False
+
+    def add_jobs(self, jobs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Validate many jobs and insert the valid ones in a single transaction
+
+        Returns:
+            Report with the number of inserted jobs and per-row failures
+        """
+        valid = []
+        rows = []
+        failures = []
+        seen_ids = set()
+        for row, job in enumerate(jobs):
+            try:
+                self._validate_job(job)
+                if job['job_id'] in seen_ids:
+                    raise ValueError(f"Job ID {job['job_id']} already exists")
+                seen_ids.add(job['job_id'])
+                valid.append(job)
+                rows.append(row)
+            except Exception as e:
+                job_id = job.get('job_id') if isinstance(job, dict) else None
+                failures.append({'row': row, 'job_id': job_id, 'error': str(e)})
+
+        try:
+            self._store_jobs(valid)
+        except Exception as e:
+            self.logger.error(f"Error adding jobs: {e}")
+            failures.extend({'row': row, 'job_id': job['job_id'], 'error': str(e)}
+                            for row, job in zip(rows, valid))
+            failures.sort(key=lambda failure: failure['row'])
+            valid = []
+
+        self.logger.info(f"Added {len(valid)} jobs, {len(failures)} rejected")
+        return {'inserted': len(valid), 'failed': failures}
+
+    def _store_jobs(self, jobs: List[Dict[str, Any]]):
+        """Insert validated jobs in one transaction, then add them to the in-memory catalog"""
+        with self._engine.begin() as conn:
+            seqs = [self._insert_job(conn, job) for job in jobs]
+        with self._writing():
+            for seq, job in zip(seqs, jobs):
+                self._track_seq(seq, self._append_job(job))
+
+    def _track_seq(self, seq: int, record: JobRecord):
+        self._positions_by_seq[seq] = record.position
+        self._seqs_by_position[record.position] = seq
+        self._last_seq = max(self._last_seq, seq)
+
+    def _replace_job(self, position: int, job: Dict[str, Any]) -> JobRecord:
+        seq = self._seqs_by_position[position]
+        record = JobRecord(position, job)
+        with self._engine.begin() as conn:
+            conn.execute(update(jobs_table).where(jobs_table.c.seq == seq).values(**self._job_row(job, record)))
+            self._delete_terms(conn, seq)
+            self._insert_terms(conn, seq, record)
+        return super()._replace_job(position, job)
+
+    def _remove_job(self, position: int, op: str):
+        seq = self._seqs_by_position.pop(position)
+        with self._engine.begin() as conn:
+            self._delete_terms(conn, seq)
+            conn.execute(delete(jobs_table).where(jobs_table.c.seq == seq))
+        del self._positions_by_seq[seq]
+        super()._remove_job(position, op)
+
+    def find_jobs(self, index_name: str, terms: Iterable[str]) -> Set[int]:
+        """Return catalog positions of jobs carrying any of the given normalized terms"""
+        term_column, seq_column = self.TERM_COLUMNS[index_name]
+        terms = list(terms)
+        positions = set()
+        with self._engine.connect() as conn:
+            for start in range(0, len(terms), self.QUERY_CHUNK_SIZE):
+                chunk = terms[start:start + self.QUERY_CHUNK_SIZE]
+                for (seq,) in conn.execute(select(seq_column).where(term_column.in_(chunk))):
+                    position = self._positions_by_seq.get(seq)
+                    if position is not None:  # Rows from other workers show up after refresh()
+                        positions.add(position)
+        return positions
+
+    def _add_posting(self, index_name: str, term: str, position: int):
+        # Postings live in SQL; only the term vocabulary (with job counts) is kept in memory
+        vocabulary = self._index[index_name]
+        if term not in vocabulary:
+            vocabulary[term] = 0
+            self._add_term(index_name, term)
+        vocabulary[term] += 1
+
+    def _remove_posting(self, index_name: str, term: str, position: int):
+        vocabulary = self._index[index_name]
+        vocabulary[term] -= 1
+        if not vocabulary[term]:
+            del vocabulary[term]
+            self._remove_term(index_name, term)
+
+    def _count_jobs(self) -> int:
+        with self._engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(jobs_table)).scalar_one()
+
+    def _insert_job(self, conn, job: Dict[str, Any]) -> int:
+        """Insert a job and its skill/value rows; returns the new sequence number"""
+        record = JobRecord(0, job)
+        result = conn.execute(insert(jobs_table).values(**self._job_row(job, record)))
+        seq = result.inserted_primary_key[0]
+        self._insert_terms(conn, seq, record)
+        return seq
+
+    def _job_row(self, job: Dict[str, Any], record: JobRecord) -> Dict[str, Any]:
+        salary_min, salary_max = record.salary_range or (None, None)
+        return {
+            'job_id': job['job_id'],
+            'title_key': record.title,
+            'location_key': record.location,
+            'industry_key': record.industry,
+            'company_size_key': record.company_size,
+            'employment_type': job.get('employment_type'),
+            'role_level': job.get('role_level'),
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+            'data': json.dumps(job)
+        }
+
+    def _insert_terms(self, conn, seq: int, record: JobRecord):
+        skills = [{'job_seq': seq, 'skill': skill} for skill in record.skills if skill]
+        if skills:
+            conn.execute(insert(job_skills_table), skills)
+        values = [{'job_seq': seq, 'value': value} for value in record.values if value]
+        if values:
+            conn.execute(insert(job_values_table), values)
+
+    def _delete_terms(self, conn, seq: int):
+        conn.execute(delete(job_skills_table).where(job_skills_table.c.job_seq == seq))
+        conn.execute(delete(job_values_table).where(job_values_table.c.job_seq == seq))
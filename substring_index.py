@@ -0,0 +1,79 @@
+from typing import Set, Iterable
+
+
+class SubstringIndex:
+    """
+    Trigram index over a vocabulary of normalized terms.
+    Answers "which terms contain this fragment" and "which terms are contained in this
+    text" without scanning the whole vocabulary.
+    """
+
+    def __init__(self, terms: Iterable[str] = (), n: int = 3):
+        self.n = n
+        self._terms = set()
+        self._grams = {}  # n-gram -> terms containing it
+        for term in terms:
+            self.add(term)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, term: str):
+        """Add a term to the vocabulary"""
+        if term in self._terms:
+            return
+        self._terms.add(term)
+        for gram in self._ngrams(term):
+            self._grams.setdefault(gram, set()).add(term)
+
+    def discard(self, term: str):
+        """Remove a term from the vocabulary if present"""
+        if term not in self._terms:
+            return
+        self._terms.discard(term)
+        for gram in self._ngrams(term):
+            terms = self._grams[gram]
+            terms.discard(term)
+            if not terms:
+                del self._grams[gram]
+
+    def find_containing(self, fragment: str) -> Set[str]:
+        """Return vocabulary terms that contain `fragment`"""
+        if len(fragment) < self.n:
+            # Too short to have an n-gram; fall back to a vocabulary scan
+            return {term for term in self._terms if fragment in term}
+
+        postings = []
+        for gram in self._ngrams(fragment):
+            terms = self._grams.get(gram)
+            if not terms:
+                return set()
+            postings.append(terms)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for terms in postings[1:]:
+            candidates &= terms
+            if not candidates:
+                return candidates
+        return {term for term in candidates if fragment in term}
+
+    def find_contained_in(self, text: str) -> Set[str]:
+        """Return vocabulary terms that are substrings of `text`"""
+        terms = self._terms
+        found = set()
+        for start in range(len(text)):
+            for end in range(start + 1, len(text) + 1):
+                if text[start:end] in terms:
+                    found.add(text[start:end])
+        return found
+
+    def find_related(self, term: str) -> Set[str]:
+        """Return vocabulary terms that contain `term` or are contained in it"""
+        return self.find_containing(term) | self.find_contained_in(term)
+
+    def _ngrams(self, text: str) -> Set[str]:
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
@@ -0,0 +1,63 @@
+import pytest
+
+from app import app, MAX_RECOMMENDATIONS
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize('limit', [0, -1, MAX_RECOMMENDATIONS + 1, 'ten', 2.5, True])
+def test_recommend_rejects_invalid_limit(client, limit):
+    response = client.post('/api/recommend', json={'skills': ['Figma'], 'limit': limit})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('limit', [0, -1, MAX_RECOMMENDATIONS + 1, 'ten', 2.5, True])
+def test_batch_recommend_rejects_invalid_limit(client, limit):
+    response = client.post('/api/recommend/batch', json={'limit': limit, 'requests': [{'skills': ['Figma']}]})
+    assert response.status_code == 400
+    assert 'limit' in response.get_json()['error']
+
+
+def test_recommend_limit(client):
+    response = client.post('/api/recommend', json={'skills': ['Figma'], 'limit': 3})
+    assert response.get_json()['total_count'] == 3
+    response = client.post('/api/recommend/batch', json={'limit': '2', 'requests': [{'skills': ['Figma']}]})
+    assert len(response.get_json()['results']['0']) == 2
+
+
+@pytest.mark.parametrize('path', ['/admin/profiles', '/admin/profiles/1'])
+def test_admin_endpoints_are_disabled_without_a_token(client, monkeypatch, path):
+    monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+    assert client.get(path).status_code == 404
+    assert client.get(path, headers={'X-Admin-Token': ''}).status_code == 404
+
+
+@pytest.mark.parametrize('path', ['/admin/profiles', '/admin/profiles/1'])
+def test_admin_endpoints_require_the_token(client, monkeypatch, path):
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    assert client.get(path, headers={'X-Admin-Token': 'secret'}).status_code == 404  # Profiling is off
+
+
+@pytest.mark.parametrize('method, path', [('post', '/api/alerts/profiles'), ('get', '/api/alerts'),
+                                          ('delete', '/api/alerts/profiles/cand-1')])
+def test_alert_endpoints_require_the_token(client, monkeypatch, method, path):
+    monkeypatch.delenv('ALERTS_TOKEN', raising=False)
+    assert getattr(client, method)(path).status_code == 404
+    monkeypatch.setenv('ALERTS_TOKEN', 'secret')
+    assert getattr(client, method)(path).status_code == 403
+    assert getattr(client, method)(path, headers={'X-Alerts-Token': 'wrong'}).status_code == 403
+
+
+def test_alert_profiles_with_the_token(client, monkeypatch):
+    monkeypatch.setenv('ALERTS_TOKEN', 'secret')
+    headers = {'X-Alerts-Token': 'secret'}
+    response = client.post('/api/alerts/profiles', headers=headers,
+                           json={'profile_id': 'cand-1', 'preferences': {'skills': ['Python']}})
+    assert response.status_code == 201
+    assert client.get('/api/alerts', headers=headers).status_code == 200
+    assert client.delete('/api/alerts/profiles/cand-1', headers=headers).status_code == 200
@@ -0,0 +1,44 @@
+import json
+import asyncio
+from unittest import mock
+
+import pytest
+
+from app import MAX_RECOMMENDATIONS, recommendation_engine
+from asgi import RecommendationService
+
+
+def post(service, payload):
+    """POST a JSON body to /api/recommend; returns (status, decoded body)"""
+    messages = [{'type': 'http.request', 'body': json.dumps(payload).encode('utf-8')}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': '/api/recommend', 'headers': []}
+    asyncio.run(service(scope, receive, send))
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+@pytest.fixture
+def service():
+    return RecommendationService(recommendation_engine, workers=1)
+
+
+@pytest.mark.parametrize('limit', [0, -1, MAX_RECOMMENDATIONS + 1, 'ten', 2.5, True])
+def test_invalid_limit_is_rejected_before_scoring(service, limit):
+    with mock.patch.object(service, '_score') as score:
+        status, body = post(service, {'skills': ['Figma'], 'limit': limit})
+    assert status == 400
+    assert 'limit' in body['error']
+    score.assert_not_called()
+
+
+def test_limit(service):
+    status, body = post(service, {'skills': ['Figma'], 'limit': 3})
+    assert status == 200
+    assert body['total_count'] == 3
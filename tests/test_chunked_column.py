@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from chunked_column import CHUNK_SIZE, ChunkedColumn
+
+
+@pytest.mark.parametrize('size', [0, CHUNK_SIZE + 10, 2 * CHUNK_SIZE])
+def test_frozen_views_never_change(size):
+    rng = random.Random(size)
+    column = ChunkedColumn(size, fill='unset')
+    expected = ['unset'] * size
+    views = []
+    for step in range(5 * CHUNK_SIZE):
+        action = rng.random()
+        if action < 0.4:
+            column.append(step)
+            expected.append(step)
+        elif action < 0.8 and expected:
+            index = rng.randrange(len(expected))
+            column[index] = -step
+            expected[index] = -step
+        elif action < 0.81:
+            views.append((column.freeze(), list(expected)))
+    views.append((column.freeze(), list(expected)))
+
+    for view, items in views:
+        assert len(view) == len(items)
+        assert list(view) == items
+        assert [view[i] for i in range(len(items))] == items
+        assert view[3:CHUNK_SIZE + 7] == items[3:CHUNK_SIZE + 7]
+        assert view[::7] == items[::7]
+        if items:
+            assert view[-1] == items[-1]
+
+
+def test_freeze_shares_unwritten_chunks():
+    column = ChunkedColumn()
+    for i in range(4 * CHUNK_SIZE):
+        column.append(i)
+    before = column.freeze()
+    column[0] = 'changed'
+    after = column.freeze()
+    assert before[0] == 0 and after[0] == 'changed'
+    assert before._chunks[0] is not after._chunks[0]
+    assert all(old is new for old, new in zip(before._chunks[1:], after._chunks[1:]))
+
+
+def test_index_errors():
+    column = ChunkedColumn()
+    column.append('a')
+    view = column.freeze()
+    with pytest.raises(IndexError):
+        view[1]
+    with pytest.raises(IndexError):
+        view[-2]
+    with pytest.raises(IndexError):
+        column[1] = 'b'
@@ -0,0 +1,29 @@
+import pytest
+
+from job_data import JobRecord
+
+
+@pytest.mark.parametrize('location, currency', [
+    ('Indianapolis, IN', 'USD'),
+    ('Fort Wayne, Indiana', 'USD'),
+    ('Remote in Indiana', 'USD'),
+    ('London, Ontario', 'CAD'),
+    ('London, UK', 'GBP'),
+    ('London', 'GBP'),
+    ('Bangalore, India', 'INR'),
+    ('Remote - India', 'INR'),
+    ('Berlin', 'EUR'),
+    ('', 'USD'),
+])
+def test_currency_comes_from_the_resolved_location(location, currency):
+    record = JobRecord(0, {'job_id': 'J1', 'location': location, 'salary_range': [120000, 150000]})
+    assert record.currency == currency
+    rates = JobRecord.CURRENCY_RATES
+    assert record.salary_range == (rates.normalize(120000, currency), rates.normalize(150000, currency))
+
+
+def test_job_currency_overrides_the_location():
+    record = JobRecord(0, {'job_id': 'J1', 'location': 'Bangalore, India', 'currency': 'usd',
+                           'salary_range': [120000, 150000]})
+    assert record.currency == 'USD'
+    assert record.salary_range == (120000, 150000)
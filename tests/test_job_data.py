@@ -0,0 +1,13 @@
+import json
+
+import job_data
+from job_data import JobDatabase
+
+
+def test_unparsable_sample_jobs_are_skipped(tmp_path, monkeypatch):
+    path = tmp_path / 'sample_jobs.jsonl'
+    path.write_text('\n'.join([json.dumps({'job_id': 'J1', 'title': 'Designer'}), '{"job_id": "J2",',
+                               json.dumps({'job_id': 'J3', 'title': 'Engineer'})]) + '\n')
+    monkeypatch.setattr(job_data, 'SAMPLE_JOBS_FILE', str(path))
+    job_db = JobDatabase()
+    assert [job['job_id'] for job in job_db.get_all_jobs()] == ['J1', 'J3']
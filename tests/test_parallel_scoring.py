@@ -0,0 +1,151 @@
+import random
+
+import pytest
+
+import parallel_scoring
+from benchmarks.synthetic import CatalogGenerator
+from job_data import JobDatabase
+from metrics import COMPONENT_SECONDS, PRUNED_JOBS
+from recommendation_engine import JobRecommendationEngine
+
+SEED = 7
+
+
+def record_key(record):
+    return None if record is None else (record.job['job_id'], record.title, record.skills, record.salary_range)
+
+
+def change_catalog(job_db, rng, replacements, next_id):
+    """Apply a few random updates, removals and adds; returns the next unused job number"""
+    for _ in range(rng.randint(1, 3)):
+        job_ids = [record.job['job_id'] for record in job_db.get_records()[:300] if record is not None]
+        action = rng.random()
+        if action < 0.4:
+            job_db.update_job(dict(rng.choice(replacements), job_id=rng.choice(job_ids)))
+        elif action < 0.7:
+            job_db.remove_job(rng.choice(job_ids))
+        else:
+            job_db.add_job(dict(rng.choice(replacements), job_id=f"NEW-{next_id}"))
+            next_id += 1
+    return next_id
+
+
+@pytest.fixture
+def generator():
+    return CatalogGenerator(SEED)
+
+
+def test_workers_apply_published_changes(generator, monkeypatch):
+    """A worker catching up from any published version holds the records of the requested one"""
+    monkeypatch.setattr(parallel_scoring, '_worker_state', dict(parallel_scoring._worker_state))
+    job_db = JobDatabase(jobs=generator.iter_jobs(1000))
+    scorer = JobRecommendationEngine(job_db, shards=2)._sharded_scorer
+    rng = random.Random(SEED)
+    replacements = generator.jobs(200)
+    next_id = 0
+    snapshots = []
+    try:
+        for round_number in range(200):
+            next_id = change_catalog(job_db, rng, replacements, next_id)
+            snapshots.append(job_db.snapshot())
+            # Later on, sometimes a version a worker has already moved past
+            snapshot = snapshots[-1] if round_number < 100 or rng.random() < 0.8 else rng.choice(snapshots[-5:])
+            catalog = scorer._publish(snapshot)
+            _, records = parallel_scoring._load_catalog(JobRecommendationEngine, catalog)
+            scorer._release_catalog(catalog)
+            assert [record_key(record) for record in records] == [record_key(record) for record in snapshot.records]
+            if round_number == 99:
+                # Only change segments were published, merged down to a few
+                assert len(scorer._generations) == 1
+                assert len(scorer._generations[0].deltas) <= 8
+    finally:
+        scorer.close()
+
+
+@pytest.mark.parametrize('republish', [False, True])
+def test_segments_outlive_newer_publishes_while_in_use(generator, monkeypatch, republish):
+    """A request still scoring an older catalog can read its segments after later publishes"""
+    if republish:  # Every change republishes the catalog whole, retiring older generations
+        monkeypatch.setattr(parallel_scoring.ShardedScorer, 'MIN_REPUBLISH', 0)
+        monkeypatch.setattr(parallel_scoring.ShardedScorer, 'REPUBLISH_FRACTION', 0)
+    job_db = JobDatabase(jobs=generator.iter_jobs(1000))
+    scorer = JobRecommendationEngine(job_db, shards=2)._sharded_scorer
+    replacements = generator.jobs(10)
+    try:
+        scorer._release_catalog(scorer._publish(job_db.snapshot()))
+        job_db.update_job(dict(replacements[0], job_id='SYN-0000001'))
+        held_snapshot = job_db.snapshot()
+        held = scorer._publish(held_snapshot)
+        for number, job_id in enumerate(['SYN-0000002', 'SYN-0000003', 'SYN-0000004'], 1):
+            job_db.update_job(dict(replacements[number], job_id=job_id))
+            scorer._release_catalog(scorer._publish(job_db.snapshot()))
+        assert scorer._retired  # Segments of the held catalog are no longer published
+
+        # A worker starting from nothing reads every segment of the held catalog
+        monkeypatch.setattr(parallel_scoring, '_worker_state', dict(parallel_scoring._worker_state, base=None))
+        _, records = parallel_scoring._load_catalog(JobRecommendationEngine, held)
+        assert [record_key(record) for record in records] == [record_key(record) for record in held_snapshot.records]
+
+        scorer._release_catalog(held)
+        assert not scorer._retired and not scorer._readers
+    finally:
+        scorer.close()
+
+
+def test_sharded_scoring_matches_serial_after_changes(generator, monkeypatch):
+    monkeypatch.setattr(JobRecommendationEngine, 'PARALLEL_MIN_JOBS', 1)
+    job_db = JobDatabase(jobs=generator.iter_jobs(1000))
+    sharded = JobRecommendationEngine(job_db, shards=2)
+    serial = JobRecommendationEngine(job_db)
+    rng = random.Random(SEED)
+    replacements = generator.jobs(200)
+    next_id = 0
+    preference_sets = generator.preferences(5)
+    try:
+        for _ in range(10):
+            next_id = change_catalog(job_db, rng, replacements, next_id)
+            for preferences in preference_sets:
+                assert sharded.recommend_jobs(preferences) == serial.recommend_jobs(preferences)
+    finally:
+        sharded._sharded_scorer.close()
+
+
+def component_timings():
+    return {labels: series['count'] for labels, series in COMPONENT_SECONDS.snapshot().items()}
+
+
+def test_sharded_scoring_reports_component_timings(generator, monkeypatch):
+    """Timings sampled in the worker processes reach the web process's registry"""
+    monkeypatch.setattr(JobRecommendationEngine, 'PARALLEL_MIN_JOBS', 1)
+    job_db = JobDatabase(jobs=generator.iter_jobs(1000))
+    sharded = JobRecommendationEngine(job_db, shards=2)
+    serial = JobRecommendationEngine(job_db)
+    serial_counts, sharded_counts = {}, {}
+    try:
+        for preferences in generator.preferences(5):
+            before = component_timings()
+            serial.recommend_jobs(preferences)
+            middle = component_timings()
+            sharded.recommend_jobs(preferences)
+            after = component_timings()
+            for labels, count in after.items():
+                serial_counts[labels] = serial_counts.get(labels, 0) + middle.get(labels, 0) - before.get(labels, 0)
+                sharded_counts[labels] = sharded_counts.get(labels, 0) + count - middle.get(labels, 0)
+    finally:
+        sharded._sharded_scorer.close()
+    assert sum(serial_counts.values()) > 0
+    assert sharded_counts == serial_counts
+
+
+def test_sharded_scoring_reports_pruned_jobs(generator, monkeypatch):
+    """Jobs pruned in the worker processes are counted in the web process's registry"""
+    monkeypatch.setattr(JobRecommendationEngine, 'PARALLEL_MIN_JOBS', 1)
+    job_db = JobDatabase(jobs=generator.iter_jobs(2000))
+    sharded = JobRecommendationEngine(job_db, shards=2, pruning=True)
+    before = PRUNED_JOBS.value()
+    try:
+        for preferences in generator.preferences(5):
+            sharded.recommend_jobs(preferences, 5)
+    finally:
+        sharded._sharded_scorer.close()
+    assert PRUNED_JOBS.value() > before
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from job_data import JobDatabase
+from profile_percolator import ProfilePercolator
+from recommendation_engine import JobRecommendationEngine
+
+JOB = {'job_id': 'NEW-1', 'title': 'Python Developer', 'company': 'Acme', 'location': 'Bangalore, India',
+       'required_skills': ['Python', 'Django'], 'industry': 'Technology'}
+PREFERENCES = {'skills': ['Python', 'Django'], 'locations': ['Bangalore'], 'industries': ['Technology']}
+
+
+@pytest.fixture
+def job_db():
+    return JobDatabase(jobs=[])
+
+
+def test_jobs_are_percolated_outside_the_write_lock(job_db):
+    percolator = ProfilePercolator(JobRecommendationEngine(job_db))
+    percolator.attach(job_db)
+    percolator.save_profile('cand-1', PREFERENCES, 50)
+    percolated_under_lock = []
+    percolate = percolator.percolate
+
+    def tracking_percolate(record, version=None):
+        percolated_under_lock.append(job_db._lock._is_owned())
+        return percolate(record, version)
+
+    percolator.percolate = tracking_percolate
+    try:
+        job_db.add_job(dict(JOB))
+        percolator.catch_up()
+        events = percolator.sink.drain()
+    finally:
+        percolator.detach()
+    assert [(event.profile_id, event.job_id) for event in events] == [('cand-1', 'NEW-1')]
+    assert percolated_under_lock == [False]
+
+
+def test_background_thread_percolates_new_jobs(job_db):
+    delivered = threading.Event()
+    events = []
+    percolator = ProfilePercolator(JobRecommendationEngine(job_db), sink=lambda event: (events.append(event),
+                                                                                       delivered.set()))
+    percolator.attach(job_db)
+    percolator.save_profile('cand-1', PREFERENCES, 50)
+    try:
+        job_db.add_job(dict(JOB))
+        assert delivered.wait(5)
+    finally:
+        percolator.detach()
+    assert [event.version for event in events] == [job_db.version]
+
+
+def test_detached_percolator_stops(job_db):
+    percolator = ProfilePercolator(JobRecommendationEngine(job_db))
+    percolator.attach(job_db)
+    percolator.save_profile('cand-1', PREFERENCES, 50)
+    percolator.detach()
+    job_db.add_job(dict(JOB))
+    assert percolator.catch_up() == 0
+    assert percolator.sink.drain() == []
+
+
+def test_saved_profiles_are_capped(job_db):
+    percolator = ProfilePercolator(JobRecommendationEngine(job_db), max_profiles=2)
+    percolator.save_profile('cand-1', PREFERENCES)
+    percolator.save_profile('cand-2', PREFERENCES)
+    with pytest.raises(ValueError):
+        percolator.save_profile('cand-3', PREFERENCES)
+    percolator.save_profile('cand-2', PREFERENCES, 90)  # Replacing a saved profile is allowed
+    percolator.remove_profile('cand-1')
+    percolator.save_profile('cand-3', PREFERENCES)
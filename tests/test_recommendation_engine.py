@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.synthetic import CatalogGenerator
+from job_data import JobDatabase
+from recommendation_engine import JobRecommendationEngine
+
+
+@pytest.fixture(scope='module')
+def job_db():
+    return JobDatabase(jobs=CatalogGenerator(7).iter_jobs(200))
+
+
+@pytest.mark.parametrize('pruning', [False, True])
+@pytest.mark.parametrize('limit', [0, -1])
+def test_non_positive_limit_returns_nothing(job_db, pruning, limit):
+    engine = JobRecommendationEngine(job_db, pruning=pruning)
+    assert engine.recommend_jobs({'skills': ['Figma']}, limit) == []
+    assert engine.recommend_jobs({}, limit) == []
+    assert engine.recommend_jobs_batch([{'skills': ['Figma']}], limit) == {'0': []}
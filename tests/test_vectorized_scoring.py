@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from benchmarks.synthetic import CatalogGenerator
+from job_data import JobDatabase
+from recommendation_engine import JobRecommendationEngine
+from vectorized_scoring import CatalogArrays
+
+SEED = 7
+CATALOG_SIZE = 3000
+QUERIES = 150
+
+
+def ranking(recommendations):
+    return [(job['job_id'], job['match_score'], job['breakdown']) for job in recommendations]
+
+
+def preference_sets(generator):
+    """Synthetic preference mix, with role filters (hard and soft) added to some sets"""
+    rng = random.Random(SEED)
+    preference_sets = generator.preferences(QUERIES)
+    for preferences in preference_sets[::4]:
+        preferences['role_level'] = [rng.choice(generator.role_levels)]
+        preferences['filter_mode'] = rng.choice(JobRecommendationEngine.FILTER_MODES)
+    return preference_sets
+
+
+@pytest.fixture(scope='module')
+def generator():
+    return CatalogGenerator(SEED)
+
+
+def assert_backends_agree(job_db, preference_sets, limit):
+    python_engine = JobRecommendationEngine(job_db, backend='python')
+    numpy_engine = JobRecommendationEngine(job_db, backend='numpy')
+    for preferences in preference_sets:
+        expected = ranking(python_engine.recommend_jobs(preferences, limit))
+        assert ranking(numpy_engine.recommend_jobs(preferences, limit)) == expected, preferences
+
+
+@pytest.mark.parametrize('limit', [1, 20, 500])
+def test_numpy_backend_matches_python_backend(generator, limit):
+    job_db = JobDatabase(jobs=generator.iter_jobs(CATALOG_SIZE))
+    assert_backends_agree(job_db, preference_sets(generator), limit)
+
+
+def test_numpy_backend_matches_python_backend_after_changes(generator):
+    job_db = JobDatabase(jobs=generator.iter_jobs(CATALOG_SIZE))
+    numpy_engine = JobRecommendationEngine(job_db, backend='numpy')
+    numpy_engine.recommend_jobs({'skills': ['Figma']})  # Build the column arrays before the changes
+
+    rng = random.Random(SEED)
+    replacements = generator.jobs(CATALOG_SIZE)
+    for position in rng.sample(range(CATALOG_SIZE), 200):
+        job_db.update_job(dict(replacements[rng.randrange(CATALOG_SIZE)], job_id=f"SYN-{position:07d}"))
+    for position in rng.sample(range(CATALOG_SIZE), 100):
+        job_db.remove_job(f"SYN-{position:07d}")
+    job_db.add_jobs(generator.iter_jobs(300, start=CATALOG_SIZE))
+
+    assert_backends_agree(job_db, preference_sets(generator), 20)
+
+
+def assert_same_arrays(arrays, expected):
+    for name in ('alive', 'has_salary', 'salary_min', 'salary_max'):
+        assert (getattr(arrays, name) == getattr(expected, name)).all(), name
+    for field in CatalogArrays.CATEGORICAL_FIELDS:
+        assert ([arrays.vocab[field][code] for code in arrays.codes[field]]
+                == [expected.vocab[field][code] for code in expected.codes[field]]), field
+    for field in CatalogArrays.SET_FIELDS:
+        assert (arrays.has_terms[field] == expected.has_terms[field]).all(), field
+        assert arrays.postings[field].keys() == expected.postings[field].keys(), field
+        for term, jobs in expected.postings[field].items():
+            assert sorted(arrays.postings[field][term].tolist()) == jobs.tolist(), (field, term)
+
+
+def test_arrays_are_patched_with_catalog_changes(generator):
+    job_db = JobDatabase(jobs=generator.iter_jobs(CATALOG_SIZE))
+    scorer = JobRecommendationEngine(job_db, backend='numpy')._vector_scorer
+    arrays = scorer.get_arrays(job_db.snapshot())
+    scorer.release_arrays(arrays)
+
+    rng = random.Random(SEED)
+    replacements = generator.jobs(500)
+    added = CATALOG_SIZE
+    for round_number in range(20):
+        for _ in range(rng.randint(1, 5)):
+            job_ids = [record.job['job_id'] for record in job_db.get_records()[:500] if record is not None]
+            action = rng.random()
+            if action < 0.4:
+                job_db.update_job(dict(rng.choice(replacements), job_id=rng.choice(job_ids)))
+            elif action < 0.7:
+                job_db.remove_job(rng.choice(job_ids))
+            else:
+                job_db.add_job(dict(rng.choice(replacements), job_id=f"NEW-{added}"))
+                added += 1
+        # Every other round a request still scores with the previous arrays, so they are copied
+        held = scorer.get_arrays(job_db.snapshot()) if round_number % 2 else None
+        job_db.add_job(dict(rng.choice(replacements), job_id=f"NEW-{added}"))
+        added += 1
+        snapshot = job_db.snapshot()
+        previous, arrays = arrays, scorer.get_arrays(snapshot)
+        scorer.release_arrays(arrays)
+        if held is None:
+            assert arrays is previous  # Patched in place
+        else:
+            held_records = held.records
+            scorer.release_arrays(held)
+            assert held is not arrays
+            assert_same_arrays(held, CatalogArrays(held_records))
+        assert arrays.version == snapshot.version
+        assert_same_arrays(arrays, CatalogArrays(snapshot.records))
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_non_positive_limit_returns_nothing(generator, limit):
+    job_db = JobDatabase(jobs=generator.iter_jobs(100))
+    engine = JobRecommendationEngine(job_db, backend='numpy')
+    assert engine._vector_scorer.top_k(engine._compile_preferences({'skills': ['Figma']}, {}),
+                                       job_db.snapshot(), None, limit) == []
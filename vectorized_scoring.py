@@ -0,0 +1,342 @@
+import logging
+import threading
+from typing import Dict, List, Any, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None
+
+from job_data import JobRecord
+
+_REMOVED_JOB = JobRecord(-1, {})
+_NO_JOBS = np.zeros(0, dtype=np.int64) if np is not None else None
+
+
+class CatalogArrays:
+    """
+    Columnar view of the job catalog used by the vectorized scorer.
+    Categorical fields are stored as integer codes into a per-field vocabulary,
+    skills and values as term -> job postings (a sparse incidence matrix in CSC form).
+    patch() rewrites only the rows of changed jobs; row columns keep spare capacity,
+    so added jobs rarely reallocate them.
+    """
+
+    CATEGORICAL_FIELDS = ['title', 'location', 'industry', 'company_size']
+    SET_FIELDS = ['skills', 'values']
+
+    def __init__(self, records: Sequence[Any], version: Optional[int] = None):
+        self.records = records  # Catalog column the arrays reflect
+        self.version = version
+        self.size = len(records)
+        self.readers = 0  # Requests scoring with these arrays; only patched in place when none are
+        self._buffers = {}  # Row column name -> array with room for added jobs; attributes are views of them
+        # Removed jobs (None) get an empty stand-in record and are never eligible
+        self._buffers['alive'] = np.fromiter((record is not None for record in records), dtype=bool, count=self.size)
+        if not self._buffers['alive'].all():
+            records = [_REMOVED_JOB if record is None else record for record in records]
+        self.vocab = {}
+        self._code_of = {}  # field -> {value: code}
+        for field in self.CATEGORICAL_FIELDS:
+            vocab = {}
+            self._buffers[f'codes.{field}'] = np.fromiter(
+                (vocab.setdefault(getattr(record, field), len(vocab)) for record in records),
+                dtype=np.int32, count=self.size
+            )
+            self.vocab[field] = list(vocab)
+            self._code_of[field] = vocab
+
+        self.postings = {}
+        for field in self.SET_FIELDS:
+            self.postings[field], self._buffers[f'has_terms.{field}'] = self._build_postings(records, field)
+
+        self._buffers['has_salary'] = np.fromiter((record.salary_range is not None for record in records),
+                                                  dtype=bool, count=self.size)
+        self._buffers['salary_min'] = np.fromiter(
+            (record.salary_range[0] if record.salary_range else 0 for record in records),
+            dtype=np.int64, count=self.size)
+        self._buffers['salary_max'] = np.fromiter(
+            (record.salary_range[1] if record.salary_range else 0 for record in records),
+            dtype=np.int64, count=self.size)
+        self._set_views()
+
+    def _set_views(self):
+        """Point the row column attributes at the first `size` rows of their buffers"""
+        size, buffers = self.size, self._buffers
+        self.alive = buffers['alive'][:size]
+        self.codes = {field: buffers[f'codes.{field}'][:size] for field in self.CATEGORICAL_FIELDS}
+        self.has_terms = {field: buffers[f'has_terms.{field}'][:size] for field in self.SET_FIELDS}
+        self.has_salary = buffers['has_salary'][:size]
+        self.salary_min = buffers['salary_min'][:size]
+        self.salary_max = buffers['salary_max'][:size]
+
+    def _build_postings(self, records: List[Any], field: str):
+        """Build term -> job position arrays for a set-valued field"""
+        positions = {}
+        for record in records:
+            for term in getattr(record, field):
+                positions.setdefault(term, []).append(record.position)
+        postings = {term: np.array(jobs, dtype=np.int64) for term, jobs in positions.items()}
+        has_terms = np.fromiter((bool(getattr(record, field)) for record in records),
+                                dtype=bool, count=self.size)
+        return postings, has_terms
+
+    def copy(self) -> 'CatalogArrays':
+        """Copy to patch while requests are still scoring with these arrays (posting arrays are shared)"""
+        arrays = CatalogArrays.__new__(CatalogArrays)
+        arrays.records, arrays.version, arrays.size, arrays.readers = self.records, self.version, self.size, 0
+        arrays._buffers = {name: buffer.copy() for name, buffer in self._buffers.items()}
+        arrays.vocab = {field: list(vocab) for field, vocab in self.vocab.items()}
+        arrays._code_of = {field: dict(codes) for field, codes in self._code_of.items()}
+        arrays.postings = {field: dict(postings) for field, postings in self.postings.items()}
+        arrays._set_views()
+        return arrays
+
+    def patch(self, records: Sequence[Any], positions: Iterable[int], version: int):
+        """
+        Bring the arrays up to `records`, a later version of the same catalog
+
+        Only the rows at `positions` (the jobs changed in between) and at positions added
+        since are rewritten, and only the postings of the terms they gained or lost.
+        Posting arrays are replaced, never modified, so copies can share them.
+        """
+        old_records, old_size = self.records, self.size
+        self._resize(len(records))
+        buffers = self._buffers
+        removed = {field: {} for field in self.SET_FIELDS}  # field -> term -> positions that lost it
+        added = {field: {} for field in self.SET_FIELDS}  # field -> term -> positions that gained it
+        for position in set(positions).union(range(old_size, self.size)):
+            old_record = old_records[position] if position < old_size else None
+            record = records[position]
+            buffers['alive'][position] = record is not None
+            row = _REMOVED_JOB if record is None else record
+            for field in self.CATEGORICAL_FIELDS:
+                value = getattr(row, field)
+                code = self._code_of[field].get(value)
+                if code is None:
+                    code = self._code_of[field][value] = len(self.vocab[field])
+                    self.vocab[field].append(value)
+                buffers[f'codes.{field}'][position] = code
+            for field in self.SET_FIELDS:
+                terms = getattr(row, field)
+                old_terms = getattr(old_record, field) if old_record is not None else frozenset()
+                for term in old_terms - terms:
+                    removed[field].setdefault(term, []).append(position)
+                for term in terms - old_terms:
+                    added[field].setdefault(term, []).append(position)
+                buffers[f'has_terms.{field}'][position] = bool(terms)
+            buffers['has_salary'][position] = row.salary_range is not None
+            buffers['salary_min'][position], buffers['salary_max'][position] = row.salary_range or (0, 0)
+
+        for field in self.SET_FIELDS:
+            postings = self.postings[field]
+            for term in removed[field].keys() | added[field].keys():
+                jobs = postings.get(term, _NO_JOBS)
+                if term in removed[field]:
+                    jobs = jobs[~np.isin(jobs, removed[field][term])]
+                if term in added[field]:
+                    jobs = np.concatenate((jobs, np.array(added[field][term], dtype=np.int64)))
+                if len(jobs):
+                    postings[term] = jobs
+                else:
+                    postings.pop(term, None)
+        self.records, self.version = records, version
+
+    def _resize(self, size: int):
+        """Grow the row columns to `size` rows, doubling buffer capacity when they are full"""
+        capacity = len(self._buffers['alive'])
+        if size > capacity:
+            capacity = max(size, 2 * capacity)
+            for name, buffer in self._buffers.items():
+                grown = np.zeros(capacity, dtype=buffer.dtype)
+                grown[:self.size] = buffer[:self.size]
+                self._buffers[name] = grown
+        self.size = size
+        self._set_views()
+
+    def incidence(self, field: str, terms) -> 'np.ndarray':
+        """Boolean mask of jobs carrying any of the given terms"""
+        mask = np.zeros(self.size, dtype=bool)
+        postings = self.postings[field]
+        for term in terms:
+            jobs = postings.get(term)
+            if jobs is not None:
+                mask[jobs] = True
+        return mask
+
+
+class VectorizedScorer:
+    """
+    NumPy scoring backend for JobRecommendationEngine.
+    Computes every component score for the whole catalog in a few array operations
+    and produces exactly the scores of the per-job Python path.
+    """
+
+    # Changed jobs, as a share of the catalog, above which the arrays are rebuilt instead of patched
+    REBUILD_FRACTION = 0.25
+
+    # Changed jobs that are always patched, whatever the catalog size
+    MIN_REBUILD = 1024
+
+    def __init__(self, engine):
+        if np is None:
+            raise ImportError("numpy is required for the vectorized scoring backend")
+        self.engine = engine
+        self.logger = logging.getLogger(__name__)
+        self._arrays = None
+        self._lock = threading.Lock()
+
+    def get_arrays(self, snapshot: Any) -> CatalogArrays:
+        """
+        Return columnar arrays for a catalog snapshot; release them with release_arrays()
+
+        Arrays of an older version are patched with the catalog's changes_since() when
+        the change log reaches back far enough, and rebuilt otherwise. Arrays that other
+        requests are still scoring with are copied before being patched.
+        """
+        with self._lock:
+            arrays = self._arrays
+            if arrays is None or arrays.version != snapshot.version:
+                arrays = self._catch_up(arrays, snapshot)
+            arrays.readers += 1
+            return arrays
+
+    def release_arrays(self, arrays: CatalogArrays):
+        with self._lock:
+            arrays.readers -= 1
+
+    def _catch_up(self, arrays: Optional[CatalogArrays], snapshot: Any) -> CatalogArrays:
+        if arrays is not None and arrays.version > snapshot.version:
+            # A request still on an older snapshot: build its arrays without replacing the current ones
+            return CatalogArrays(snapshot.records, snapshot.version)
+        job_db = self.engine.job_db
+        if arrays is not None and hasattr(job_db, 'changes_since'):
+            changes = job_db.changes_since(arrays.version)
+            if changes is not None:
+                positions = {change.position for change in changes if change.version <= snapshot.version}
+                if len(positions) <= max(self.MIN_REBUILD, arrays.size * self.REBUILD_FRACTION):
+                    if arrays.readers:
+                        arrays = arrays.copy()
+                    arrays.patch(snapshot.records, positions, snapshot.version)
+                    self._arrays = arrays
+                    self.logger.debug(f"Patched {len(positions)} rows of the columnar arrays "
+                                      f"(version {snapshot.version})")
+                    return arrays
+        arrays = self._arrays = CatalogArrays(snapshot.records, snapshot.version)
+        self.logger.debug(f"Built columnar arrays for {arrays.size} jobs (version {snapshot.version})")
+        return arrays
+
+    def score(self, prefs: Dict[str, Any], arrays: CatalogArrays) -> Dict[str, 'np.ndarray']:
+        """Compute per-component scores (0-1) for every job in the catalog"""
+        return {
+            'skills': self._score_skills(prefs, arrays),
+            'title': self._score_categorical(prefs, arrays, 'title'),
+            'location': self._score_categorical(prefs, arrays, 'location'),
+            'industry': self._score_categorical(prefs, arrays, 'industry'),
+            'company_size': self._score_categorical(prefs, arrays, 'company_size'),
+            'values': self._score_values(prefs['values'], arrays),
+            'salary': self._score_salary(prefs['min_salary'], arrays)
+        }
+
+    def top_k(self, prefs: Dict[str, Any], snapshot: Any, candidates: Optional[List[int]],
+              limit: int, penalized: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Score a catalog snapshot and return recommendations for the best `limit` jobs
+
+        `penalized` jobs (failing a soft filter) are also eligible, with their score
+        multiplied by the engine's SOFT_FILTER_FACTOR.
+        """
+        if limit <= 0:
+            return []
+        records = snapshot.records
+        arrays = self.get_arrays(snapshot)
+        try:
+            return self._top_k(prefs, records, arrays, candidates, limit, penalized)
+        finally:
+            self.release_arrays(arrays)
+
+    def _top_k(self, prefs: Dict[str, Any], records: Sequence[Any], arrays: CatalogArrays,
+               candidates: Optional[List[int]], limit: int, penalized: Optional[List[int]]) -> List[Dict[str, Any]]:
+        components = self.score(prefs, arrays)
+
+        # Weighted total, accumulated in the same order as _calculate_match_score
+        total = np.zeros(arrays.size)
+        for name in self.engine.COMPONENTS:
+            total += components[name] * self.engine.weights[name]
+        total *= 100
+
+        eligible = (total > 0) & arrays.alive
+        if candidates is not None:
+            in_candidates = np.zeros(arrays.size, dtype=bool)
+            in_candidates[np.asarray(candidates, dtype=np.int64)] = True
+            if penalized:
+                in_candidates[np.asarray(penalized, dtype=np.int64)] = True
+            eligible &= in_candidates
+        if penalized:
+            total[np.asarray(penalized, dtype=np.int64)] *= self.engine.SOFT_FILTER_FACTOR
+
+        positions = np.flatnonzero(eligible)
+        rounded = np.rint(total[positions])
+
+        # Partial sort: keep everything tied with the k-th best score, then order
+        # by score and catalog position like the stable sort of the Python path
+        if limit < len(positions):
+            top = np.argpartition(rounded, len(positions) - limit)[len(positions) - limit:]
+            keep = rounded >= rounded[top].min()
+            positions, rounded = positions[keep], rounded[keep]
+        order = np.lexsort((positions, -rounded))[:limit]
+
+        results = []
+        for position in positions[order].tolist():
+            breakdown = {name: round(float(components[name][position]) * 100) for name in self.engine.COMPONENTS}
+            results.append(self.engine._build_recommendation(records[position], float(total[position]), breakdown))
+        return results
+
+    def _score_categorical(self, prefs: Dict[str, Any], arrays: CatalogArrays, field: str) -> 'np.ndarray':
+        """Score each distinct value once, then gather by job code"""
+        value_scores = np.array([self.engine._categorical_score(prefs, field, value)
+                                 for value in arrays.vocab[field]], dtype=np.float64)
+        return value_scores[arrays.codes[field]]
+
+    def _score_skills(self, prefs: Dict[str, Any], arrays: CatalogArrays) -> 'np.ndarray':
+        """Vectorized equivalent of _match_skills"""
+        terms = prefs['skills']
+        if not terms:
+            return np.full(arrays.size, 0.5)
+
+        matches = np.zeros(arrays.size)
+        for term, related_skills in zip(terms, prefs['skill_matches']):
+            exact = arrays.incidence('skills', [term])
+            partial = arrays.incidence('skills', related_skills)
+            matches += np.where(exact, 1.0, np.where(partial, 0.7, 0.0))
+
+        scores = np.minimum(matches / len(terms), 1.0)
+        scores[~arrays.has_terms['skills']] = 0.0
+        return scores
+
+    def _score_values(self, terms: List[str], arrays: CatalogArrays) -> 'np.ndarray':
+        """Vectorized equivalent of _match_values"""
+        if not terms:
+            return np.full(arrays.size, 0.5)
+
+        matches = np.zeros(arrays.size)
+        for term in terms:
+            matches += arrays.incidence('values', [term])
+
+        scores = matches / len(terms)
+        scores[~arrays.has_terms['values']] = 0.0
+        return scores
+
+    def _score_salary(self, min_salary: int, arrays: CatalogArrays) -> 'np.ndarray':
+        """Vectorized equivalent of _match_salary"""
+        if not min_salary:
+            return np.ones(arrays.size)
+
+        job_min, job_max = arrays.salary_min, arrays.salary_max
+        scores = np.zeros(arrays.size)
+        width = self.engine.SALARY_BAND_WIDTH
+        scores[(min_salary > job_max) & (min_salary - job_max <= width)] = 0.6
+        scores[(min_salary < job_min) & (job_min - min_salary <= width)] = 0.8
+        scores[(job_min <= min_salary) & (min_salary <= job_max)] = 1.0
+        scores[~arrays.has_salary] = 0.0
+        return scores